@@ -3,7 +3,7 @@
 from flask import Flask, jsonify, render_template, request, redirect, url_for, flash, send_from_directory, abort, session # Importer les modules nécessaires
 import redis
 from rq import Queue
-from rq.job import Job
+from rq.job import Job, Dependency
 from rq.registry import StartedJobRegistry, FinishedJobRegistry, FailedJobRegistry
 import os
 import shutil # Pour la suppression de dossiers
@@ -28,7 +28,8 @@ print(f"DEBUG: sys.path includes: {parent_dir}") # Add debug print
 try:
     # Now that parent_dir is in sys.path, we should be able to import directly
     import config
-    from main_scraper import run_full_scraping_process
+    from main_scraper import run_full_scraping_process, split_keyword_combinations, merge_shard_results
+    from cancellation import cancel_key, request_cancellation, clear_cancellation # Arrêt coopératif des tâches en cours
     print("Imports depuis le dossier parent (config, main_scraper) réussis.")
 except ImportError as e:
     print(f"ERREUR CRITIQUE lors de l'import depuis le dossier parent : {e}")
@@ -170,6 +171,34 @@ def start_scrape():
         traceback.print_exc()
         return jsonify({"error": f"Erreur lors de la mise en file d'attente : {e}"}), 500
 
+# --- Mode split : une sous-tâche par shard de combinaisons + un job reduce dépendant ---
+def enqueue_split_scraping_job(base_job_id, keywords_lists, shards, google_pages_limit, google_allowed_link_types, run_clean, run_extract):
+    """
+    Enqueue une sous-tâche run_full_scraping_process par shard sur 'scraping-tasks' (plusieurs workers
+    peuvent alors se partager la requête), puis le job reduce merge_shard_results qui ne démarre
+    qu'une fois toutes les sous-tâches terminées (même en échec : leurs résultats partiels sont fusionnés).
+    Clean/extract ne sont exécutés qu'une fois, par le job reduce. Retourne le job reduce.
+    """
+    shard_jobs = []
+    for shard_index, shard_combinations in enumerate(shards, start=1):
+        shard_jobs.append(q.enqueue(run_full_scraping_process,
+                                    args=(keywords_lists, google_pages_limit, google_allowed_link_types),
+                                    kwargs={'run_clean_option': False, 'run_extract_option': False,
+                                            'keyword_combinations': shard_combinations},
+                                    job_timeout='2h', result_ttl=86400,
+                                    job_id=f"{base_job_id}_shard{shard_index}",
+                                    meta={'parent_job_id': base_job_id}))
+    shard_job_ids = [shard_job.id for shard_job in shard_jobs]
+    print(f"Mode split : {len(shard_job_ids)} sous-tâche(s) mises en file d'attente pour {base_job_id}.")
+    return q.enqueue(merge_shard_results,
+                     args=(shard_job_ids,),
+                     kwargs={'run_clean_option': run_clean, 'run_extract_option': run_extract},
+                     depends_on=Dependency(jobs=shard_jobs, allow_failure=True),
+                     job_timeout='1h', result_ttl=86400,
+                     job_id=base_job_id,
+                     meta={'shard_job_ids': shard_job_ids,
+                           'status_message': f"En attente de {len(shard_job_ids)} sous-tâche(s)..."})
+
 # Nouvelle route pour gérer la soumission du formulaire
 @app.route('/scrape', methods=['GET', 'POST'])
 def scrape_keywords():
@@ -189,6 +218,7 @@ def scrape_keywords():
         limit_input = request.form.get('limit', '2')
         run_clean = request.form.get('clean') == 'yes'
         run_extract = request.form.get('extract') == 'yes'
+        split_mode = request.form.get('split') == 'yes'
 
         # Convertir les entrées en listes de mots-clés
         keywords_lists = [
@@ -212,6 +242,13 @@ def scrape_keywords():
         try:
             # Enqueuer la tâche avec les données du formulaire
             job_id_suffix = f"{keywords_lists[0][0]}_{keywords_lists[1][0]}" if keywords_lists[0] and keywords_lists[1] else "custom"
+            shards = split_keyword_combinations(keywords_lists, config.SPLIT_SHARD_SIZE) if split_mode else []
+            if len(shards) > 1:
+                job = enqueue_split_scraping_job(f"scrape_job_{job_id_suffix}_{os.urandom(4).hex()}", keywords_lists, shards,
+                                                 google_pages_limit, google_allowed_link_types, run_clean, run_extract)
+                flash(f"Tâche de scraping lancée en mode split ({len(shards)} sous-tâches) ! ID: {job.id}", "success")
+                session['last_job_id'] = job.id # Le suivi se fait sur le job reduce
+                return redirect(url_for('home'))
             job = q.enqueue(run_full_scraping_process,
                             args=(keywords_lists, google_pages_limit, google_allowed_link_types),
                             kwargs={'run_clean_option': run_clean, 'run_extract_option': run_extract},
@@ -316,12 +353,23 @@ def job_status(job_id):
             meta = job.meta or {}
             progress = meta.get('progress', 0)
             status_message = meta.get('status_message', status) # Utilise le message meta ou le statut RQ
+            shard_job_ids = meta.get('shard_job_ids')
+            if shard_job_ids and status == 'deferred':
+                # Job reduce en attente : progression agrégée des sous-tâches (0-90%)
+                shard_jobs = [shard_job for shard_job in Job.fetch_many(shard_job_ids, connection=conn) if shard_job]
+                shard_progress = [100 if shard_job.is_finished or shard_job.is_failed else (shard_job.meta or {}).get('progress', 0) for shard_job in shard_jobs]
+                done_count = sum(1 for shard_job in shard_jobs if shard_job.is_finished or shard_job.is_failed)
+                progress = sum(shard_progress) * 90 // (100 * max(len(shard_job_ids), 1))
+                status_message = f"Mode split : {done_count}/{len(shard_job_ids)} sous-tâche(s) terminée(s)."
+            if status in ('started', 'deferred') and conn.exists(cancel_key(job.id)):
+                status_message = "Annulation demandée par l'utilisateur..."
             return jsonify({
                 "id": job.id,
                 "status": status,
                 "progress": progress,
                 "status_message": status_message,
                 "result": job.result if status == 'finished' else None,
+                "resumable": bool(meta.get('resumable')), # Annulée / arrêtée avec checkpoint : RQ la voit 'finished'
                 "error": job.exc_info if status == 'failed' else None
             })
         elif session.get('last_job_id') == job_id: # Si la tâche n'est plus dans RQ mais était la dernière
@@ -435,13 +483,17 @@ def cancel_job(job_id):
         job = Job.fetch(job_id, connection=conn)
         if job:
             if job.is_queued or job.is_started or job.is_deferred:
-                job.cancel() # Tente d'annuler la tâche
-                # RQ ne met pas immédiatement le statut à 'canceled'.
-                # Le worker doit traiter l'annulation.
+                # Tâche en cours : job.cancel() ne l'arrête pas. On pose la clé d'annulation, la tâche s'arrête
+                # d'elle-même en quelques secondes, ferme ses navigateurs et garde les lignes déjà scrapées.
+                # Mode split : la clé de la tâche parente arrête toutes les sous-tâches (en cours ou pas encore
+                # démarrées) ; la tâche de fusion s'exécute ensuite normalement sur leurs résultats partiels.
+                # Tâche simple encore en attente : elle n'a rien produit, on l'annule côté RQ.
+                if job.is_started or (job.meta or {}).get('shard_job_ids'):
+                    request_cancellation(conn, job_id)
+                else:
+                    job.cancel()
+                # Pas d'écriture dans job.meta : le worker la réécrit en parallèle (progression), /job-status lit la clé
                 flash(f"Demande d'annulation envoyée pour la tâche {job_id}.", "info")
-                if session.get('last_job_id') == job_id: # Si c'est la tâche active dans l'UI
-                    job.meta['status_message'] = "Annulation demandée par l'utilisateur..."
-                    job.save_meta()
             else:
                 flash(f"La tâche {job_id} ne peut pas être annulée (statut: {job.get_status()}).", "warning")
         else:
@@ -450,6 +502,83 @@ def cancel_job(job_id):
         flash(f"Erreur lors de l'annulation de la tâche {job_id}: {e}", "error")
     return redirect(url_for('home'))
 
+def is_job_resumable(job):
+    """Tâche interrompue : en échec, annulée/arrêtée, ou terminée avec des URLs gardées dans son checkpoint (meta resumable)."""
+    status = job.get_status()
+    return status in ('failed', 'canceled', 'stopped') or (status == 'finished' and bool((job.meta or {}).get('resumable')))
+
+
+def requeue_scraping_job(job):
+    """
+    Remet une sous-tâche / tâche simple en file avec la MÊME job id : run_full_scraping_process recharge
+    alors son checkpoint. En échec : job.requeue() ; sinon (pas dans le FailedJobRegistry) elle est recréée.
+    """
+    if job.get_status() == 'failed':
+        job.requeue() # Même job id, mêmes arguments
+        return
+    job_func_name, job_args, job_kwargs, job_meta = job.func_name, job.args, job.kwargs, job.meta
+    job.delete()
+    q.enqueue(job_func_name,
+              args=job_args,
+              kwargs=job_kwargs,
+              job_timeout='2h', result_ttl=86400,
+              job_id=job.id,
+              meta={key: value for key, value in job_meta.items() if key == 'parent_job_id'})
+
+
+def resume_split_job(reduce_job):
+    """
+    Mode split : reprend les sous-tâches interrompues puis recrée le job reduce (même id) qui dépend d'elles.
+    Le nouveau reduce complète le CSV fusionné précédent avec les CSV gardés de ces sous-tâches.
+    Retourne le nombre de sous-tâches reprises.
+    """
+    shard_job_ids = reduce_job.meta['shard_job_ids']
+    clear_cancellation(conn, reduce_job.id) # Sinon les sous-tâches reprises s'arrêteraient sur la clé de la tâche parente
+    resumed_shards = []
+    for shard_job in Job.fetch_many(shard_job_ids, connection=conn):
+        if shard_job and is_job_resumable(shard_job):
+            requeue_scraping_job(shard_job)
+            resumed_shards.append(shard_job.id)
+    job_args, job_kwargs, job_meta = reduce_job.args, reduce_job.kwargs, reduce_job.meta
+    reduce_job.delete()
+    q.enqueue(merge_shard_results,
+              args=job_args,
+              kwargs=job_kwargs,
+              depends_on=Dependency(jobs=resumed_shards, allow_failure=True) if resumed_shards else None,
+              job_timeout='1h', result_ttl=86400,
+              job_id=reduce_job.id,
+              meta={'shard_job_ids': shard_job_ids, 'output_csv': job_meta.get('output_csv'),
+                    'status_message': f"En attente de {len(resumed_shards)} sous-tâche(s) reprise(s)..."})
+    return len(resumed_shards)
+
+
+# Route pour reprendre une tâche interrompue (worker mort, timeout RQ, annulation...)
+# La tâche est ré-enqueuée avec la MÊME job id : run_full_scraping_process recharge alors
+# son checkpoint (config.CHECKPOINTS_DIR/<job_id>) au lieu de tout recommencer.
+@app.route('/resume-job/<job_id>', methods=['POST'])
+def resume_job(job_id):
+    if not q:
+        flash("Erreur: Connexion à Redis échouée.", "error")
+        return redirect(url_for('home'))
+    try:
+        job = Job.fetch(job_id, connection=conn)
+        status = job.get_status()
+        if status in ('queued', 'started', 'deferred', 'scheduled'):
+            flash(f"La tâche {job_id} est toujours active (statut: {status}).", "warning")
+        elif not is_job_resumable(job):
+            flash(f"La tâche {job_id} est terminée : rien à reprendre.", "warning")
+        elif (job.meta or {}).get('shard_job_ids'):
+            resumed_count = resume_split_job(job)
+            flash(f"Tâche {job_id} relancée : {resumed_count} sous-tâche(s) reprise(s) depuis leur checkpoint, puis nouvelle fusion.", "success")
+            session['last_job_id'] = job_id
+        else:
+            requeue_scraping_job(job)
+            flash(f"Tâche {job_id} relancée (reprise depuis le checkpoint si disponible).", "success")
+            session['last_job_id'] = job_id
+    except Exception as e:
+        flash(f"Erreur lors de la reprise de la tâche {job_id}: {e}", "error")
+    return redirect(url_for('home'))
+
 # Route pour redémarrer les services
 @app.route('/restart_services', methods=['POST'])
 def restart_services():
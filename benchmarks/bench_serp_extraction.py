@@ -0,0 +1,100 @@
+# /home/AlienScraper/benchmarks/bench_serp_extraction.py
+"""
+Compare les deux façons de lire les liens d'une page de résultats Google dans google_search_scraper :
+parcours élément par élément (find_element / get_attribute / .text par conteneur) et script unique
+(SERP_LINKS_SCRIPT, un seul execute_script). Les pages sauvegardées (screenshots/*_GoogleResultsP1_*.html)
+sont ouvertes dans un Chrome headless ; on mesure la latence par page et le nombre de commandes WebDriver.
+
+Usage : python benchmarks/bench_serp_extraction.py [fichiers_html ...] [--repeat 5]
+Sans fichier, toutes les pages GoogleResultsP1 du dossier screenshots/ sont utilisées.
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_DIR))
+
+from selenium import webdriver
+
+from scraper.google_search_scraper import (
+    _collect_serp_links_with_elements, _collect_serp_links_with_script, classify_serp_link,
+)
+
+
+def create_headless_driver():
+    options = webdriver.ChromeOptions()
+    options.add_argument('--headless=new') # Pas de XVFB nécessaire : les pages sont locales
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--window-size=1920,1080')
+    return webdriver.Chrome(options=options)
+
+
+def count_webdriver_commands(driver):
+    """Compte les requêtes HTTP envoyées à chromedriver (chaque appel de driver.execute)."""
+    counter = {'commands': 0}
+    original_execute = driver.execute
+
+    def counting_execute(driver_command, params=None):
+        counter['commands'] += 1
+        return original_execute(driver_command, params)
+    driver.execute = counting_execute
+    return counter
+
+
+def measure(collect_links, driver, counter, repeat):
+    """(ms par page, commandes WebDriver par page, liens) pour une méthode d'extraction."""
+    counter['commands'] = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        serp_links = collect_links(driver)
+    elapsed = time.perf_counter() - start
+    return elapsed / repeat * 1000, counter['commands'] / repeat, serp_links
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latence d'extraction des résultats Google : éléments vs script unique.")
+    parser.add_argument("html_files", nargs="*", help="Pages de résultats Google sauvegardées (HTML).")
+    parser.add_argument("--repeat", type=int, default=5, help="Extractions par page et par méthode.")
+    args = parser.parse_args()
+
+    html_files = [Path(path) for path in args.html_files] or sorted((PROJECT_DIR / "screenshots").glob("*GoogleResultsP1_*.html"))
+    if not html_files:
+        print("Aucune page de résultats Google trouvée (screenshots/*GoogleResultsP1_*.html).")
+        return 1
+
+    driver = create_headless_driver()
+    counter = count_webdriver_commands(driver)
+    totals = {'elements': [0.0, 0.0], 'script': [0.0, 0.0]}
+    try:
+        for html_file in html_files:
+            driver.get(html_file.resolve().as_uri())
+            elements_ms, elements_cmds, elements_links = measure(_collect_serp_links_with_elements, driver, counter, args.repeat)
+            script_ms, script_cmds, script_links = measure(_collect_serp_links_with_script, driver, counter, args.repeat)
+            # Les deux méthodes doivent donner les mêmes résultats une fois filtrés
+            elements_results = [classify_serp_link(link['href'], link['title'], "bench") for link in elements_links]
+            script_results = [classify_serp_link(link['href'], link['title'], "bench") for link in script_links]
+            identical = "identiques" if elements_results == script_results else "DIFFÉRENTS"
+            print(f"{html_file.name} : {len(script_links)} conteneur(s), résultats {identical} | "
+                  f"éléments {elements_ms:.1f} ms ({elements_cmds:.0f} cmd) | script {script_ms:.1f} ms ({script_cmds:.0f} cmd)")
+            totals['elements'][0] += elements_ms
+            totals['elements'][1] += elements_cmds
+            totals['script'][0] += script_ms
+            totals['script'][1] += script_cmds
+    finally:
+        driver.quit()
+
+    page_count = len(html_files)
+    elements_ms, script_ms = totals['elements'][0] / page_count, totals['script'][0] / page_count
+    print(f"\n{page_count} page(s), moyenne par page :")
+    print(f"Élément par élément : {elements_ms:.1f} ms, {totals['elements'][1] / page_count:.0f} commande(s) WebDriver")
+    print(f"Script unique       : {script_ms:.1f} ms, {totals['script'][1] / page_count:.0f} commande(s) WebDriver")
+    print(f"Gain : {elements_ms - script_ms:.1f} ms par page ({(elements_ms - script_ms) / max(elements_ms, 1e-9):.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+# /home/AlienScraper/benchmarks/bench_url_canonical.py
+"""
+Mesure l'effet des clés canoniques (scraper/url_canonical.py) sur des pages de résultats Google
+sauvegardées par google_search_scraper (screenshots/*_GoogleResultsP1_*.html) :
+nombre de visites navigateur avec la déduplication historique (chaîne brute) et avec url_dedupe_key.
+
+Usage : python benchmarks/bench_url_canonical.py [fichiers_html ...] [--seconds-per-page 12]
+Sans fichier, toutes les pages GoogleResultsP1 du dossier screenshots/ sont utilisées.
+"""
+
+import re
+import sys
+import time
+import argparse
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs, unquote
+
+PROJECT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_DIR))
+
+from scraper.url_canonical import canonical_url, url_dedupe_key
+
+HREF_PATTERN = re.compile(r'href="([^"]+)"')
+SOCIAL_DOMAINS = ("facebook.com", "instagram.com")
+
+
+def extract_social_links(html):
+    """Liens Facebook / Instagram d'une page de résultats (liens /url?q=... de Google déballés), dans l'ordre."""
+    links = []
+    for href in HREF_PATTERN.findall(html):
+        href = href.replace("&amp;", "&")
+        if href.startswith("/url?"):
+            href = parse_qs(urlparse(href).query).get("q", [""])[0]
+        href = unquote(href)
+        netloc = urlparse(href).netloc.lower()
+        if any(netloc == domain or netloc.endswith("." + domain) for domain in SOCIAL_DOMAINS):
+            links.append(href)
+    return links
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Visites navigateur économisées par les clés d'URL canoniques.")
+    parser.add_argument("html_files", nargs="*", help="Pages de résultats Google sauvegardées (HTML).")
+    parser.add_argument("--seconds-per-page", type=float, default=12.0,
+                        help="Durée moyenne d'une visite de page détaillée (pacing + chargement), pour estimer le temps gagné.")
+    args = parser.parse_args()
+
+    html_files = [Path(path) for path in args.html_files] or sorted((PROJECT_DIR / "screenshots").glob("*GoogleResultsP1_*.html"))
+    if not html_files:
+        print("Aucune page de résultats Google trouvée (screenshots/*GoogleResultsP1_*.html).")
+        return 1
+
+    all_links = []
+    for html_file in html_files:
+        links = extract_social_links(html_file.read_text(encoding="utf-8", errors="ignore"))
+        raw_unique = len(set(links))
+        canonical_unique = len({url_dedupe_key(link) or link for link in links})
+        print(f"{html_file.name} : {len(links)} lien(s), {raw_unique} unique(s) bruts, {canonical_unique} unique(s) canoniques")
+        all_links.extend(links)
+
+    # Déduplication sur l'ensemble des pages, comme pour toutes les combinaisons d'une même tâche
+    raw_visits = len(set(all_links))
+    canonical_visits = len({url_dedupe_key(link) or link for link in all_links})
+    saved_visits = raw_visits - canonical_visits
+    print(f"\n{len(html_files)} page(s), {len(all_links)} lien(s) Facebook/Instagram")
+    print(f"Visites navigateur, déduplication brute     : {raw_visits}")
+    print(f"Visites navigateur, déduplication canonique : {canonical_visits}")
+    print(f"Visites économisées : {saved_visits} ({saved_visits / max(raw_visits, 1):.1%}), "
+          f"~{saved_visits * args.seconds_per_page / 60:.1f} min à {args.seconds_per_page:.0f} s/page")
+
+    # Coût de la canonicalisation (appliquée une fois par URL entrant dans le pipeline)
+    sample = all_links or ["https://m.facebook.com/example/?locale=fr_FR"]
+    repeat = max(1, 20000 // len(sample))
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for link in sample:
+            canonical_url(link)
+            url_dedupe_key(link)
+    elapsed = time.perf_counter() - start
+    print(f"Coût : {elapsed / (repeat * len(sample)) * 1e6:.1f} µs par URL (canonical_url + url_dedupe_key)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+# /home/AlienScraper/browser_manager.py
+
+import threading
+import traceback
+
+
+# --- Navigateurs persistants entre les tâches d'un même worker ---
+class BrowserManager:
+    """
+    Fournit des navigateurs déjà démarrés et connectés (Facebook/Instagram) aux tâches de scraping.
+    - keep_alive=False (worker RQ classique, un process forké par tâche) : acquire() crée un navigateur,
+      release() le ferme, comme avant.
+    - keep_alive=True (worker.py avec PERSISTENT_BROWSER=1, tâches exécutées dans le process du worker) :
+      release() garde le navigateur au chaud pour la tâche suivante, sauf s'il ne répond plus ou s'il a
+      chargé plus de page_limit pages (Chrome grossit et finit par ralentir), auquel cas il est recyclé.
+    Chaque navigateur est vérifié (health check) et ses connexions revérifiées avant d'être redonné à une tâche.
+    """
+
+    def __init__(self, create_driver, prepare_driver, close_driver, page_limit):
+        self.create_driver = create_driver # () -> driver
+        self.prepare_driver = prepare_driver # (driver, sources_to_use) -> None (connexions FB/Insta)
+        self.close_driver = close_driver # (driver) -> None
+        self.page_limit = page_limit
+        self.keep_alive = False
+        self._idle_drivers = []
+        self._pages_loaded = {} # id(driver) -> nombre de pages chargées depuis sa création
+        self._prepared = set() # id() des navigateurs déjà connectés à Facebook/Instagram
+        self._lock = threading.Lock()
+
+    def is_healthy(self, driver):
+        """Le navigateur répond-il encore (session chromedriver vivante, fenêtre ouverte) ?"""
+        try:
+            return driver.execute_script("return 1;") == 1 and len(driver.window_handles) > 0
+        except Exception:
+            return False
+
+    def acquire(self, sources_to_use, prepare=True):
+        """
+        Retourne un navigateur sain et connecté : un navigateur au chaud si possible, sinon un nouveau.
+        prepare=False : pas de connexion Facebook/Instagram (navigateur dédié à Google en mode streaming) ;
+        prepare_for_detail() le connecte plus tard si besoin.
+        """
+        while True:
+            with self._lock:
+                driver = self._idle_drivers.pop() if self._idle_drivers else None
+            if driver is None:
+                break
+            if self.is_healthy(driver):
+                print(f"[Browser Manager] Réutilisation d'un navigateur au chaud ({self._pages_loaded.get(id(driver), 0)} page(s) chargée(s)).")
+                with self._lock:
+                    # Les sessions ont pu expirer (ou les cookies changer) depuis la tâche précédente : connexions revérifiées
+                    self._prepared.discard(id(driver))
+                if prepare:
+                    self._prepare_or_discard(driver, sources_to_use)
+                return driver
+            print("[Browser Manager] Navigateur au chaud ne répondant plus : recyclage.")
+            self._discard(driver)
+
+        driver = self.create_driver()
+        with self._lock:
+            self._pages_loaded[id(driver)] = 0
+        if prepare:
+            self._prepare_or_discard(driver, sources_to_use)
+        return driver
+
+    def prepare_for_detail(self, driver, sources_to_use):
+        """Connecte à Facebook/Instagram un navigateur obtenu avec prepare=False (sans effet s'il l'est déjà)."""
+        self._prepare_or_discard(driver, sources_to_use)
+
+    def _prepare_or_discard(self, driver, sources_to_use):
+        with self._lock:
+            if id(driver) in self._prepared:
+                return
+        try:
+            self.prepare_driver(driver, sources_to_use)
+        except BaseException: # input() de la connexion manuelle lève EOFError sous RQ
+            self._discard(driver)
+            raise
+        with self._lock:
+            self._prepared.add(id(driver))
+
+    def add_pages(self, driver, page_count=1):
+        """Comptabilise les pages chargées par ce navigateur (pour le recyclage après page_limit pages)."""
+        if driver is None:
+            return
+        with self._lock:
+            self._pages_loaded[id(driver)] = self._pages_loaded.get(id(driver), 0) + page_count
+
+    def release(self, driver, discard=False):
+        """
+        Rend un navigateur en fin de tâche : gardé au chaud (keep_alive) ou fermé.
+        discard=True : toujours fermé (tâche annulée, le navigateur a pu être interrompu en plein chargement).
+        """
+        if driver is None:
+            return
+        pages_loaded = self._pages_loaded.get(id(driver), 0)
+        if not self.keep_alive:
+            self._discard(driver)
+            return
+        if discard:
+            print("[Browser Manager] Tâche annulée : navigateur fermé plutôt que gardé au chaud.")
+            self._discard(driver)
+            return
+        if pages_loaded >= self.page_limit:
+            print(f"[Browser Manager] Navigateur recyclé après {pages_loaded} page(s) (limite {self.page_limit}).")
+            self._discard(driver)
+            return
+        if not self.is_healthy(driver):
+            print("[Browser Manager] Navigateur en mauvais état en fin de tâche : fermeture.")
+            self._discard(driver)
+            return
+        try:
+            driver.get("about:blank") # Libère la mémoire de la dernière page
+        except Exception:
+            self._discard(driver)
+            return
+        with self._lock:
+            self._idle_drivers.append(driver)
+        print(f"[Browser Manager] Navigateur gardé au chaud pour la prochaine tâche ({pages_loaded} page(s) chargée(s)).")
+
+    def _discard(self, driver):
+        with self._lock:
+            self._pages_loaded.pop(id(driver), None)
+            self._prepared.discard(id(driver))
+        try:
+            self.close_driver(driver)
+        except Exception as e:
+            print(f"[Browser Manager] Erreur lors de la fermeture d'un navigateur : {e}")
+            traceback.print_exc()
+
+    def shutdown(self):
+        """Ferme tous les navigateurs au chaud (arrêt du worker)."""
+        with self._lock:
+            idle_drivers, self._idle_drivers = self._idle_drivers, []
+        for driver in idle_drivers:
+            self._discard(driver)
@@ -0,0 +1,100 @@
+# /home/AlienScraper/cancellation.py
+
+import time
+import threading
+
+import config # Import configuration centralisée
+from run_metrics import stage_timers # Les attentes interrompables restent comptées comme pauses
+
+
+CANCEL_KEY_PREFIX = "alienscraper:cancel:"
+
+
+def cancel_key(job_id):
+    return f"{CANCEL_KEY_PREFIX}{job_id}"
+
+
+def request_cancellation(connection, job_id):
+    """Demande l'arrêt d'une tâche en cours (appelé par /cancel-job). La clé expire d'elle-même."""
+    connection.set(cancel_key(job_id), "1", ex=config.CANCEL_KEY_TTL_HOURS * 3600)
+
+
+def clear_cancellation(connection, job_id):
+    """Efface une demande d'annulation (reprise d'une tâche annulée, ou de la tâche parente en mode split)."""
+    connection.delete(cancel_key(job_id))
+
+
+# --- Annulation coopérative d'une tâche de scraping ---
+class CancellationToken:
+    """
+    Drapeau d'arrêt consulté par les boucles longues (combinaisons et pages Google, file du scraping
+    détaillé, défilement des résultats, attentes du pacing). Il est levé par :
+    - une clé Redis alienscraper:cancel:<job_id> posée par /cancel-job (ou celle de la tâche parente
+      en mode split), relue au plus toutes les CANCEL_CHECK_INTERVAL_SECONDS secondes ;
+    - cancel() en mode autonome (commande 'qq').
+    Une fois levé, il le reste jusqu'au reset() de la tâche suivante. Thread-safe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset(None)
+
+    def reset(self, job):
+        """Début de tâche : oublie l'état précédent et efface une demande d'annulation périmée (reprise)."""
+        with self._lock:
+            self.job = job
+            self.cancelled = False
+            self.reason = None
+            self._last_check_at = 0.0
+        connection = getattr(job, 'connection', None)
+        if connection is not None:
+            try:
+                clear_cancellation(connection, job.id)
+            except Exception as e:
+                print(f"[Cancel] Impossible d'effacer la clé d'annulation de la tâche {job.id} : {e}")
+
+    def cancel(self, reason="Arrêt demandé"):
+        with self._lock:
+            if not self.cancelled:
+                self.cancelled = True
+                self.reason = reason
+                print(f"[Cancel] {reason} : arrêt de la tâche, les lignes déjà scrapées sont conservées.")
+
+    def is_cancelled(self):
+        if self.cancelled:
+            return True
+        connection = getattr(self.job, 'connection', None)
+        if connection is None:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_check_at < config.CANCEL_CHECK_INTERVAL_SECONDS:
+                return False
+            self._last_check_at = now
+        job_ids = [self.job.id]
+        parent_job_id = (getattr(self.job, 'meta', None) or {}).get('parent_job_id')
+        if parent_job_id:
+            job_ids.append(parent_job_id)
+        try:
+            if connection.exists(*[cancel_key(job_id) for job_id in job_ids]):
+                self.cancel("Annulation demandée depuis l'interface")
+        except Exception as e:
+            print(f"[Cancel] Erreur lors de la vérification de l'annulation : {e}")
+        return self.cancelled
+
+    def sleep(self, seconds, stage='sleep'):
+        """Comme stage_timers.sleep, mais s'interrompt dans la seconde si la tâche est annulée."""
+        if seconds <= 0:
+            return
+        deadline = time.monotonic() + seconds
+        started_at = time.monotonic()
+        while not self.is_cancelled():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(remaining, 1.0))
+        stage_timers.record(stage, time.monotonic() - started_at, kind='sleep')
+
+
+# Instance partagée du process (une tâche à la fois par worker), comme pacer et stage_timers
+cancel_token = CancellationToken()
@@ -0,0 +1,130 @@
+# /home/AlienScraper/checkpoint.py
+
+import os
+import json
+import shutil
+import threading
+import traceback
+from datetime import datetime
+
+import config # Import configuration centralisée
+
+
+# --- Checkpoint d'une tâche de scraping (reprise après crash / timeout RQ) ---
+class JobCheckpoint:
+    """
+    Persiste l'avancement d'une tâche dans config.CHECKPOINTS_DIR/<job_id>/ :
+    - state.json : combinaisons Google terminées, URLs découvertes mais pas encore scrapées et
+                   chemin du CSV de la tâche (réécrit atomiquement après chaque URL)
+    - scraped_urls.txt : une URL par ligne scrapée en détail (ajout seulement, jamais réécrit)
+    Les lignes elles-mêmes sont déjà persistées par result_writer dans le CSV de la tâche.
+    Ré-enqueuer la même job id recharge cet état au lieu de refaire des heures de navigation.
+    Toutes les méthodes sont thread-safe (appelées depuis le producteur Google et les workers du pool).
+    """
+
+    def __init__(self, job_id, base_dir=None):
+        safe_job_id = "".join(c if c.isalnum() or c in "-_." else "_" for c in str(job_id))
+        self.job_id = job_id
+        self.directory = (base_dir or config.CHECKPOINTS_DIR) / safe_job_id
+        self.state_path = self.directory / "state.json"
+        self.scraped_urls_path = self.directory / "scraped_urls.txt"
+        self.completed_combinations = set()
+        self.pending_items = {} # URL -> url_item (ordre d'insertion conservé)
+        self.scraped_urls = set()
+        self.output_csv = None # Chemin du CSV incrémental de la tâche (réutilisé lors d'une reprise)
+        self._lock = threading.Lock()
+
+    def exists(self):
+        """True si un checkpoint est sur disque (tâche interrompue, reprise possible)."""
+        return self.state_path.exists() or self.scraped_urls_path.exists()
+
+    def load(self):
+        """Charge un checkpoint existant. Retourne True si une reprise est possible."""
+        if not self.exists():
+            return False
+        try:
+            if self.state_path.exists():
+                with open(self.state_path, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+                self.completed_combinations = set(state.get('completed_combinations', []))
+                self.pending_items = {item['URL']: item for item in state.get('pending_items', []) if item.get('URL')}
+                self.output_csv = state.get('output_csv')
+            if self.scraped_urls_path.exists():
+                with open(self.scraped_urls_path, 'r', encoding='utf-8') as f:
+                    self.scraped_urls = {line.strip() for line in f if line.strip()}
+            # Une URL peut être à la fois scrapée et encore "pending" si le kill est tombé entre les deux écritures
+            for url in self.scraped_urls:
+                self.pending_items.pop(url, None)
+            print(f"[Checkpoint] Reprise de la tâche {self.job_id} : {len(self.completed_combinations)} combinaison(s) terminée(s), "
+                  f"{len(self.pending_items)} URL(s) en attente, {len(self.scraped_urls)} URL(s) déjà scrapée(s).")
+            return True
+        except Exception as e:
+            print(f"[Checkpoint] Erreur lors du chargement du checkpoint {self.directory} : {e}. Démarrage à zéro.")
+            traceback.print_exc()
+            self.completed_combinations, self.pending_items, self.scraped_urls, self.output_csv = set(), {}, set(), None
+            return False
+
+    def _save_state_locked(self):
+        """Écrit state.json via un fichier temporaire + os.replace (jamais de fichier à moitié écrit)."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix(".json.tmp")
+        state = {
+            "job_id": self.job_id,
+            "updated_at": datetime.now().isoformat(timespec='seconds'),
+            "output_csv": self.output_csv,
+            "completed_combinations": sorted(self.completed_combinations),
+            "pending_items": list(self.pending_items.values()),
+        }
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, self.state_path)
+
+    def set_output_csv(self, csv_path):
+        """Mémorise le CSV de la tâche pour que la reprise continue d'écrire dans le même fichier."""
+        try:
+            with self._lock:
+                self.output_csv = str(csv_path)
+                self._save_state_locked()
+        except Exception as e:
+            print(f"[Checkpoint] Erreur lors de la sauvegarde du chemin CSV : {e}")
+
+    def add_pending(self, url_item):
+        """Enregistre une URL découverte par la recherche (pas encore scrapée en détail)."""
+        try:
+            with self._lock:
+                self.pending_items[url_item['URL']] = url_item
+                self._save_state_locked()
+        except Exception as e:
+            print(f"[Checkpoint] Erreur lors de la sauvegarde d'une URL en attente : {e}")
+
+    def mark_combination_done(self, keyword_combination):
+        """Marque une combinaison de mots-clés comme entièrement parcourue sur Google."""
+        try:
+            with self._lock:
+                self.completed_combinations.add(keyword_combination)
+                self._save_state_locked()
+        except Exception as e:
+            print(f"[Checkpoint] Erreur lors de la sauvegarde d'une combinaison terminée : {e}")
+
+    def record_scraped(self, url):
+        """Marque l'URL comme scrapée (sa ligne est déjà dans le CSV) et la retire des URLs en attente."""
+        try:
+            with self._lock:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                with open(self.scraped_urls_path, 'a', encoding='utf-8') as f:
+                    f.write(url + "\n")
+                    f.flush()
+                self.scraped_urls.add(url)
+                self.pending_items.pop(url, None)
+                self._save_state_locked()
+        except Exception as e:
+            print(f"[Checkpoint] Erreur lors de la sauvegarde d'une ligne scrapée : {e}")
+
+    def clear(self):
+        """Supprime le checkpoint (appelé une fois la tâche terminée et le CSV fermé)."""
+        try:
+            if self.directory.exists():
+                shutil.rmtree(self.directory)
+                print(f"[Checkpoint] Checkpoint de la tâche {self.job_id} supprimé.")
+        except Exception as e:
+            print(f"[Checkpoint] Erreur lors de la suppression du checkpoint {self.directory} : {e}")
@@ -287,7 +287,9 @@ def consolidate_and_filter_leads():
         "Redirected to login/checkpoint/error page",
         "Error Calling Page Scraper",
         "Timeout loading page elements", # Added Timeout as potentially unreliable
-        "Critical Element Not Found" # Added Critical Element Not Found
+        "Critical Element Not Found", # Added Critical Element Not Found
+        "Skipped - Deadline", # Jamais chargée : échéance de la tâche (mode sans checkpoint)
+        "Skipped - Session Lost" # Jamais chargée : session de la plateforme perdue (mode sans checkpoint)
     ]
 
     for entry in consolidated_entries:
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 # --- Version ---
@@ -19,4 +20,158 @@ LISTES_OUTPUT_DIR = BASE_DIR / "listes"
 RAW_RESULTS_PARENT_DIR = BASE_DIR
 
 # --- Noms de Fichiers ---
-BASE_FINAL_CSV_FILE_NAME = "collected_prospects_detailed" # Utilisé dans main_scraper
\ No newline at end of file
+BASE_FINAL_CSV_FILE_NAME = "collected_prospects_detailed" # Utilisé dans main_scraper
+
+# --- Scraping Détaillé (Parallélisme) ---
+# Nombre de navigateurs Chrome (chacun avec sa propre session FB/Insta) qui se partagent
+# la file des URLs à scraper en détail. 1 = comportement séquentiel historique.
+DETAIL_DRIVER_POOL_SIZE = int(os.getenv('DETAIL_DRIVER_POOL_SIZE', '1'))
+
+# Pipeline recherche → détail en streaming : un navigateur dédié à Google produit les URLs
+# pendant que le pool de détail (DETAIL_DRIVER_POOL_SIZE navigateurs séparés) les consomme.
+# Actif seulement si DETAIL_DRIVER_POOL_SIZE > 1 : avec 1, recherche puis détail sur un seul navigateur.
+# 0 = recherche Google complète d'abord, puis scraping détaillé (ancien comportement).
+STREAMING_SEARCH_PIPELINE = os.getenv('STREAMING_SEARCH_PIPELINE', '1') == '1'
+
+# --- Checkpoints (reprise des tâches longues) ---
+# Un sous-dossier par job id RQ, supprimé une fois le CSV final sauvegardé.
+CHECKPOINTS_DIR = BASE_DIR / "checkpoints"
+CHECKPOINT_ENABLED = os.getenv('CHECKPOINT_ENABLED', '1') == '1'
+
+# --- Mode Split (une requête répartie sur plusieurs workers) ---
+# Nombre de combinaisons de mots-clés par sous-tâche RQ lorsque le mode split est coché dans /scrape
+SPLIT_SHARD_SIZE = int(os.getenv('SPLIT_SHARD_SIZE', '10'))
+
+# --- Cache des résultats détaillés entre tâches ---
+# Une URL scrapée avec succès par une tâche précédente (moins de URL_CACHE_TTL_HOURS) est reprise
+# du cache sans ouvrir le navigateur. Au-delà de URL_CACHE_MAX_ENTRIES, les plus anciennes sont évincées.
+URL_CACHE_ENABLED = os.getenv('URL_CACHE_ENABLED', '1') == '1'
+URL_CACHE_PATH = BASE_DIR / "cache" / "url_results.sqlite"
+URL_CACHE_TTL_HOURS = int(os.getenv('URL_CACHE_TTL_HOURS', '72'))
+URL_CACHE_MAX_ENTRIES = int(os.getenv('URL_CACHE_MAX_ENTRIES', '50000'))
+
+# --- Rythme des requêtes (pacing adaptatif par domaine, voir pacing.py) ---
+# (délai min, délai initial, délai max) en secondes entre deux chargements de page sur un même domaine.
+# Le délai descend vers le min tant que les pages se chargent proprement et double à chaque
+# captcha / checkpoint / redirection vers le login, avec une pause de backoff exponentielle.
+PACING_ENABLED = os.getenv('PACING_ENABLED', '1') == '1'
+PACING_DOMAIN_SETTINGS = {
+    'facebook.com': (3.0, 7.5, 90.0),
+    'instagram.com': (3.0, 7.5, 90.0),
+    'google.com': (2.5, 6.0, 120.0),
+    'default': (1.0, 3.0, 30.0), # Sites génériques (extraction AI)
+}
+PACING_SPEEDUP_FACTOR = 0.9 # Délai x0.9 après chaque page chargée sans blocage
+PACING_BACKOFF_BASE_SECONDS = 30
+PACING_BACKOFF_MAX_SECONDS = 600
+
+# --- Navigateurs persistants dans le worker ---
+# PERSISTENT_BROWSER=1 : worker.py exécute les tâches dans son propre process (SimpleWorker, sans fork)
+# et garde les navigateurs Chrome connectés entre deux tâches au lieu de les relancer à chaque fois.
+# Un navigateur est recyclé s'il ne répond plus ou après BROWSER_RECYCLE_PAGE_LIMIT pages chargées.
+PERSISTENT_BROWSER = os.getenv('PERSISTENT_BROWSER', '0') == '1'
+BROWSER_RECYCLE_PAGE_LIMIT = int(os.getenv('BROWSER_RECYCLE_PAGE_LIMIT', '300'))
+
+# --- Progression des tâches (job.meta dans Redis) ---
+# La progression par URL est regroupée : un seul envoi à Redis au plus toutes les
+# PROGRESS_FLUSH_INTERVAL_SECONDS secondes ou toutes les PROGRESS_FLUSH_EVERY_ITEMS URLs traitées.
+# Les changements d'étape (recherche terminée, fin, erreur...) sont toujours envoyés immédiatement.
+PROGRESS_FLUSH_INTERVAL_SECONDS = float(os.getenv('PROGRESS_FLUSH_INTERVAL_SECONDS', '2'))
+PROGRESS_FLUSH_EVERY_ITEMS = int(os.getenv('PROGRESS_FLUSH_EVERY_ITEMS', '10'))
+
+# --- Chargement HTTP direct des sites génériques (avant le navigateur, voir http_fetch.py) ---
+# Les sites hors Facebook/Instagram sont d'abord chargés en HTTP simple (texte extrait côté serveur).
+# Le navigateur n'est utilisé que si la page est bloquée, rendue en JavaScript ou trop pauvre en texte
+# (moins de HTTP_FETCH_MIN_TEXT_CHARS caractères visibles).
+HTTP_FETCH_ENABLED = os.getenv('HTTP_FETCH_ENABLED', '1') == '1'
+HTTP_FETCH_TIMEOUT_SECONDS = int(os.getenv('HTTP_FETCH_TIMEOUT_SECONDS', '10'))
+HTTP_FETCH_MIN_TEXT_CHARS = int(os.getenv('HTTP_FETCH_MIN_TEXT_CHARS', '400'))
+HTTP_FETCH_POOL_SIZE = 10 # Connexions gardées ouvertes par hôte
+HTTP_FETCH_MAX_BYTES = 3 * 1024 * 1024 # Au-delà, la réponse est tronquée (le texte utile est au début)
+HTTP_FETCH_USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                         "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36")
+
+# --- Ordre du scraping détaillé (voir lead_priority.py) ---
+# Les URLs sont traitées par rendement attendu (type d'URL, rang Google, taux de succès historique
+# par type) au lieu d'un ordre aléatoire : une tâche interrompue a déjà les meilleurs prospects.
+LEAD_PRIORITY_ENABLED = os.getenv('LEAD_PRIORITY_ENABLED', '1') == '1'
+LEAD_YIELD_STATS_PATH = BASE_DIR / "cache" / "lead_yield.sqlite"
+
+# --- Annulation des tâches (voir cancellation.py) ---
+# /cancel-job pose une clé Redis consultée par les boucles de recherche, de scraping détaillé et de pacing :
+# la tâche s'arrête en quelques secondes, ferme ses navigateurs et garde les lignes déjà écrites dans le CSV.
+CANCEL_CHECK_INTERVAL_SECONDS = float(os.getenv('CANCEL_CHECK_INTERVAL_SECONDS', '1'))
+CANCEL_KEY_TTL_HOURS = 24
+
+# --- Journalisation (voir event_log.py) ---
+# LOG_LEVEL : niveau de la console (journald). LOG_MODULE_LEVELS : niveaux par module,
+# ex. LOG_MODULE_LEVELS="google_search=DEBUG,instagram_page=WARNING".
+# Chaque tâche écrit aussi ses événements dans <csv>_events.jsonl (filtrable par URL ou étape).
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_MODULE_LEVELS = dict(
+    (item.split('=', 1)[0].strip(), item.split('=', 1)[1].strip().upper())
+    for item in os.getenv('LOG_MODULE_LEVELS', '').split(',') if '=' in item
+)
+JOB_EVENT_LOG_ENABLED = os.getenv('JOB_EVENT_LOG_ENABLED', '1') == '1'
+
+# --- Textes de débogage des page scrapers (voir debug_payloads.py) ---
+# Le texte brut du bloc Intro (Facebook) / de l'en-tête (Instagram) est déplacé dans <csv>_debug.jsonl
+# au lieu de rester dans les lignes en mémoire et dans le cache d'URLs. 0 : textes simplement supprimés.
+DEBUG_PAYLOADS_ENABLED = os.getenv('DEBUG_PAYLOADS_ENABLED', '1') == '1'
+
+# --- Budget de temps des tâches (voir time_budget.py) ---
+# RQ tue une tâche à son job_timeout ('2h' dans app.py) : la recherche Google (pages par combinaison)
+# et le scraping détaillé (URLs les moins prometteuses abandonnées) sont ajustés pour finir avant,
+# en gardant une réserve pour fermer le CSV / écrire le rapport, et pour clean/extract si demandés.
+TIME_BUDGET_ENABLED = os.getenv('TIME_BUDGET_ENABLED', '1') == '1'
+TIME_BUDGET_SECONDS = int(os.getenv('TIME_BUDGET_SECONDS', '0')) # Hors RQ (0 : pas de limite)
+TIME_BUDGET_WRITE_RESERVE_SECONDS = 120
+TIME_BUDGET_POST_OPTIONS_RESERVE_SECONDS = int(os.getenv('TIME_BUDGET_POST_OPTIONS_RESERVE_SECONDS', '600'))
+# Estimations de départ, remplacées par les durées observées dans la tâche
+TIME_BUDGET_DEFAULT_SECONDS_PER_URL = 20.0
+TIME_BUDGET_DEFAULT_SECONDS_PER_PAGE = 15.0
+TIME_BUDGET_DEFAULT_URLS_PER_PAGE = 5.0
+
+# --- Nouvelles tentatives du scraping détaillé (voir retry_queue.py) ---
+# Les échecs passagers (timeouts de chargement, page IA non chargée...) ne sont pas écrits tout de suite :
+# l'URL est retentée en fin de tâche après un backoff exponentiel. Les URLs encore en attente quand la tâche
+# s'arrête (échéance, annulation) restent dans le checkpoint : /resume-job les retente avec le même backoff.
+RETRY_ENABLED = os.getenv('RETRY_ENABLED', '1') == '1'
+RETRY_MAX_ATTEMPTS = int(os.getenv('RETRY_MAX_ATTEMPTS', '3')) # Première tentative comprise
+RETRY_BASE_DELAY_SECONDS = float(os.getenv('RETRY_BASE_DELAY_SECONDS', '60'))
+RETRY_MAX_DELAY_SECONDS = 600.0
+
+# --- Session Facebook / Instagram perdue en cours de tâche (voir session_breaker.py) ---
+# Après SESSION_BREAKER_THRESHOLD redirections consécutives vers la connexion : une reconnexion depuis
+# les cookies, puis les URLs restantes de la plateforme sont reportées (checkpoint) au lieu d'échouer une à une.
+SESSION_BREAKER_ENABLED = os.getenv('SESSION_BREAKER_ENABLED', '1') == '1'
+SESSION_BREAKER_THRESHOLD = int(os.getenv('SESSION_BREAKER_THRESHOLD', '3'))
+
+# --- Analyse des pages de résultats Google (voir scraper/serp_parser.py) ---
+# SERP_OFFLINE_PARSER=1 : driver.page_source est analysé avec lxml dans un pool de threads pendant que le
+# navigateur passe à la page suivante (au lieu du script d'extraction exécuté dans la page).
+SERP_OFFLINE_PARSER = os.getenv('SERP_OFFLINE_PARSER', '0') == '1'
+SERP_PARSE_WORKERS = int(os.getenv('SERP_PARSE_WORKERS', '2'))
+
+# --- Pagination des résultats Google ---
+# GOOGLE_DIRECT_PAGINATION=1 : les pages suivantes sont chargées par URL (/search?q=...&start=N) au lieu de
+# scroller puis d'attendre le bouton "Suivant". La limite de pages du formulaire devient un objectif de résultats
+# (pages x 10) : avec GOOGLE_RESULTS_PER_PAGE=50 (paramètre num), 5 pages demandées = 1 seul chargement.
+# Google peut ignorer num selon les comptes / régions : garder 10 si les pages reviennent avec 10 résultats.
+GOOGLE_DIRECT_PAGINATION = os.getenv('GOOGLE_DIRECT_PAGINATION', '1') == '1'
+GOOGLE_RESULTS_PER_PAGE = int(os.getenv('GOOGLE_RESULTS_PER_PAGE', '10'))
+
+# --- Recherche Google par URL directe ---
+# GOOGLE_DIRECT_SEARCH_URL=1 : chaque combinaison ouvre directement /search?q=...&hl=... au lieu de taper la requête
+# dans la barre de recherche. Repli sur la saisie (avec gestion du consentement) si un interstitiel s'affiche.
+# hl : langue de l'interface, comme le --lang=fr-FR des navigateurs ; gl : pays des résultats (vide : non envoyé).
+GOOGLE_DIRECT_SEARCH_URL = os.getenv('GOOGLE_DIRECT_SEARCH_URL', '1') == '1'
+GOOGLE_SEARCH_HL = os.getenv('GOOGLE_SEARCH_HL', 'fr')
+GOOGLE_SEARCH_GL = os.getenv('GOOGLE_SEARCH_GL', '')
+
+# --- Cache des pages de résultats Google entre tâches (voir serp_cache.py) ---
+# Les résultats de chaque page sont gardés par requête exacte (opérateurs site: compris) et numéro de page :
+# une recherche déjà faite il y a moins de SERP_CACHE_TTL_HOURS est servie sans ouvrir Google.
+SERP_CACHE_ENABLED = os.getenv('SERP_CACHE_ENABLED', '1') == '1'
+SERP_CACHE_PATH = BASE_DIR / "cache" / "serp_pages.sqlite"
+SERP_CACHE_TTL_HOURS = int(os.getenv('SERP_CACHE_TTL_HOURS', '24'))
@@ -0,0 +1,86 @@
+# /home/AlienScraper/debug_payloads.py
+
+import json
+import threading
+import traceback
+
+import config # Import configuration centralisée
+
+
+# Textes bruts renvoyés par les page scrapers pour vérification manuelle : jamais écrits dans le CSV,
+# mais jusqu'à plusieurs Ko par ligne (texte complet du bloc Intro / de l'en-tête du profil)
+DEBUG_PAYLOAD_FIELDS = (
+    "Full Intro/About Text (from container)",
+    "Full Header Text (from container)",
+)
+
+
+# --- Fichier annexe des textes de débogage d'une tâche ---
+class DebugPayloadSpill:
+    """
+    Retire les champs de DEBUG_PAYLOAD_FIELDS du detailed_data d'une URL et les ajoute à
+    <csv>_debug.jsonl ({"url", champ: texte}), une ligne par URL_Originale_Source : la colonne du CSV
+    suffit à retrouver le texte d'une ligne, rien n'est ajouté au dictionnaire (ni donc au cache d'URLs).
+    Thread-safe : appelé par tous les workers du pool de scraping détaillé.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.spilled_count = 0
+        self.spilled_chars = 0
+        self._lock = threading.Lock()
+        self._file = None # Ouvert au premier texte : pas de fichier vide pour une tâche servie par le cache ; complété après une reprise
+        self._closed = False
+
+    def spill(self, detailed_data):
+        """Déplace les textes de débogage vers le fichier annexe. Retourne True s'ils y ont été écrits."""
+        payload = {field: detailed_data.pop(field) for field in DEBUG_PAYLOAD_FIELDS if field in detailed_data}
+        # Placeholders du scraper ("Not Found (Container not found)"...) : rien d'utile à conserver
+        payload = {field: text for field, text in payload.items() if isinstance(text, str) and text and not text.startswith("Not Found")}
+        if not payload:
+            return False
+        source_url = detailed_data.get('URL_Originale_Source') or detailed_data.get('URL')
+        with self._lock:
+            if self._closed:
+                return False
+            self.spilled_count += 1
+            self.spilled_chars += sum(len(text) for text in payload.values())
+            try:
+                if self._file is None:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    self._file = open(self.path, 'a', encoding='utf-8')
+                self._file.write(json.dumps({'url': source_url, **payload}, ensure_ascii=False) + "\n")
+            except Exception as e:
+                print(f"[Debug Payloads] Erreur d'écriture dans {self.path} : {e}")
+                return False
+        return True
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            if self._file:
+                try:
+                    self._file.close()
+                except Exception:
+                    traceback.print_exc()
+                self._file = None
+        if self.spilled_count:
+            print(f"[Debug Payloads] {self.spilled_count} texte(s) de débogage ({self.spilled_chars // 1024} Ko) déplacé(s) dans {self.path}")
+
+
+def open_debug_payload_spill(output_csv_path):
+    """Fichier annexe <csv>_debug.jsonl de la tâche, ou None (DEBUG_PAYLOADS_ENABLED=0 : textes simplement supprimés)."""
+    if not config.DEBUG_PAYLOADS_ENABLED:
+        return None
+    return DebugPayloadSpill(output_csv_path.with_name(f"{output_csv_path.stem}_debug.jsonl"))
+
+
+def load_debug_payload(debug_path, source_url):
+    """Relit le texte de débogage d'une ligne du CSV par son URL_Originale_Source (vérification manuelle)."""
+    found = None
+    with open(debug_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            payload = json.loads(line)
+            if payload.get('url') == source_url:
+                found = payload # URL rescrapée après une reprise : la dernière ligne est la bonne
+    return found
@@ -0,0 +1,160 @@
+# /home/AlienScraper/event_log.py
+
+import sys
+import json
+import logging
+import argparse
+import threading
+from datetime import datetime
+
+import config # Import configuration centralisée
+
+
+ROOT_LOGGER_NAME = "alienscraper"
+# Champs structurés acceptés dans extra={...} et recopiés dans le journal JSON de la tâche
+EVENT_FIELDS = ("url", "stage", "keyword", "status", "page", "duration_s")
+
+
+# --- Journal JSON lines d'une tâche (un événement par ligne, interrogeable après coup) ---
+class JobEventSink(logging.Handler):
+    """
+    Écrit chaque événement de la tâche dans <csv>_events.jsonl :
+    {"ts", "level", "module", "msg", "job_id", "url", "stage", ...}.
+    Le fichier est bufferisé (pas de flush par ligne) sauf pour les WARNING et plus,
+    pour ne rien perdre d'important en cas de crash du worker.
+    """
+
+    def __init__(self, path, job_id):
+        super().__init__(level=logging.DEBUG)
+        self.path = path
+        self.job_id = job_id
+        self.event_count = 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def emit(self, record):
+        try:
+            event = {
+                'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+                'level': record.levelname,
+                'module': record.name.rpartition('.')[2],
+                'msg': record.getMessage(), # Formatage différé : seulement pour les événements retenus
+                'job_id': self.job_id,
+                'thread': record.threadName,
+            }
+            for field in EVENT_FIELDS:
+                value = getattr(record, field, None)
+                if value is not None:
+                    event[field] = value
+            if record.exc_info:
+                event['exc'] = self.formatException(record.exc_info)
+            self._file.write(json.dumps(event, ensure_ascii=False, default=str) + "\n")
+            self.event_count += 1
+            if record.levelno >= logging.WARNING:
+                self._file.flush()
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        try:
+            self._file.close()
+        finally:
+            super().close()
+
+
+class _ConsoleFormatter(logging.Formatter):
+    """Même rendu que les anciens print : "  [module] message", niveau affiché à partir de WARNING."""
+
+    def format(self, record):
+        message = super().format(record)
+        level = f"{record.levelname} " if record.levelno >= logging.WARNING else ""
+        return f"  [{record.name.rpartition('.')[2]}] {level}{message}"
+
+
+_configure_lock = threading.Lock()
+_configured = False
+
+
+def configure_logging():
+    """Console (stdout, capturée par journald) + niveaux par module de config.py. Idempotent."""
+    global _configured
+    with _configure_lock:
+        if _configured:
+            return
+        root_logger = logging.getLogger(ROOT_LOGGER_NAME)
+        # Les modules sans réglage héritent de LOG_LEVEL : un logger.debug() y est écarté avant tout
+        # formatage du message (coût quasi nul à INFO)
+        root_logger.setLevel(config.LOG_LEVEL)
+        root_logger.propagate = False
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(_ConsoleFormatter())
+        root_logger.addHandler(console_handler)
+        for module_name, level in config.LOG_MODULE_LEVELS.items():
+            logging.getLogger(f"{ROOT_LOGGER_NAME}.{module_name}").setLevel(level)
+        _configured = True
+
+
+def get_logger(module_name):
+    """Logger d'un module (google_search, facebook_page, instagram_page, main...)."""
+    configure_logging()
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{module_name}")
+
+
+def start_job_event_log(job_id, events_path):
+    """Branche le journal JSON lines de la tâche. Retourne le handler (à passer à stop_job_event_log) ou None."""
+    if not config.JOB_EVENT_LOG_ENABLED:
+        return None
+    try:
+        sink = JobEventSink(events_path, job_id)
+        logging.getLogger(ROOT_LOGGER_NAME).addHandler(sink)
+        print(f"[Event Log] Journal des événements de la tâche : {events_path}")
+        return sink
+    except Exception as e:
+        print(f"[Event Log] Impossible d'ouvrir le journal {events_path} : {e}")
+        return None
+
+
+def stop_job_event_log(sink):
+    if sink is None:
+        return
+    logging.getLogger(ROOT_LOGGER_NAME).removeHandler(sink)
+    sink.close()
+    print(f"[Event Log] {sink.event_count} événement(s) enregistré(s) dans {sink.path}")
+
+
+# --- Interrogation d'un journal de tâche : python event_log.py <fichier_events.jsonl> --url ... --stage ... ---
+def query_events(events_path, url=None, stage=None, min_level=None, text=None):
+    """Itère sur les événements du journal qui correspondent aux filtres (URL comparée par clé canonique)."""
+    from scraper.url_canonical import url_dedupe_key
+    url_key = url_dedupe_key(url) if url else None
+    min_levelno = logging.getLevelName(min_level.upper()) if min_level else None
+    with open(events_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                continue # Dernière ligne tronquée par un crash
+            if url_key and url_dedupe_key(event.get('url')) != url_key:
+                continue
+            if stage and not str(event.get('stage', '')).startswith(stage):
+                continue
+            if min_levelno and logging.getLevelName(event.get('level', 'INFO')) < min_levelno:
+                continue
+            if text and text.lower() not in event.get('msg', '').lower():
+                continue
+            yield event
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Filtre le journal d'événements JSON lines d'une tâche de scraping.")
+    parser.add_argument("events_path", help="Fichier <csv>_events.jsonl de la tâche.")
+    parser.add_argument("--url", help="Événements d'une URL (variantes m./?locale=... incluses).")
+    parser.add_argument("--stage", help="Préfixe d'étape (ex: page_load, google_search, facebook_page).")
+    parser.add_argument("--level", help="Niveau minimum (DEBUG, INFO, WARNING, ERROR).")
+    parser.add_argument("--text", help="Texte contenu dans le message.")
+    args = parser.parse_args()
+    match_count = 0
+    for event in query_events(args.events_path, args.url, args.stage, args.level, args.text):
+        match_count += 1
+        print(json.dumps(event, ensure_ascii=False))
+    print(f"{match_count} événement(s).", file=sys.stderr)
@@ -0,0 +1,138 @@
+# /home/AlienScraper/http_fetch.py
+
+import re
+import threading
+
+import config # Import configuration centralisée
+from event_log import get_logger # Journal structuré (console + <csv>_events.jsonl de la tâche)
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    from bs4 import BeautifulSoup
+except ImportError:
+    print("[HTTP Fetch] requests / beautifulsoup4 non trouvés. Les sites génériques seront chargés dans le navigateur.")
+    requests = None
+
+
+logger = get_logger("http_fetch")
+
+# Codes HTTP qui signalent un blocage (anti-bot, rate limit) : le navigateur a plus de chances de passer
+BLOCKED_STATUS_CODES = {401, 403, 429, 503}
+# Marqueurs de pages de challenge / pages qui exigent JavaScript, cherchés dans le titre et le début
+# du texte visible (pas dans le HTML brut : un reCAPTCHA de formulaire de contact ne doit pas compter)
+CHALLENGE_MARKERS = (
+    "just a moment", "attention required", "captcha", "access denied", "accès refusé",
+    "enable javascript", "activer javascript", "javascript is required", "please turn javascript on",
+)
+# Conteneurs racine vides des applications JS (React, Next.js, Vue, Angular...)
+JS_APP_ROOT_PATTERN = re.compile(r'<div[^>]+id=["\'](?:root|app|__next|__nuxt)["\'][^>]*>\s*</div>|ng-app|data-reactroot', re.IGNORECASE)
+# Balises dont le texte n'est pas visible
+INVISIBLE_TAGS = ("script", "style", "noscript", "template", "svg", "iframe", "head")
+
+
+# --- Chargement HTTP direct des sites génériques (sans navigateur) ---
+class HttpPageFetcher:
+    """
+    Charge une page avec une session HTTP (connexions réutilisées, keep-alive) et extrait le titre
+    et le texte visible côté serveur, comme body.text dans le navigateur.
+    fetch() retourne (titre, texte) ou None si la page doit être chargée dans le navigateur :
+    code de blocage, page de challenge, contenu non HTML, ou HTML presque vide (site rendu en JavaScript).
+    Une session par thread : les workers du pool de détail ne partagent pas l'état de requests.Session.
+    """
+
+    def __init__(self, timeout_seconds, min_text_chars, pool_size, user_agent, max_bytes):
+        self.timeout_seconds = timeout_seconds
+        self.min_text_chars = min_text_chars
+        self.max_bytes = max_bytes
+        self.pool_size = pool_size
+        self.user_agent = user_agent
+        self._local = threading.local()
+
+    def _session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=0)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update({
+                "User-Agent": self.user_agent,
+                "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8",
+                "Accept-Language": "fr-FR,fr;q=0.9,en;q=0.8",
+            })
+            self._local.session = session
+        return session
+
+    def _read_body(self, response, url):
+        """Corps de la réponse, lu par morceaux et tronqué à max_bytes (fichier énorme, flux sans fin...)."""
+        chunks = []
+        size = 0
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= self.max_bytes:
+                logger.debug("Réponse tronquée à %d octets.", self.max_bytes, extra={'url': url, 'stage': 'page_load:http'})
+                break
+        return b"".join(chunks)[:self.max_bytes]
+
+    def fetch(self, url):
+        try:
+            response = self._session().get(url, timeout=self.timeout_seconds, allow_redirects=True, stream=True)
+        except Exception as e:
+            logger.info("Échec du chargement HTTP (%s) : passage au navigateur.", type(e).__name__,
+                        extra={'url': url, 'stage': 'page_load:http', 'status': 'fallback'})
+            return None
+        with response: # stream=True : la connexion est rendue au pool à la fermeture
+            return self._extract_page(response, url)
+
+    def _extract_page(self, response, url):
+        if response.status_code >= 400:
+            reason = "blocage probable" if response.status_code in BLOCKED_STATUS_CODES else "page inaccessible"
+            logger.info("Code HTTP %d (%s) : passage au navigateur.", response.status_code, reason,
+                        extra={'url': url, 'stage': 'page_load:http', 'status': response.status_code})
+            return None
+        content_type = response.headers.get("Content-Type", "").lower()
+        if "html" not in content_type:
+            logger.info("Contenu non HTML (%s) : passage au navigateur.", content_type or 'inconnu',
+                        extra={'url': url, 'stage': 'page_load:http', 'status': 'fallback'})
+            return None
+
+        try:
+            html = self._read_body(response, url).decode(response.encoding or "utf-8", errors="replace")
+            soup = BeautifulSoup(html, "lxml")
+            page_title = soup.title.get_text(strip=True) if soup.title else ""
+            for tag in soup(INVISIBLE_TAGS):
+                tag.decompose()
+            body = soup.body or soup
+            text_lines = (line.strip() for line in body.get_text("\n").splitlines())
+            body_text = "\n".join(line for line in text_lines if line)
+        except Exception as e:
+            logger.info("Lecture / analyse HTML impossible (%s) : passage au navigateur.", type(e).__name__,
+                        extra={'url': url, 'stage': 'page_load:http', 'status': 'fallback'})
+            return None
+
+        visible_start = f"{page_title}\n{body_text[:500]}".lower()
+        if any(marker in visible_start for marker in CHALLENGE_MARKERS):
+            logger.info("Page de challenge / JavaScript requis détectée : passage au navigateur.",
+                        extra={'url': url, 'stage': 'page_load:http', 'status': 'challenge'})
+            return None
+
+        if len(body_text) < self.min_text_chars:
+            reason = "application JavaScript" if JS_APP_ROOT_PATTERN.search(html) else "texte visible insuffisant"
+            logger.info("%d caractère(s) de texte (%s) : passage au navigateur.", len(body_text), reason,
+                        extra={'url': url, 'stage': 'page_load:http', 'status': 'fallback'})
+            return None
+        return page_title, body_text
+
+
+def create_http_fetcher():
+    """Fetcher configuré dans config.py, ou None si désactivé / dépendances absentes."""
+    if not config.HTTP_FETCH_ENABLED or requests is None:
+        return None
+    return HttpPageFetcher(config.HTTP_FETCH_TIMEOUT_SECONDS, config.HTTP_FETCH_MIN_TEXT_CHARS,
+                           config.HTTP_FETCH_POOL_SIZE, config.HTTP_FETCH_USER_AGENT, config.HTTP_FETCH_MAX_BYTES)
+
+
+# Instance partagée par main_scraper (None : tout passe par le navigateur comme avant)
+http_fetcher = create_http_fetcher()
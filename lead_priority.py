@@ -0,0 +1,155 @@
+# /home/AlienScraper/lead_priority.py
+
+import queue
+import sqlite3
+import itertools
+import threading
+import traceback
+from urllib.parse import urlparse
+
+import config # Import configuration centralisée
+
+
+# Statuts de scraping détaillé qui produisent un prospect exploitable
+YIELD_STATUSES = {"Success", "Completed", "Partial Success - Intro Block Not Found", "Success - AI Extraction"}
+
+# Rendement attendu par type d'URL tant qu'il n'y a pas assez d'historique
+DEFAULT_KIND_YIELD = {
+    'facebook_page': 0.6,
+    'instagram_profile': 0.5,
+    'facebook_profile_id': 0.4,
+    'generic': 0.3,
+    'facebook_post': 0.02, # Ignorées par scrape_facebook_page ("Skipped - Looks like Post/Photo URL")
+    'instagram_post': 0.05,
+}
+# Poids de l'a priori face à l'historique (équivaut à N tentatives fictives au rendement par défaut)
+PRIOR_WEIGHT = 10
+
+FACEBOOK_POST_SEGMENTS = ('posts', 'photos', 'videos', 'media', 'photo.php', 'video.php', 'story.php', 'permalink.php')
+INSTAGRAM_POST_PREFIXES = ('p/', 'reel/', 'reels/', 'tv/', 'stories/')
+
+
+def url_kind(url, link_type=None):
+    """Type d'URL pour le rendement attendu : forme de l'URL, à défaut Type_Lien_Google."""
+    parsed = urlparse(url or "")
+    netloc = parsed.netloc.lower()
+    path = parsed.path.strip('/').lower()
+    query = parsed.query.lower()
+    link_type = (link_type or "").lower()
+
+    if netloc.endswith('facebook.com') or (not netloc and link_type == 'facebook'):
+        if any(segment in path.split('/') for segment in FACEBOOK_POST_SEGMENTS) or 'fbid=' in query:
+            return 'facebook_post'
+        if path.startswith('profile.php'):
+            return 'facebook_profile_id'
+        return 'facebook_page'
+    if netloc.endswith('instagram.com') or (not netloc and link_type == 'instagram'):
+        if path.startswith(INSTAGRAM_POST_PREFIXES):
+            return 'instagram_post'
+        return 'instagram_profile'
+    return 'generic'
+
+
+# --- Historique de rendement par type d'URL (partagé entre tâches et workers) ---
+class LeadYieldStats:
+    """
+    Tentatives / succès par type d'URL dans une petite base SQLite (config.LEAD_YIELD_STATS_PATH).
+    load() lit l'historique en début de tâche ; record() compte en mémoire ; save() ajoute les
+    compteurs de la tâche en base (UPSERT incrémental, sûr avec plusieurs worker.py).
+    Thread-safe : record() est appelé par tous les workers du pool.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.history = {} # kind -> (tentatives, succès) au chargement
+        self._pending = {} # kind -> [tentatives, succès] de la tâche courante
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        conn.execute("CREATE TABLE IF NOT EXISTS lead_yield (kind TEXT PRIMARY KEY, attempts INTEGER NOT NULL, successes INTEGER NOT NULL)")
+        return conn
+
+    def load(self):
+        try:
+            conn = self._connect()
+            try:
+                self.history = {kind: (attempts, successes) for kind, attempts, successes in
+                                conn.execute("SELECT kind, attempts, successes FROM lead_yield")}
+            finally:
+                conn.close()
+        except Exception as e:
+            print(f"[Lead Priority] Historique de rendement illisible ({e}) : rendements par défaut.")
+            self.history = {}
+        return self
+
+    def expected_yield(self, kind):
+        """Taux de succès lissé : (succès + a priori) / (tentatives + poids de l'a priori)."""
+        attempts, successes = self.history.get(kind, (0, 0))
+        prior = DEFAULT_KIND_YIELD.get(kind, DEFAULT_KIND_YIELD['generic'])
+        return (successes + prior * PRIOR_WEIGHT) / (attempts + PRIOR_WEIGHT)
+
+    def record(self, url_item, scraping_status):
+        kind = url_kind(url_item.get('URL'), url_item.get('Type_Lien_Google'))
+        with self._lock:
+            counts = self._pending.setdefault(kind, [0, 0])
+            counts[0] += 1
+            if scraping_status in YIELD_STATUSES:
+                counts[1] += 1
+
+    def save(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        try:
+            conn = self._connect()
+            try:
+                conn.executemany(
+                    "INSERT INTO lead_yield (kind, attempts, successes) VALUES (?, ?, ?) "
+                    "ON CONFLICT(kind) DO UPDATE SET attempts = attempts + excluded.attempts, successes = successes + excluded.successes",
+                    [(kind, attempts, successes) for kind, (attempts, successes) in pending.items()])
+                conn.commit()
+            finally:
+                conn.close()
+        except Exception as e:
+            print(f"[Lead Priority] Erreur lors de l'enregistrement de l'historique de rendement : {e}")
+            traceback.print_exc()
+
+
+def score_url_item(url_item, yield_stats):
+    """Rendement attendu d'une URL : rendement historique de son type, pondéré par son rang Google."""
+    kind = url_kind(url_item.get('URL'), url_item.get('Type_Lien_Google'))
+    rank = url_item.get('Rang_Google') or 0
+    rank_weight = 1.0 / (1.0 + 0.05 * max(0, rank - 1)) # Rang 1 : x1, rang 21 : x0.5
+    return yield_stats.expected_yield(kind) * rank_weight
+
+
+# --- File de travail du pool de détail ordonnée par rendement attendu ---
+class LeadPriorityQueue(queue.PriorityQueue):
+    """
+    Même interface que queue.Queue (put / get / task_done) pour detail_worker_loop, mais get()
+    renvoie d'abord l'URL au meilleur rendement attendu : une tâche annulée ou limitée dans le temps
+    a déjà les meilleurs prospects. À score égal, ordre d'arrivée. Les sentinelles None sortent en dernier.
+    """
+
+    def __init__(self, yield_stats):
+        super().__init__()
+        self.yield_stats = yield_stats
+        self._arrival = itertools.count()
+
+    def put(self, url_item, block=True, timeout=None):
+        priority = float('inf') if url_item is None else -score_url_item(url_item, self.yield_stats)
+        super().put((priority, next(self._arrival), url_item), block, timeout)
+
+    def get(self, block=True, timeout=None):
+        return super().get(block, timeout)[2]
+
+
+def create_work_queue():
+    """File du pool de détail : ordonnée par rendement (LEAD_PRIORITY_ENABLED) ou FIFO. Retourne (file, stats)."""
+    if not config.LEAD_PRIORITY_ENABLED:
+        return queue.Queue(), None
+    yield_stats = LeadYieldStats(config.LEAD_YIELD_STATS_PATH).load()
+    return LeadPriorityQueue(yield_stats), yield_stats
@@ -1,18 +1,19 @@
 # /home/AlienScraper/main_scraper.py
 
 import time
+_MODULE_IMPORT_STARTED = time.monotonic() # Mesure du coût d'import de toute la pile (selenium, uc, genai...)
 import random
 import sys
 import os
 import csv
 import threading
 import traceback
-from datetime import datetime
+from datetime import datetime, timezone
 from itertools import product # Garder cet import
 from pathlib import Path # Importer Path
-from urllib.parse import urlparse, urlunparse, parse_qs
 import re # Import regex for phone number cleaning
 from rq import get_current_job # Importer pour la progression
+from rq.job import Job # Lecture des sous-tâches (mode split)
 import json # Pour parser la réponse de l'IA
 
 # --- Import Google Generative AI Library pour Main Scraper ---
@@ -32,6 +33,23 @@ except ImportError:
 try:
     import config # Import configuration centralisée
     from scraper import google_search_scraper # Import depuis le sous-dossier
+    from scraper.url_canonical import canonical_url, url_dedupe_key # Clés de déduplication des URLs
+    from checkpoint import JobCheckpoint # Checkpoints par tâche pour la reprise
+    from result_writer import IncrementalResultWriter # Écriture CSV au fil de l'eau
+    from url_cache import open_url_cache # Cache des résultats détaillés partagé entre tâches
+    from serp_cache import open_serp_cache # Cache des pages de résultats Google partagé entre tâches
+    from pacing import pacer # Rythme adaptatif par domaine (remplace les pauses fixes)
+    from run_metrics import stage_timers, worker_peak_rss_mb, current_rss_mb # Chronométrage par étape (job.meta + rapport JSON), mémoire
+    from debug_payloads import open_debug_payload_spill, DEBUG_PAYLOAD_FIELDS # Textes de débogage hors des lignes en mémoire
+    from time_budget import create_time_budget # Échéance de la tâche (job_timeout) : pages Google et URLs ajustées
+    from session_breaker import create_session_breaker, COOKIE_FILES # Session FB/Insta perdue : reconnexion puis report
+    from retry_queue import create_retry_queue, is_retryable_status, ATTEMPTS_FIELD, RETRY_AFTER_FIELD # Échecs passagers retentés en fin de tâche
+    from browser_manager import BrowserManager # Navigateurs gardés au chaud entre les tâches
+    from progress_reporter import ProgressReporter # Progression job.meta regroupée (moins d'allers-retours Redis)
+    from http_fetch import http_fetcher # Chargement HTTP direct des sites génériques (None si désactivé)
+    from lead_priority import create_work_queue # File de détail ordonnée par rendement attendu
+    from cancellation import cancel_token # Annulation coopérative (clé Redis posée par /cancel-job)
+    from event_log import get_logger, start_job_event_log, stop_job_event_log # Journal structuré par tâche
 
     # Les imports suivants sont dynamiques et gérés ci-dessous,
     # mais on garde les références pour les fonctions ensure_login
@@ -80,6 +98,16 @@ except ImportError:
     extract_leads = None # Set to None if import fails
 
 
+# --- Coût d'import de la pile de scraping ---
+# Si worker.py a préchargé ce module (PRELOADED_BY_WORKER passé à True), les tâches en héritent, qu'elles
+# tournent dans un process enfant forké ou dans le process du worker (PERSISTENT_BROWSER) : l'import ne coûte rien.
+MODULE_IMPORT_SECONDS = time.monotonic() - _MODULE_IMPORT_STARTED
+PRELOADED_BY_WORKER = False
+print(f"[Main Scraper] Pile de scraping importée en {MODULE_IMPORT_SECONDS:.2f}s (PID {os.getpid()}).")
+
+logger = get_logger("main")
+
+
 # --- Configuration Globale (Utilisation de config.py) ---
 # LEADS_CSV_FINAL_PATH est maintenant défini dans config.py
 # BASE_FINAL_CSV_FILE_NAME est maintenant défini dans config.py
@@ -165,6 +193,7 @@ def user_input_listener():
                 stop_scraping_full = True
                 stop_scraping_urls_only = True # Also stop URL search for current combo when stopping full
                 skip_url = True # Also skip current URL when stopping full
+                cancel_token.cancel("Arrêt complet demandé (qq)") # Arrête aussi run_full_scraping_process
                 print("Signalé: Arrêt complet demandé. Sauvegarde en cours...")
         except EOFError: # Handle Ctrl+D or end of input stream
              print("\nEOF detected, stopping listener.")
@@ -177,17 +206,46 @@ def user_input_listener():
             print(f"Erreur lors de la lecture de l'entrée utilisateur : {type(e).__name__} - {e}")
             time.sleep(0.1)
 
+# --- Chemin du fichier CSV de résultats (dossier daté + horodatage) ---
+def build_results_csv_path(base_filename, job_id=None):
+    """
+    Retourne config.RAW_RESULTS_PARENT_DIR/Scraping_Results_<date>/<base_filename>_<horodatage>[_<job_id>].csv
+    en créant le dossier du jour si besoin (fallback : config.BASE_DIR).
+    job_id évite que deux tâches lancées dans la même seconde (sous-tâches du mode split sur
+    plusieurs workers) écrivent dans le même fichier.
+    """
+    # Création du dossier de résultats (utilise config.py)
+    today_date_str = datetime.now().strftime("Scraping_Results_%d%m%Y")
+    results_folder_path = config.RAW_RESULTS_PARENT_DIR / today_date_str # Utilise le dossier parent défini dans config.py
+
+    if not results_folder_path.exists():
+        try:
+            results_folder_path.mkdir(parents=True, exist_ok=True)
+            print(f"[Main - Save CSV] Création du dossier de résultats : {results_folder_path}")
+        except OSError as e:
+            print(f"[Main - Save CSV] Erreur lors de la création du dossier de résultats {results_folder_path}: {e}")
+            results_folder_path = config.BASE_DIR # Fallback to base directory from config
+
+    # Génération du chemin final pour le fichier CSV
+    timestamp = datetime.now().strftime("%d%m%Y_%H%M%S")
+    if job_id:
+        safe_job_id = "".join(c if c.isalnum() or c in "-_" else "_" for c in str(job_id))
+        return results_folder_path / f"{base_filename}_{timestamp}_{safe_job_id}.csv"
+    return results_folder_path / f"{base_filename}_{timestamp}.csv"
+
 # --- Fonction pour sauvegarder la liste de dictionnaires en CSV (Globale) ---
 def save_results_to_csv(results_list, base_filename, headers):
     """
-    Sauvegarde une liste de dictionnaires dans un fichier CSV, avec déduplication basée sur 'URL_Originale_Source'.
+    Sauvegarde une liste de dictionnaires dans un fichier CSV, avec déduplication basée sur la clé canonique
+    de 'URL_Originale_Source' (url_dedupe_key).
     Utilise config.RAW_RESULTS_PARENT_DIR.
+    Retourne le chemin du fichier écrit, ou None si rien n'a été écrit.
     """
     print(f"\n[Main - Save CSV] Sauvegarde de {len(results_list)} entrées uniques dans un fichier CSV...")
 
     if not results_list:
         print("[Main - Save CSV] Aucune donnée à sauvegarder.")
-        return
+        return None
 
     seen_keys = set()
     unique_results = []
@@ -196,8 +254,8 @@ def save_results_to_csv(results_list, base_filename, headers):
     for idx, result in enumerate(results_list):
         # Ensure result is a dictionary and has a string 'URL_Originale_Source'
         if isinstance(result, dict) and 'URL_Originale_Source' in result and isinstance(result['URL_Originale_Source'], str) and result['URL_Originale_Source'].strip():
-            # Use strip() on the URL for more robust deduplication
-            cleaned_original_url = result['URL_Originale_Source'].strip()
+            # Clé canonique : m./fr-fr./?locale=..., slash final... ne créent pas de doublons
+            cleaned_original_url = url_dedupe_key(result['URL_Originale_Source']) or result['URL_Originale_Source'].strip()
             if cleaned_original_url not in seen_keys:
                 unique_results.append(result)
                 seen_keys.add(cleaned_original_url)
@@ -209,23 +267,9 @@ def save_results_to_csv(results_list, base_filename, headers):
 
     if not unique_results:
         print("[Main - Save CSV] Aucune entrée unique valide à sauvegarder après filtrage.")
-        return
-
-    # Création du dossier de résultats (utilise config.py)
-    today_date_str = datetime.now().strftime("Scraping_Results_%d%m%Y")
-    results_folder_path = config.RAW_RESULTS_PARENT_DIR / today_date_str # Utilise le dossier parent défini dans config.py
+        return None
 
-    if not results_folder_path.exists():
-        try:
-            results_folder_path.mkdir(parents=True, exist_ok=True)
-            print(f"[Main - Save CSV] Création du dossier de résultats : {results_folder_path}")
-        except OSError as e:
-            print(f"[Main - Save CSV] Erreur lors de la création du dossier de résultats {results_folder_path}: {e}")
-            results_folder_path = config.BASE_DIR # Fallback to base directory from config
-
-    # Génération du chemin final pour le fichier CSV (utilise config.py)
-    timestamp = datetime.now().strftime("%d%m%Y_%H%M%S")
-    final_filepath = results_folder_path / f"{config.BASE_FINAL_CSV_FILE_NAME}_{timestamp}.csv" # Utilise le nom de base défini dans config.py
+    final_filepath = build_results_csv_path(base_filename)
 
     # Écriture des résultats dans le fichier CSV
     try:
@@ -236,9 +280,11 @@ def save_results_to_csv(results_list, base_filename, headers):
             writer.writeheader()
             writer.writerows(unique_results)
         print(f"[Main - Save CSV] Fichier CSV sauvegardé : {final_filepath}")
+        return final_filepath
     except Exception as e:
         print(f"[Main - Save CSV] Erreur lors de la sauvegarde du fichier CSV : {e}")
         traceback.print_exc()
+        return None
 
 # --- Fonction pour générer les combinaisons ---
 def generate_keyword_combinations(keywords_lists):
@@ -257,7 +303,7 @@ def generate_keyword_combinations(keywords_lists):
 def save_debug_info(driver, error_type, context_name="general"):
     """Sauvegarde un screenshot et le code source de la page en cas d'erreur."""
     if not driver:
-        print("    [Debug Save] Driver non disponible, impossible de sauvegarder les infos de débogage.")
+        logger.warning("Driver non disponible, impossible de sauvegarder les infos de débogage.", extra={'stage': 'debug_save'})
         return
 
     try:
@@ -276,19 +322,19 @@ def save_debug_info(driver, error_type, context_name="general"):
         try:
             current_url_debug = driver.current_url
             driver.save_screenshot(str(screenshot_path))
-            print(f"    [Debug Save] Screenshot sauvegardé : {screenshot_path}")
+            logger.info("Screenshot sauvegardé : %s", screenshot_path, extra={'url': current_url_debug, 'stage': 'debug_save'})
         except Exception as e_ss:
-            print(f"    [Debug Save] Erreur lors de la sauvegarde du screenshot : {e_ss}")
+            logger.warning("Erreur lors de la sauvegarde du screenshot : %s", e_ss, extra={'url': current_url_debug, 'stage': 'debug_save'})
 
         try:
             with open(html_path, "w", encoding="utf-8") as f:
                 f.write(driver.page_source)
-            print(f"    [Debug Save] Code source HTML sauvegardé : {html_path}")
+            logger.info("Code source HTML sauvegardé : %s", html_path, extra={'url': current_url_debug, 'stage': 'debug_save'})
         except Exception as e_html:
-            print(f"    [Debug Save] Erreur lors de la sauvegarde du code HTML : {e_html}")
-        print(f"    [Debug Save] URL actuelle lors de l'erreur: {current_url_debug}")
+            logger.warning("Erreur lors de la sauvegarde du code HTML : %s", e_html, extra={'url': current_url_debug, 'stage': 'debug_save'})
+        logger.info("URL actuelle lors de l'erreur : %s", current_url_debug, extra={'url': current_url_debug, 'stage': 'debug_save', 'status': error_type})
     except Exception as e_debug:
-        print(f"    [Debug Save] Erreur majeure dans save_debug_info : {e_debug}")
+        logger.error("Erreur majeure dans save_debug_info : %s", e_debug, extra={'stage': 'debug_save'})
 
 # --- Interface utilisateur pour les mots-clés (pour mode autonome) ---
 def get_keywords_input_main():
@@ -309,72 +355,6 @@ def get_keywords_input_main():
     print("---------------------------------")
     return keywords_lists
 
-# --- Utility function to clean URLs ---
-def clean_url(url):
-    """
-    Cleans a URL by removing query parameters and fragments, preserving scheme, netloc, and path.
-    Handles common social media URL structures.
-    Returns the cleaned URL string or "Not Found" if the input is invalid.
-    """
-    if not url or not isinstance(url, str) or url in ["Not Found", "N/A", "N/A (Insta)", "N/A (FB)", "Not Generated"]:
-        return "Not Found"
-
-    try:
-        parsed_url = urlparse(url)
-        scheme = parsed_url.scheme
-        netloc = parsed_url.netloc
-        path = parsed_url.path.strip('/') # Remove leading/trailing slashes initially
-
-        # Specific cleaning based on domain
-        if "instagram.com" in netloc.lower():
-             path_segments = [segment for segment in path.split('/') if segment]
-             if path_segments:
-                 # Assume the first segment after the domain is the username
-                 path = '/' + path_segments[0] + '/' # Add trailing slash back for convention
-             else:
-                  path = '/' # Root Instagram URL (unlikely for a profile)
-
-        elif "facebook.com" in netloc.lower():
-             # Handle profile.php?id=... specifically by preserving the id query parameter
-             if parsed_url.path.lower().strip('/') == 'profile.php' and 'id' in parse_qs(parsed_url.query):
-                 query_params = parse_qs(parsed_url.query)
-                 query = f"?id={query_params['id'][0]}" if query_params['id'] else ""
-                 path = parsed_url.path # Keep original path /profile.php
-                 # Reconstruct with preserved query
-                 cleaned_url = urlunparse((scheme, netloc, path, '', query, ''))
-                 return cleaned_url.strip() # Return early for this specific case
-
-             # For other Facebook URLs (pages, groups), just remove query and fragment
-             path = parsed_url.path # Keep the full path
-
-        elif "wa.me" in netloc.lower():
-             # Keep only the number part in the path
-             path_segments = [segment for segment in path.split('/') if segment]
-             if path_segments:
-                 path = '/' + path_segments[0] # Should be just the number
-             else:
-                  path = '/' # Should not happen for a valid wa.me link
-
-        elif not path: # If path is empty after strip, use '/'
-             path = '/'
-        else: # Add leading and trailing slashes back to the path for consistency unless it's a file (like .html)
-             # Heuristic: Add trailing slash if it doesn't look like a file path
-             if '.' not in path.split('/')[-1]:
-                  path = '/' + path + '/'
-             else:
-                  path = '/' + path # Just add leading slash for file paths
-
-
-        # Reconstruct the URL without query parameters and fragment, but keep cleaned path
-        cleaned_url = urlunparse((scheme, netloc, path, '', '', '')) # scheme, netloc, path, params, query, fragment
-
-        return cleaned_url.strip()
-
-    except Exception:
-        # If parsing or cleaning fails, return "Not Found"
-        return "Not Found"
-
-
 # --- Fonction pour mapper les données collectées au format CSV final ---
 def map_data_to_final_format(detailed_data):
     """
@@ -473,11 +453,13 @@ def map_data_to_final_format(detailed_data):
 def extract_info_with_ai(driver, url, model, source_info):
     """
     Tente d'extraire des informations d'une URL générique en utilisant l'IA (Gemini).
+    La page est d'abord chargée en HTTP direct (http_fetch.py) ; le navigateur n'est utilisé
+    que pour les pages bloquées ou rendues en JavaScript.
     Retourne un dictionnaire avec les données extraites et un statut.
     """
-    print(f"    [AI Extract] Tentative d'extraction AI pour : {url}")
+    logger.info("Tentative d'extraction AI pour : %s", url, extra={'url': url, 'stage': 'ai_extract'})
     if not model:
-        print("    [AI Extract] Modèle AI non disponible. Skip.")
+        logger.info("Modèle AI non disponible. Skip.", extra={'url': url, 'stage': 'ai_extract', 'status': 'skipped'})
         return {
             "Statut_Scraping_Detail": "Skipped - AI Model Unavailable",
             "Message_Erreur_Detail": "Gemini model not loaded in main_scraper.",
@@ -487,25 +469,40 @@ def extract_info_with_ai(driver, url, model, source_info):
     extracted_data_ai = {}
     status = "Error - AI Extraction Failed"
     error_message = "Unknown AI extraction error."
+    max_chars = 15000
+    content_for_ai = None
+    loaded_in_browser = False # Pour ne pas sauvegarder la page du navigateur si elle n'a pas servi
 
     try:
-        driver.get(url)
-        from selenium.webdriver.support.ui import WebDriverWait
-        from selenium.common.exceptions import NoSuchElementException
-        WebDriverWait(driver, 20).until(
-            lambda d: d.execute_script('return document.readyState') == 'complete'
-        )
-        time.sleep(random.uniform(2, 4))
-
-        try:
-            body_text = driver.find_element(By.TAG_NAME, 'body').text
-            page_title = driver.title
-            max_chars = 15000
+        pacer.wait_turn(url)
+        # --- Chemin rapide : HTTP simple (la plupart des sites de petites entreprises sont en HTML statique) ---
+        http_page = None
+        if http_fetcher:
+            with stage_timers.timed('page_load:http'):
+                http_page = http_fetcher.fetch(url)
+        if http_page:
+            page_title, body_text = http_page
+            logger.info("Page chargée en HTTP direct (%d caractères), sans navigateur.", len(body_text), extra={'url': url, 'stage': 'page_load:http'})
             content_for_ai = f"Title: {page_title}\n\nBody Text (first {max_chars} chars):\n{body_text[:max_chars]}"
-        except NoSuchElementException:
-            print("    [AI Extract] Impossible de trouver le body de la page.")
-            error_message = "Could not find body element."
-            content_for_ai = None
+        else:
+            # --- Navigateur : pages rendues en JavaScript, bloquées ou HTTP désactivé ---
+            loaded_in_browser = True
+            with stage_timers.timed('page_load:ai'):
+                driver.get(url)
+            from selenium.webdriver.support.ui import WebDriverWait
+            from selenium.common.exceptions import NoSuchElementException
+            WebDriverWait(driver, 20).until(
+                lambda d: d.execute_script('return document.readyState') == 'complete'
+            )
+            stage_timers.sleep(random.uniform(2, 4), 'render_wait:ai')
+
+            try:
+                body_text = driver.find_element(By.TAG_NAME, 'body').text
+                page_title = driver.title
+                content_for_ai = f"Title: {page_title}\n\nBody Text (first {max_chars} chars):\n{body_text[:max_chars]}"
+            except NoSuchElementException:
+                logger.warning("Impossible de trouver le body de la page.", extra={'url': url, 'stage': 'page_load:ai'})
+                error_message = "Could not find body element."
 
         if content_for_ai:
             prompt = f"""
@@ -529,13 +526,14 @@ def extract_info_with_ai(driver, url, model, source_info):
             ---
             Réponds SEULEMENT avec le JSON ou le mot COMPLEX.
             """
-            print("    [AI Extract] Appel de l'API Gemini...")
-            response = model.generate_content(prompt)
+            logger.debug("Appel de l'API Gemini...", extra={'url': url, 'stage': 'gemini_call:ai'})
+            with stage_timers.timed('gemini_call:ai'):
+                response = model.generate_content(prompt)
             response_text = response.text.strip()
-            print(f"    [AI Extract] Réponse brute de l'IA: {response_text[:100]}...")
+            logger.debug("Réponse brute de l'IA : %.100s...", response_text, extra={'url': url, 'stage': 'gemini_call:ai'})
 
             if response_text == "COMPLEX":
-                print("    [AI Extract] L'IA a jugé le site complexe ou sans informations pertinentes.")
+                logger.info("L'IA a jugé le site complexe ou sans informations pertinentes.", extra={'url': url, 'stage': 'ai_extract', 'status': 'complex'})
                 status = "Skipped - AI Judged Complex"
                 error_message = "AI determined the site is complex or lacks relevant info."
             else:
@@ -551,29 +549,29 @@ def extract_info_with_ai(driver, url, model, source_info):
                     extracted_data_ai = ai_json_data
                     status = "Success - AI Extraction"
                     error_message = ""
-                    print("    [AI Extract] Informations extraites par l'IA.")
+                    logger.debug("Informations extraites par l'IA.", extra={'url': url, 'stage': 'ai_extract'})
                 except json.JSONDecodeError:
-                    print("    [AI Extract] Erreur: La réponse de l'IA n'est pas un JSON valide et n'est pas 'COMPLEX'.")
+                    logger.warning("La réponse de l'IA n'est pas un JSON valide et n'est pas 'COMPLEX'.", extra={'url': url, 'stage': 'ai_extract'})
                     error_message = "AI response was not valid JSON or 'COMPLEX'."
                     status = "Error - AI Invalid Response"
                 except Exception as e_parse:
-                    print(f"    [AI Extract] Erreur lors du parsing de la réponse JSON de l'IA : {e_parse}")
+                    logger.warning("Erreur lors du parsing de la réponse JSON de l'IA : %s", e_parse, extra={'url': url, 'stage': 'ai_extract'})
                     error_message = f"Error parsing AI JSON response: {e_parse}"
                     status = "Error - AI Response Parsing Failed"
 
     except WebDriverException as e_nav:
-        print(f"    [AI Extract] Erreur WebDriver lors de la navigation ou de l'extraction de contenu pour {url}: {e_nav}")
+        logger.error("Erreur WebDriver lors de la navigation ou de l'extraction de contenu pour %s : %s", url, e_nav, extra={'url': url, 'stage': 'page_load:ai'})
         error_message = f"WebDriver error accessing page: {type(e_nav).__name__}"
         if driver: # 'driver' est passé à extract_info_with_ai
             save_debug_info(driver, f"AI_WebDriver_{type(e_nav).__name__}", url)
         status = "Error - AI Page Load Failed"
     except Exception as e_ai_call:
-        print(f"    [AI Extract] Erreur lors de l'appel à l'API Gemini pour {url}: {e_ai_call}")
+        logger.error("Erreur lors de l'appel à l'API Gemini pour %s : %s", url, e_ai_call, extra={'url': url, 'stage': 'gemini_call:ai'})
         if hasattr(e_ai_call, 'prompt_feedback') and hasattr(e_ai_call.prompt_feedback, 'block_reason'):
              error_message = "AI content blocked (safety filters)."
              status = "Error - AI Content Blocked"
         else:
-             if driver: # 'driver' est passé à extract_info_with_ai
+             if driver and loaded_in_browser: # 'driver' est passé à extract_info_with_ai
                  save_debug_info(driver, f"AI_API_{type(e_ai_call).__name__}", url)
              error_message = f"Error calling AI API: {type(e_ai_call).__name__}"
              status = "Error - AI API Call Failed"
@@ -584,24 +582,368 @@ def extract_info_with_ai(driver, url, model, source_info):
 
     return final_data
 
+# --- Initialisation d'un navigateur Chrome furtif ---
+def create_chrome_driver():
+    """
+    Crée et retourne une instance uc.Chrome configurée pour les environnements headless/VM/XVFB.
+    Utilisé pour le navigateur principal comme pour chaque navigateur du pool de scraping détaillé.
+    """
+    # Spécifier explicitement le chemin de l'exécutable Chromium pour Linux
+    options = uc.ChromeOptions()
+
+    # Options recommandées pour les environnements headless/VM/XVFB
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--disable-gpu') # Important pour XVFB
+    options.add_argument('--window-size=1920,1080') # Peut aider au rendu
+    # options.add_argument('--headless=new') # À ne PAS utiliser avec XVFB
+    # Options supplémentaires pour la stabilité / furtivité
+    options.add_argument('--start-maximized') # Peut aider avec XVFB si window-size ne suffit pas
+    options.add_argument('--disable-extensions') # Désactiver les extensions qui pourraient interférer
+    options.add_argument('--disable-popup-blocking') # Peut être utile pour certains sites
+    options.add_argument('--ignore-certificate-errors') # À utiliser avec prudence
+    options.add_argument('--lang=fr-FR,fr;q=0.9,en-US;q=0.8,en;q=0.7') # Préférer le français
+    options.add_argument('--disable-blink-features=AutomationControlled') # uc le fait déjà, mais pour être sûr
+    options.add_argument(f"--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/11{random.randint(0,9)}.0.0.0 Safari/537.36") # Randomiser un peu plus
+
+    # Vérifie si ce chemin est correct sur ton système avec 'which chromium-browser'
+    # Essayez d'abord google-chrome si vous l'avez installé, sinon chromium-browser
+    chromium_path_chrome = "/usr/bin/google-chrome"
+    chromium_path_chromium = "/usr/bin/chromium-browser"
+
+    # Vérifier si le fichier existe avant de l'utiliser
+    with stage_timers.timed('chrome_startup'):
+        if Path(chromium_path_chrome).is_file():
+            print(f"Utilisation de Google Chrome trouvé à {chromium_path_chrome}")
+            driver = uc.Chrome(browser_executable_path=chromium_path_chrome, options=options)
+        elif Path(chromium_path_chromium).is_file():
+            print(f"Utilisation de Chromium Browser trouvé à {chromium_path_chromium}")
+            driver = uc.Chrome(browser_executable_path=chromium_path_chromium, options=options)
+        else:
+            print(f"ERREUR: Exécutable Chrome/Chromium non trouvé à {chromium_path_chrome} ou {chromium_path_chromium}. Tentative sans chemin spécifique.")
+            driver = uc.Chrome(options=options) # Laisse uc essayer de le trouver
+
+    print("Navigateur Chrome furtif initialisé par main_scraper.")
+    return driver
+
+
+# --- Connexions Facebook / Instagram pour un navigateur donné ---
+def ensure_social_logins(driver, sources_to_use):
+    """
+    Assure les sessions Facebook et Instagram (cookies puis connexion manuelle) sur le driver fourni.
+    Chaque navigateur du pool a sa propre session, cette fonction est donc appelée une fois par driver.
+    """
+    # Connexion Facebook (nécessaire pour scraper des pages FB trouvées par Google)
+    if facebook_page_scraper and 'google' in sources_to_use:
+        print("\nTentative d'assurer la connexion Facebook...")
+        # S'assurer que COOKIES_FILE utilise config.py
+        fb_cookies_path = config.BASE_DIR / "facebook_cookies.json"
+        with stage_timers.timed('ensure_facebook_login'):
+            session_active_fb = facebook_page_scraper.ensure_facebook_login(driver, fb_cookies_path)
+        if not session_active_fb:
+            print("Attention : Connexion Facebook échouée ou non établie. Le scraping des pages Facebook pourrait être limité.")
+    else:
+        print("\nSkip tentative d'assurer la connexion Facebook (module non importé ou pas de source Google choisie).")
+
+    # Connexion Instagram (nécessaire pour scraper des pages Insta trouvées par Google)
+    if instagram_page_scraper and 'google' in sources_to_use:
+        print("\nTentative d'assurer la connexion Instagram...")
+        # S'assurer que INSTAGRAM_COOKIES_FILE utilise config.py
+        insta_cookies_path = config.BASE_DIR / "instagram_cookies.json"
+        with stage_timers.timed('ensure_instagram_login'):
+            session_active_insta = instagram_page_scraper.ensure_instagram_login(driver, insta_cookies_path)
+        if not session_active_insta:
+            print("Attention : Connexion Instagram échouée ou non établie. Le scraping des pages Instagram pourrait être limité.")
+    else:
+        print("\nSkip tentative d'assurer la connexion Instagram (module non importé ou pas de source Google choisie).")
+
+
+# --- Reconnexion en cours de tâche (session expirée, voir session_breaker.py) ---
+def relogin_social_platform(driver, platform):
+    """Recharge les cookies de la plateforme sur ce navigateur. Retourne True si la session est de nouveau active."""
+    ensure_login = {
+        'facebook': facebook_page_scraper.ensure_facebook_login if facebook_page_scraper else None,
+        'instagram': instagram_page_scraper.ensure_instagram_login if instagram_page_scraper else None,
+    }.get(platform)
+    if not ensure_login:
+        return False
+    logger.info("Session %s expirée : tentative de reconnexion depuis %s...", platform, COOKIE_FILES[platform].name,
+                extra={'stage': 'relogin', 'status': platform})
+    try:
+        with stage_timers.timed(f'relogin_{platform}'):
+            return bool(ensure_login(driver, COOKIE_FILES[platform]))
+    except Exception as e_login: # input() de la connexion manuelle lève EOFError sous RQ
+        logger.warning("Reconnexion %s impossible : %s - %s", platform, type(e_login).__name__, e_login,
+                       extra={'stage': 'relogin', 'status': 'relogin_failed'})
+        return False
+
+
+# --- Fermeture propre d'un navigateur ---
+def close_driver(driver):
+    """Ferme le navigateur si son processus est encore vivant."""
+    if not driver:
+        return
+    print("\nFermeture du navigateur...")
+    try:
+        # Vérifier si le processus du driver existe et n'est pas terminé
+        if hasattr(driver, 'service') and driver.service.process and driver.service.process.poll() is None:
+            driver.quit()
+            print("Navigateur fermé.")
+        else:
+            print("Navigateur déjà fermé ou processus introuvable.")
+    except Exception as e_quit:
+        print(f"Erreur lors de la fermeture du navigateur : {e_quit}")
+
+
+# --- Gestionnaire de navigateurs du process (persistant entre les tâches si worker.py l'active) ---
+browser_manager = BrowserManager(create_chrome_driver, ensure_social_logins, close_driver, config.BROWSER_RECYCLE_PAGE_LIMIT)
+
+
+# --- Création du pool de navigateurs pour le scraping détaillé ---
+def create_detail_driver_pool(main_driver, pool_size, sources_to_use):
+    """
+    Retourne la liste des drivers utilisés pour le scraping détaillé.
+    Le navigateur principal (déjà connecté) est réutilisé comme premier élément du pool ;
+    avec main_driver=None (pipeline en streaming, le principal reste sur Google) tout le pool est créé.
+    Les navigateurs supplémentaires viennent de browser_manager (au chaud ou créés séquentiellement :
+    uc patche chromedriver, la création concurrente n'est pas fiable) et ont chacun leur propre session.
+    Un navigateur supplémentaire qui échoue à démarrer ou à se connecter est simplement ignoré.
+    """
+    drivers = [main_driver] if main_driver else []
+    for pool_idx in range(len(drivers), pool_size):
+        extra_driver = None
+        try:
+            print(f"\n[Main - Pool] Initialisation du navigateur {pool_idx + 1}/{pool_size}...")
+            extra_driver = browser_manager.acquire(sources_to_use)
+            drivers.append(extra_driver)
+        except Exception as e_pool: # input() de la connexion manuelle lève EOFError sous RQ
+            print(f"[Main - Pool] Navigateur {pool_idx + 1} ignoré : {type(e_pool).__name__} - {e_pool}")
+            browser_manager.release(extra_driver)
+    print(f"[Main - Pool] {len(drivers)} navigateur(s) disponible(s) pour le scraping détaillé.")
+    return drivers
+
+
+# --- Scraping détaillé d'une URL (dispatch vers le bon page scraper) ---
+def scrape_url_details(driver, url_item):
+    """
+    Scrape une URL collectée avec le page scraper adapté (Facebook, Instagram ou AI générique).
+    Retourne le dictionnaire détaillé (jamais None), y compris en cas d'erreur du page scraper.
+    """
+    url_to_scrape = url_item.get('URL')
+    source_info = url_item
+
+    try:
+        if "facebook.com" in url_to_scrape.lower() and facebook_page_scraper:
+            with stage_timers.timed('scrape_facebook_page', kind='call'):
+                return facebook_page_scraper.scrape_facebook_page(driver, url_to_scrape, source_info)
+
+        elif "instagram.com" in url_to_scrape.lower() and instagram_page_scraper:
+            with stage_timers.timed('scrape_instagram_page', kind='call'):
+                return instagram_page_scraper.scrape_instagram_page(driver, url_to_scrape, source_info)
+
+        else:
+            logger.debug("Type d'URL non pris en charge par les scrapers spécifiques. Tentative AI pour : %s", url_to_scrape, extra={'url': url_to_scrape, 'stage': 'ai_extract'})
+            with stage_timers.timed('extract_info_with_ai', kind='call'):
+                return extract_info_with_ai(driver, url_to_scrape, gemini_model_main, source_info)
+
+    except Exception as e_page_scraper_call:
+        logger.error("ERREUR lors de l'appel du page scraper pour %s : %s - %s", url_to_scrape, type(e_page_scraper_call).__name__, e_page_scraper_call,
+                     extra={'url': url_to_scrape, 'stage': 'detail_scrape'})
+        if driver: # S'assurer que le driver existe
+             save_debug_info(driver, f"PageScraper_{type(e_page_scraper_call).__name__}", url_to_scrape)
+        detailed_data = {
+            "URL_Originale_Source": url_to_scrape,
+            "Statut_Scraping_Detail": "Error Calling Page Scraper",
+            "Message_Erreur_Detail": f"Error calling scraper: {type(e_page_scraper_call).__name__} - {e_page_scraper_call}"
+        }
+        # Ajouter les infos source au dictionnaire d'erreur
+        for key, value in source_info.items():
+            if key != 'URL' and key != 'URL_Originale_Source':
+                detailed_data[key] = source_info.get(key, "N/A")
+        return detailed_data
+
+
+# --- Ligne d'une URL non scrapée (échéance, session perdue) quand aucun checkpoint ne la garde ---
+def skipped_url_result(url_item, scraping_status, error_message):
+    """Résultat au format de scrape_url_details pour une URL jamais chargée (écrit tel quel dans le CSV)."""
+    skipped_data = {
+        "URL_Originale_Source": url_item.get('URL_Originale_Source') or url_item.get('URL'),
+        "Statut_Scraping_Detail": scraping_status,
+        "Message_Erreur_Detail": error_message,
+    }
+    for key, value in url_item.items():
+        if key not in ('URL', 'URL_Originale_Source', ATTEMPTS_FIELD, RETRY_AFTER_FIELD):
+            skipped_data[key] = value
+    return skipped_data
+
+
+# --- Boucle d'un worker du pool de scraping détaillé ---
+def detail_worker_loop(driver, work_queue, handle_url_item):
+    """
+    Consomme la file partagée jusqu'à recevoir la sentinelle None.
+    handle_url_item(driver, url_item) fait le scraping, la fusion des résultats et la progression.
+    """
+    while True:
+        url_item = work_queue.get()
+        try:
+            if url_item is None:
+                return
+            handle_url_item(driver, url_item)
+        except Exception as e_worker:
+            # Ne jamais laisser mourir un worker : les autres URLs de la file doivent être traitées
+            logger.error("Erreur inattendue dans un worker de scraping détaillé : %s - %s", type(e_worker).__name__, e_worker,
+                         exc_info=True, extra={'url': (url_item or {}).get('URL'), 'stage': 'detail_scrape'})
+        finally:
+            work_queue.task_done()
+
+
+def run_detail_workers(drivers, work_queue, handle_url_item):
+    """
+    Lance un worker par driver sur la file partagée et attend leur fin.
+    Avec un seul driver, la boucle tourne dans le thread courant (pas de thread supplémentaire).
+    """
+    if len(drivers) == 1:
+        detail_worker_loop(drivers[0], work_queue, handle_url_item)
+        return
+
+    threads = []
+    for worker_idx, worker_driver in enumerate(drivers):
+        thread = threading.Thread(
+            target=detail_worker_loop,
+            args=(worker_driver, work_queue, handle_url_item),
+            name=f"detail-worker-{worker_idx + 1}",
+            daemon=True
+        )
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+
+
+# --- Latence de démarrage d'une tâche (avant/après préchargement dans worker.py) ---
+def measure_job_startup(job):
+    """
+    Temps entre le démarrage de la tâche par RQ (job.started_at, avant l'import de la fonction
+    dans le process enfant) et l'entrée dans run_full_scraping_process. Enregistré dans job.meta
+    et dans les chronos ('job_startup') pour comparer WORKER_PRELOAD=1 et WORKER_PRELOAD=0.
+    """
+    stack_preloaded = PRELOADED_BY_WORKER
+    startup_latency = None
+    if job and job.started_at:
+        started_at = job.started_at
+        if started_at.tzinfo is None:
+            started_at = started_at.replace(tzinfo=timezone.utc) # RQ stocke des dates UTC naïves
+        startup_latency = max(0.0, (datetime.now(timezone.utc) - started_at).total_seconds())
+        stage_timers.record('job_startup', startup_latency)
+    latency_label = f"{startup_latency:.2f}s" if startup_latency is not None else "inconnue (hors RQ)"
+    preload_label = "oui" if stack_preloaded else f"non (import {MODULE_IMPORT_SECONDS:.2f}s)"
+    print(f"[Main] Démarrage de la tâche : latence {latency_label}, pile préchargée par le worker : {preload_label}.")
+    if job:
+        job.meta['startup_latency_s'] = round(startup_latency, 2) if startup_latency is not None else None
+        job.meta['stack_preloaded'] = stack_preloaded
+        job.meta['module_import_s'] = 0.0 if stack_preloaded else round(MODULE_IMPORT_SECONDS, 2)
+        job.save_meta()
+
+
+# --- Rapport d'exécution JSON (chronos par étape) à côté du CSV de résultats ---
+def write_run_report(job, output_csv_path, detail_progress, status, time_budget=None, retry_queue=None, session_breaker=None):
+    """Écrit <csv>_run_report.json et copie le résumé des chronos dans job.meta['stage_timings']."""
+    if output_csv_path:
+        report_path = output_csv_path.with_name(f"{output_csv_path.stem}_run_report.json")
+    else:
+        report_path = build_results_csv_path(f"{config.BASE_FINAL_CSV_FILE_NAME}_run_report").with_suffix(".json")
+    extra = {
+        'job_id': job.id if job else None,
+        'status': status,
+        'output_csv': str(output_csv_path) if output_csv_path and output_csv_path.exists() else None,
+        'urls_processed': detail_progress.get('processed', 0),
+        'urls_discovered': detail_progress.get('discovered', 0),
+        'rows_written': detail_progress.get('rows_written', 0),
+        'urls_skipped_deadline': detail_progress.get('skipped_deadline', 0),
+        'urls_deferred': detail_progress.get('deferred', 0),
+        'url_cache_hits': job.meta.get('url_cache_hits') if job else None,
+        'url_cache_misses': job.meta.get('url_cache_misses') if job else None,
+        'serp_cache_hits': job.meta.get('serp_cache_hits') if job else None,
+        'serp_cache_misses': job.meta.get('serp_cache_misses') if job else None,
+        'pacing_delays': pacer.current_delays(),
+        'rss_start_mb': stage_timers.rss_start_mb, # Mémoire du process au début et à la fin de cette tâche
+        'rss_end_mb': current_rss_mb(),
+        'worker_peak_rss_mb': worker_peak_rss_mb(), # Pic sur toute la vie du worker, pas seulement cette tâche
+        'time_budget': time_budget.summary() if time_budget else None,
+        'retries': retry_queue.summary() if retry_queue else None,
+        'session_breaker': session_breaker.summary() if session_breaker else None,
+    }
+    stage_timers.write_report(report_path, extra)
+    if job:
+        job.meta['stage_timings'] = stage_timers.summary()
+        job.meta['run_report'] = str(report_path)
+        job.save_meta()
+
+
+# --- Options post-scraping : création de leads (clean.py) et extraction des listes (extract_leads.py) ---
+def run_post_scraping_options(job, run_clean_option, run_extract_option):
+    """Exécute clean/extract après la fermeture du navigateur (tâche complète ou job reduce du mode split)."""
+    # --- 9. Option de création de leads (après la fermeture du navigateur) ---
+    if run_clean_option and clean:
+        print("\n--- Création de Leads ---")
+        # Assurez-vous que clean.consolidate_and_filter_leads utilise config.LEADS_CSV_FINAL_PATH
+        if job: # Mettre à jour le statut pendant le nettoyage
+             job.meta['status_message'] = "Nettoyage et consolidation des leads..."
+             job.save_meta()
+        # ---
+        with stage_timers.timed('clean_leads'):
+            clean.consolidate_and_filter_leads()
+    else:
+        reason = "option désactivée" if not run_clean_option else "module clean.py non chargé"
+        print(f"\nSkip l'option de création de leads ({reason}).")
+
+    # --- 10. Option de mise à jour des listes extraites (après la fermeture du navigateur) ---
+    # Utilise config.LEADS_CSV_FINAL_PATH
+    if run_extract_option and extract_leads and config.LEADS_CSV_FINAL_PATH.exists():
+        print("\n--- Mise à jour des Listes Extraites ---")
+        try:
+            print(f"Lancement de la mise à jour des listes depuis {config.LEADS_CSV_FINAL_PATH}...")
+            if job: # Mettre à jour le statut pendant l'extraction
+                 job.meta['status_message'] = "Extraction des listes (emails, téléphones...)..."
+                 job.save_meta()
+            # ---
+            # Passe le chemin depuis config.py
+            with stage_timers.timed('extract_leads'):
+                extract_leads.main(input_file_path=config.LEADS_CSV_FINAL_PATH)
+        except Exception as e_extract:
+            print(f"Erreur lors de la mise à jour des listes : {e_extract}")
+            traceback.print_exc()
+    else:
+        reason = "option désactivée" if not run_extract_option else ("module extract_leads.py non chargé" if not extract_leads else f"fichier {config.LEADS_CSV_FINAL_PATH.name} introuvable")
+        print(f"\nSkip l'option de mise à jour des listes ({reason}).")
+
+
 # --- Fonction encapsulant le processus complet de scraping ---
-def run_full_scraping_process(keywords_input_lists, google_pages_limit=5, google_allowed_link_types=None, run_clean_option=False, run_extract_option=False):
+def run_full_scraping_process(keywords_input_lists, google_pages_limit=5, google_allowed_link_types=None, run_clean_option=False, run_extract_option=False, keyword_combinations=None, time_budget_seconds=None):
     """
     Exécute l'ensemble du processus de scraping : recherche Google, scraping détaillé,
     sauvegarde, et options de nettoyage/extraction.
+    keyword_combinations : sous-ensemble de combinaisons déjà générées (sous-tâche du mode split).
+    time_budget_seconds : durée maximale de la tâche (par défaut le job_timeout RQ). Le nombre de pages
+    Google et les URLs détaillées sont ajustés pour finir, résultats écrits et clean/extract faits, avant.
+    Retourne le chemin du CSV de résultats, ou None si aucun résultat.
     """
-    # --- DEBUG PRINT ---
-    print(f"DEBUG: Entrée dans run_full_scraping_process. google_allowed_link_types = {google_allowed_link_types}")
-    # --- FIN DEBUG PRINT ---
     # --- Récupérer la tâche RQ actuelle ---
     job = get_current_job()
     # ---
+    stage_timers.reset() # Chronos propres à cette tâche (le worker réutilise le même process)
+    cancel_token.reset(job) # Oublie une annulation précédente (reprise de la même job id)
+    measure_job_startup(job)
+    time_budget = create_time_budget(job, time_budget_seconds, run_clean_option or run_extract_option)
     print("--- AlienScraper© : Application de Scraping Multi-Sources ---")
 
     # --- 1. Configuration Initiale (Mots-clés & Sources) ---
     # Ne pas appeler get_keywords_input_main() si les mots-clés sont déjà fournis
     # keywords_input_lists = get_keywords_input_main() # On commente cette ligne
-    all_combinations = generate_keyword_combinations(keywords_input_lists)
+    if keyword_combinations is not None:
+        all_combinations = list(keyword_combinations) # Shard déjà découpé par app.py (mode split)
+    else:
+        all_combinations = generate_keyword_combinations(keywords_input_lists)
 
     if not all_combinations:
         print("Aucune combinaison de mots-clés valide générée. Fin du processus.")
@@ -636,188 +978,463 @@ def run_full_scraping_process(keywords_input_lists, google_pages_limit=5, google
 
     # input("Appuyez sur Entrée pour initialiser le navigateur et démarrer le processus...") # Commenté pour l'exécution non interactive
 
+    # --- Checkpoint : reprise d'une tâche interrompue (même job id ré-enqueué) ---
+    job_checkpoint = None
+    resumed_from_checkpoint = False
+    progress = ProgressReporter(job, config.PROGRESS_FLUSH_INTERVAL_SECONDS, config.PROGRESS_FLUSH_EVERY_ITEMS)
+    if job and config.CHECKPOINT_ENABLED:
+        job_checkpoint = JobCheckpoint(job.id)
+        resumed_from_checkpoint = job_checkpoint.load()
+    combinations_to_search = all_combinations
+    if resumed_from_checkpoint:
+        combinations_to_search = [combo for combo in all_combinations if combo not in job_checkpoint.completed_combinations]
+        print(f"[Checkpoint] {len(all_combinations) - len(combinations_to_search)} combinaison(s) déjà traitée(s), {len(combinations_to_search)} restante(s).")
+        progress.stage(status_message=f"Reprise depuis le checkpoint : {len(job_checkpoint.scraped_urls)} URL(s) déjà scrapée(s).")
+
+    def on_combination_done(keyword_combination):
+        """Fin d'une combinaison Google : pages comptées pour le recyclage du navigateur + checkpoint."""
+        browser_manager.add_pages(driver, google_pages_limit)
+        if job_checkpoint:
+            job_checkpoint.mark_combination_done(keyword_combination)
+
     # --- 4. Initialisation du Navigateur et Connexions ---
     driver = None
+    result_writer = None
+    url_cache = None
+    serp_cache = None
+    event_sink = None
+    debug_spill = None
+    retry_queue = None
+    session_breaker = None
+    output_csv_path = None
+    detail_progress = {'processed': 0, 'discovered': 0, 'search_done': False, 'rows_written': 0, 'skipped_deadline': 0, 'deferred': 0}
+    job_completed = False # Passe à True quand tout le détail est traité : on peut alors purger index et checkpoint
+    job_cancelled = False
+    retries_left = 0 # URLs en échec passager pas encore retentées à la fin de la tâche
+    combinations_skipped = 0 # Combinaisons jamais cherchées faute de temps
     collected_urls_from_search = []
     seen_urls_overall = set()
 
-    try:
-        # Spécifier explicitement le chemin de l'exécutable Chromium pour Linux
-        options = uc.ChromeOptions()
-        
-        # Options recommandées pour les environnements headless/VM/XVFB
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        options.add_argument('--disable-gpu') # Important pour XVFB
-        options.add_argument('--window-size=1920,1080') # Peut aider au rendu
-        # options.add_argument('--headless=new') # À ne PAS utiliser avec XVFB
-        # Options supplémentaires pour la stabilité / furtivité
-        options.add_argument('--start-maximized') # Peut aider avec XVFB si window-size ne suffit pas
-        options.add_argument('--disable-extensions') # Désactiver les extensions qui pourraient interférer
-        options.add_argument('--disable-popup-blocking') # Peut être utile pour certains sites
-        options.add_argument('--ignore-certificate-errors') # À utiliser avec prudence
-        options.add_argument('--lang=fr-FR,fr;q=0.9,en-US;q=0.8,en;q=0.7') # Préférer le français
-        options.add_argument('--disable-blink-features=AutomationControlled') # uc le fait déjà, mais pour être sûr
-        options.add_argument(f"--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/11{random.randint(0,9)}.0.0.0 Safari/537.36") # Randomiser un peu plus
-
-        # Vérifie si ce chemin est correct sur ton système avec 'which chromium-browser'
-        # Essayez d'abord google-chrome si vous l'avez installé, sinon chromium-browser
-        chromium_path_chrome = "/usr/bin/google-chrome" 
-        chromium_path_chromium = "/usr/bin/chromium-browser"
-
-        # Vérifier si le fichier existe avant de l'utiliser
-        if Path(chromium_path_chrome).is_file():
-            print(f"Utilisation de Google Chrome trouvé à {chromium_path_chrome}")
-            driver = uc.Chrome(browser_executable_path=chromium_path_chrome, options=options)
-        elif Path(chromium_path_chromium).is_file():
-            print(f"Utilisation de Chromium Browser trouvé à {chromium_path_chromium}")
-            driver = uc.Chrome(browser_executable_path=chromium_path_chromium, options=options)
-        else:
-            print(f"ERREUR: Exécutable Chrome/Chromium non trouvé à {chromium_path_chrome} ou {chromium_path_chromium}. Tentative sans chemin spécifique.")
-            driver = uc.Chrome(options=options) # Laisse uc essayer de le trouver
-
-        print("Navigateur Chrome furtif initialisé par main_scraper.")
+    if cancel_token.is_cancelled():
+        # Sous-tâche démarrée après l'annulation de sa tâche parente (mode split) : rien à faire
+        progress.stage(progress=100, cancelled=True, status_message="Tâche annulée avant son démarrage.")
+        return None
 
-        # Connexion Facebook (nécessaire pour scraper des pages FB trouvées par Google)
-        if facebook_page_scraper and 'google' in sources_to_use:
-            print("\nTentative d'assurer la connexion Facebook...")
-            # S'assurer que COOKIES_FILE utilise config.py
-            fb_cookies_path = config.BASE_DIR / "facebook_cookies.json"
-            session_active_fb = facebook_page_scraper.ensure_facebook_login(driver, fb_cookies_path)
-            if not session_active_fb:
-                print("Attention : Connexion Facebook échouée ou non établie. Le scraping des pages Facebook pourrait être limité.")
-        else:
-            print("\nSkip tentative d'assurer la connexion Facebook (module non importé ou pas de source Google choisie).")
-
-        # Connexion Instagram (nécessaire pour scraper des pages Insta trouvées par Google)
-        if instagram_page_scraper and 'google' in sources_to_use:
-            print("\nTentative d'assurer la connexion Instagram...")
-            # S'assurer que INSTAGRAM_COOKIES_FILE utilise config.py
-            insta_cookies_path = config.BASE_DIR / "instagram_cookies.json"
-            session_active_insta = instagram_page_scraper.ensure_instagram_login(driver, insta_cookies_path)
-            if not session_active_insta:
-                print("Attention : Connexion Instagram échouée ou non établie. Le scraping des pages Instagram pourrait être limité.")
-        else:
-            print("\nSkip tentative d'assurer la connexion Instagram (module non importé ou pas de source Google choisie).")
-
-        # --- 5. Lancer les Search Scrapers ---
-        collected_urls_from_search = []
-        seen_urls_overall = set()
-
-        if not sources_to_use:
-            print("Aucune source de recherche valide sélectionnée. Skip la phase de recherche.")
-        else:
-
-            # Lancer Google Search si sélectionné
-            if 'google' in sources_to_use and google_search_scraper:
-                print("\nLancement du scraping de recherche Google...")
-                # Utiliser les variables configurées
-                google_urls = google_search_scraper.scrape_google_search(
-                    driver,
-                    all_combinations,
-                    google_pages_limit,
-                    google_allowed_link_types # Utiliser la variable configurée
-                )
-                # --- Mettre à jour le statut après la recherche Google ---
-                if job:
-                    job.meta['progress'] = 10 # Exemple: 10% après la recherche
-                    job.meta['status_message'] = f"{len(google_urls)} URLs trouvées par Google. Démarrage scraping détaillé..."
-                    job.save_meta()
-                # ---
-                for item in google_urls:
-                    item['Type_Source'] = 'Google'
-                    if item.get('URL') and isinstance(item['URL'], str) and item['URL'] not in seen_urls_overall:
-                        collected_urls_from_search.append(item)
-                        seen_urls_overall.add(item['URL'])
-
-                print(f"\nTotal URLs collectées via Google Search : {len(google_urls)}. Total URLs globales après Google : {len(collected_urls_from_search)}")
-                time.sleep(random.uniform(1, 2))
-
-                # Note: Les contrôles stop_scraping_full etc. ne sont pas gérés dans ce mode non interactif
-
-        print("\n--- Fin des phases de recherche ---")
-        print(f"Total d'URLs uniques collectées toutes sources confondues : {len(collected_urls_from_search)}")
-        print("-------------------------------------")
+    try:
+        # --- CSV incrémental : chaque ligne est écrite dès qu'elle est produite (reprise : même fichier) ---
+        if resumed_from_checkpoint and job_checkpoint.output_csv:
+            output_csv_path = Path(job_checkpoint.output_csv)
+        if output_csv_path is None:
+            output_csv_path = build_results_csv_path(config.BASE_FINAL_CSV_FILE_NAME, job.id if job else None)
+            if job_checkpoint:
+                job_checkpoint.set_output_csv(output_csv_path)
+        result_writer = IncrementalResultWriter(output_csv_path, FINAL_CSV_HEADERS).open()
+        url_cache = open_url_cache() # None si désactivé : toutes les URLs passent par le navigateur
+        serp_cache = open_serp_cache() # None si désactivé : chaque combinaison est cherchée sur Google
+        # Journal JSON lines de la tâche à côté du CSV (python event_log.py <fichier> --url ... pour l'interroger)
+        event_sink = start_job_event_log(job.id if job else "cli", output_csv_path.with_name(f"{output_csv_path.stem}_events.jsonl"))
+        debug_spill = open_debug_payload_spill(output_csv_path)
+
+        def progress_metrics():
+            """Champs de job.meta coûteux à calculer : évalués seulement au moment de l'envoi à Redis."""
+            metrics = {'pacing_delays': pacer.current_delays(), 'stage_timings': stage_timers.summary(),
+                       'rss_mb': current_rss_mb(), 'worker_peak_rss_mb': worker_peak_rss_mb()}
+            if url_cache:
+                metrics['url_cache_hits'] = url_cache.hits
+                metrics['url_cache_misses'] = url_cache.misses
+            if serp_cache:
+                metrics['serp_cache_hits'] = serp_cache.hits
+                metrics['serp_cache_misses'] = serp_cache.misses
+            if time_budget:
+                metrics['time_budget'] = time_budget.summary()
+            if retry_queue:
+                metrics['retries'] = retry_queue.summary()
+            if session_breaker:
+                metrics['session_breaker'] = session_breaker.summary()
+            return metrics
+        progress.add_flush_hook(progress_metrics)
+        # resumable : la tâche se termine pour RQ ('finished') en gardant du travail dans son checkpoint (bouton Reprendre)
+        progress.stage(output_csv=str(output_csv_path), event_log=str(event_sink.path) if event_sink else None, resumable=False)
+
+        # Avec un seul navigateur de détail, le streaming en lancerait un second (et une seconde connexion
+        # Facebook/Instagram) pour rien : recherche puis détail sur le même navigateur
+        streaming_pipeline = (
+            config.STREAMING_SEARCH_PIPELINE and config.DETAIL_DRIVER_POOL_SIZE > 1
+            and 'google' in sources_to_use and google_search_scraper
+        )
+        # Navigateur au chaud si le worker est persistant. En streaming il ne sert qu'à Google : pas de connexion
+        # Facebook/Instagram (le pool de détail a ses propres sessions, deux sessions sur les mêmes cookies sinon)
+        driver = browser_manager.acquire(sources_to_use, prepare=not streaming_pipeline)
 
-        # --- 6. Scraping des Pages Détaillées ---
-        final_detailed_prospects = []
+        # --- 5 & 6. Recherche Google puis Scraping des Pages Détaillées ---
         seen_urls_detailed_scraped = set()
 
-        if collected_urls_from_search:
-            print("\n--- Démarrage du scraping des pages détaillées ---")
-
-            random.shuffle(collected_urls_from_search)
-            print("URLs à scraper mélangées pour le scraping détaillé.")
-
-            total_urls_to_scrape_detail = len(collected_urls_from_search)
-
-            for idx, url_item in enumerate(collected_urls_from_search):
-                # Note: Les contrôles stop_scraping_full / skip_url ne sont pas gérés ici
-
-                url_to_scrape = url_item.get('URL')
-                source_info = url_item
-
-                if source_info.get('URL_Originale_Source') is None:
-                    source_info['URL_Originale_Source'] = url_to_scrape
-
-                if not url_to_scrape or url_to_scrape in seen_urls_detailed_scraped:
+        results_lock = threading.Lock() # Protège les listes/sets partagés et job.meta
+        # File partagée entre les workers (une sentinelle None par worker), meilleures URLs d'abord
+        work_queue, lead_yield_stats = create_work_queue()
+        # Échecs passagers (timeouts de chargement...) mis de côté puis retentés en fin de tâche avec backoff
+        retry_queue = create_retry_queue()
+        last_failed_results = {} # Clé d'URL -> dernier résultat en échec (écrit si l'URL n'a pas pu être retentée)
+        skipped_results = {} # Sans checkpoint : clé d'URL -> ligne des URLs abandonnées (écrites en fin de tâche)
+        # Session Facebook/Instagram perdue : une reconnexion, puis les URLs de la plateforme sont reportées
+        session_breaker = create_session_breaker(relogin_social_platform)
+
+        if resumed_from_checkpoint:
+            # Lignes déjà scrapées : déjà dans le CSV ; URLs en attente : remises dans la file
+            scraped_url_keys = {url_dedupe_key(url) or url for url in job_checkpoint.scraped_urls}
+            seen_urls_detailed_scraped.update(scraped_url_keys)
+            seen_urls_overall.update(scraped_url_keys)
+            detail_progress['processed'] = detail_progress['discovered'] = len(job_checkpoint.scraped_urls)
+            detail_progress['rows_written'] = result_writer.count_rows()
+            for pending_item in list(job_checkpoint.pending_items.values()):
+                seen_urls_overall.add(url_dedupe_key(pending_item['URL']) or pending_item['URL'])
+                collected_urls_from_search.append(pending_item)
+                detail_progress['discovered'] += 1
+                if retry_queue and pending_item.get(ATTEMPTS_FIELD):
+                    retry_queue.restore(pending_item) # Déjà en échec passager : le backoff reprend où il en était
                     continue
+                if time_budget:
+                    time_budget.url_queued()
+                work_queue.put(pending_item)
 
-                print(f"\n  [Main] Scraping détaillé {idx+1}/{total_urls_to_scrape_detail} : {url_to_scrape}")
-
-                detailed_data = None
-
-                try:
-                    if "facebook.com" in url_to_scrape.lower() and facebook_page_scraper:
-                        detailed_data = facebook_page_scraper.scrape_facebook_page(driver, url_to_scrape, source_info)
-
-                    elif "instagram.com" in url_to_scrape.lower() and instagram_page_scraper:
-                        detailed_data = instagram_page_scraper.scrape_instagram_page(driver, url_to_scrape, source_info)
-
-                    else:
-                        print(f"  [Main] Type d'URL non pris en charge par les scrapers spécifiques. Tentative AI pour : {url_to_scrape}")
-                        detailed_data = extract_info_with_ai(driver, url_to_scrape, gemini_model_main, source_info)
-
-                except Exception as e_page_scraper_call:
-                    print(f"  [Main] ERREUR lors de l'appel du page scraper pour {url_to_scrape} : {type(e_page_scraper_call).__name__} - {e_page_scraper_call}")
-                    if driver: # S'assurer que le driver existe
-                         save_debug_info(driver, f"PageScraper_{type(e_page_scraper_call).__name__}", url_to_scrape)
-                    detailed_data = {
-                        "URL_Originale_Source": url_to_scrape,
-                        "Statut_Scraping_Detail": "Error Calling Page Scraper",
-                        "Message_Erreur_Detail": f"Error calling scraper: {type(e_page_scraper_call).__name__} - {e_page_scraper_call}"
-                    }
-                    # Ajouter les infos source au dictionnaire d'erreur
-                    for key, value in source_info.items():
-                        if key != 'URL' and key != 'URL_Originale_Source':
-                            detailed_data[key] = source_info.get(key, "N/A")
-
-                if detailed_data:
-                    final_row_formatted = map_data_to_final_format(detailed_data)
-                    final_detailed_prospects.append(final_row_formatted)
-                    seen_urls_detailed_scraped.add(url_to_scrape)
-
-                # --- Mettre à jour le statut APRÈS chaque tentative de scraping détaillé ---
+        def enqueue_search_item(item):
+            """
+            Canonicalise l'URL (variantes m./fr-fr./?locale=... ramenées à une seule), la déduplique
+            contre seen_urls_overall et l'ajoute à la file. Retourne True si ajoutée.
+            """
+            item['Type_Source'] = 'Google'
+            url = item.get('URL')
+            if not url or not isinstance(url, str):
+                return False
+            canonical = canonical_url(url)
+            if canonical != "Not Found":
+                item['URL'] = canonical
+            url_key = url_dedupe_key(url) or url
+            with results_lock:
+                if url_key in seen_urls_overall:
+                    return False
+                seen_urls_overall.add(url_key)
+                collected_urls_from_search.append(item)
+                detail_progress['discovered'] += 1
+            if job_checkpoint:
+                job_checkpoint.add_pending(item)
+            if time_budget:
+                time_budget.url_queued()
+            work_queue.put(item)
+            return True
+
+        def handle_url_item(worker_driver, url_item):
+            # Tâche annulée : la file est vidée sans scraper, les URLs restent "en attente" dans le checkpoint
+            if cancel_token.is_cancelled():
+                return
+            url_to_scrape = url_item.get('URL')
+
+            if url_item.get('URL_Originale_Source') is None:
+                url_item['URL_Originale_Source'] = url_to_scrape
+
+            url_key = url_dedupe_key(url_to_scrape) # Aussi la clé du cache (None : URL invalide, jamais mise en cache)
+            with results_lock:
+                if not url_to_scrape or (url_key or url_to_scrape) in seen_urls_detailed_scraped:
+                    return
+                seen_urls_detailed_scraped.add(url_key or url_to_scrape) # Réservée : aucun autre worker ne la reprendra
+                detail_progress['processed'] += 1
+                position = detail_progress['processed']
+                total_known = detail_progress['discovered']
+                total_label = total_known if detail_progress['search_done'] else f"{total_known}+ (recherche en cours)"
+
+            url_started_at = time.monotonic()
+            detailed_data = url_cache.get(url_key, url_item) if url_cache else None
+            cache_hit = detailed_data is not None
+            if cache_hit:
+                logger.info("Cache hit %d/%s (pas de navigateur) : %s", position, total_label, url_to_scrape,
+                            extra={'url': url_to_scrape, 'stage': 'detail_scrape', 'status': 'cache_hit'})
+            elif time_budget and not time_budget.can_start_url():
+                # Ne finirait pas avant l'échéance : abandonnée (reste "en attente" dans le checkpoint)
+                time_budget.drop_url()
+                with results_lock:
+                    detail_progress['processed'] -= 1 # Pas traitée : comptée à part
+                    detail_progress['skipped_deadline'] += 1
+                    if not job_checkpoint: # Aucune reprise possible : une ligne dit qu'elle n'a pas été scrapée
+                        skipped_results[url_key or url_to_scrape] = skipped_url_result(
+                            url_item, "Skipped - Deadline", "Temps restant insuffisant avant l'échéance de la tâche.")
+                logger.info("Temps restant insuffisant : URL abandonnée : %s", url_to_scrape,
+                            extra={'url': url_to_scrape, 'stage': 'detail_scrape', 'status': 'deadline'})
+                return
+            elif session_breaker and not session_breaker.allow(url_to_scrape):
+                # Session de la plateforme perdue : reportée sans chargement (reste "en attente" dans le checkpoint)
+                if time_budget:
+                    time_budget.url_deferred()
+                with results_lock:
+                    detail_progress['processed'] -= 1 # Pas traitée : comptée à part
+                    detail_progress['deferred'] += 1
+                    if not job_checkpoint: # Aucune reprise possible : une ligne dit qu'elle n'a pas été scrapée
+                        skipped_results[url_key or url_to_scrape] = skipped_url_result(
+                            url_item, "Skipped - Session Lost", "Session de la plateforme expirée, reconnexion impossible.")
+                logger.info("Session expirée sur la plateforme : URL reportée : %s", url_to_scrape,
+                            extra={'url': url_to_scrape, 'stage': 'detail_scrape', 'status': 'session_deferred'})
+                return
+            else:
+                logger.info("Scraping détaillé %d/%s : %s", position, total_label, url_to_scrape, extra={'url': url_to_scrape, 'stage': 'detail_scrape'})
+                detailed_data = scrape_url_details(worker_driver, url_item)
+                browser_manager.add_pages(worker_driver)
+                pacer.report_status(url_to_scrape, detailed_data.get('Statut_Scraping_Detail')) # Adapte le rythme du domaine
+                if session_breaker and session_breaker.record(worker_driver, url_to_scrape, detailed_data.get('Statut_Scraping_Detail')):
+                    # Reconnexion réussie sur ce navigateur : la page est rechargée avec la nouvelle session
+                    detailed_data = scrape_url_details(worker_driver, url_item)
+                    browser_manager.add_pages(worker_driver)
+                    pacer.report_status(url_to_scrape, detailed_data.get('Statut_Scraping_Detail'))
+                    session_breaker.record(worker_driver, url_to_scrape, detailed_data.get('Statut_Scraping_Detail'))
+                if session_breaker and not session_breaker.allow(url_to_scrape):
+                    # Cette URL vient d'ouvrir le disjoncteur : reportée avec les suivantes plutôt qu'écrite en échec
+                    if time_budget:
+                        time_budget.record_url(time.monotonic() - url_started_at)
+                    with results_lock:
+                        detail_progress['processed'] -= 1 # Reprise par /resume-job : pas comptée deux fois
+                        detail_progress['deferred'] += 1
+                        if not job_checkpoint: # Aucune reprise possible : on écrit l'échec constaté
+                            for field in DEBUG_PAYLOAD_FIELDS:
+                                detailed_data.pop(field, None)
+                            skipped_results[url_key or url_to_scrape] = detailed_data
+                    return
+            scraping_status = detailed_data.get('Statut_Scraping_Detail')
+            if not cache_hit and retry_queue and retry_queue.schedule(url_item, scraping_status):
+                # Échec passager : pas de ligne pour l'instant, l'URL repassera en fin de tâche
+                for field in DEBUG_PAYLOAD_FIELDS:
+                    detailed_data.pop(field, None)
+                with results_lock:
+                    seen_urls_detailed_scraped.discard(url_key or url_to_scrape)
+                    detail_progress['processed'] -= 1
+                    last_failed_results[url_key or url_to_scrape] = detailed_data
+                if job_checkpoint:
+                    job_checkpoint.add_pending(url_item) # Tentatives et Retry_After conservés pour une reprise
+                if time_budget:
+                    time_budget.record_url(time.monotonic() - url_started_at)
+                logger.warning("Échec passager (%s), tentative %d/%d dans %.0fs : %s", scraping_status, url_item[ATTEMPTS_FIELD] + 1,
+                               retry_queue.max_attempts, url_item[RETRY_AFTER_FIELD] - time.time(), url_to_scrape,
+                               extra={'url': url_to_scrape, 'stage': 'detail_scrape', 'status': scraping_status})
+                return
+            if not cache_hit and is_retryable_status(scraping_status) and url_item.get(ATTEMPTS_FIELD, 0) > 1:
+                detailed_data['Message_Erreur_Detail'] = f"{detailed_data.get('Message_Erreur_Detail', '')} (échec après {url_item[ATTEMPTS_FIELD]} tentatives)".strip()
+            with results_lock:
+                last_failed_results.pop(url_key or url_to_scrape, None)
+            # Textes bruts du scraper (plusieurs Ko) vers <csv>_debug.jsonl, retrouvés par URL_Originale_Source : hors du cache et du CSV
+            if debug_spill:
+                debug_spill.spill(detailed_data)
+            else:
+                for field in DEBUG_PAYLOAD_FIELDS:
+                    detailed_data.pop(field, None)
+            if not cache_hit:
+                if url_cache:
+                    url_cache.put(url_key, detailed_data)
+                if lead_yield_stats:
+                    lead_yield_stats.record(url_item, detailed_data.get('Statut_Scraping_Detail')) # Historique de rendement par type d'URL
+                if time_budget:
+                    time_budget.record_url(time.monotonic() - url_started_at)
+            elif time_budget:
+                time_budget.url_served_from_cache()
+            final_row_formatted = map_data_to_final_format(detailed_data)
+            with stage_timers.timed('csv_write'):
+                row_written = result_writer.write_row(final_row_formatted) # Ajouté + flush immédiatement dans le CSV
+            if job_checkpoint:
+                job_checkpoint.record_scraped(url_to_scrape)
+            logger.info("Terminé en %.1fs : %s", time.monotonic() - url_started_at, url_to_scrape,
+                        extra={'url': url_to_scrape, 'stage': 'detail_scrape', 'status': detailed_data.get('Statut_Scraping_Detail'),
+                               'duration_s': round(time.monotonic() - url_started_at, 2)})
+
+            with results_lock:
+                if row_written:
+                    detail_progress['rows_written'] += 1
+
+                # --- Mettre à jour le statut APRÈS chaque tentative de scraping détaillé (envoi à Redis regroupé) ---
                 if job:
-                    progress_percent = (idx + 1) * 85 // total_urls_to_scrape_detail + 10 # Progression de 10% à 95% pendant le détail
-                    job.meta['progress'] = progress_percent
-                    job.meta['status_message'] = f"Scraping détaillé {idx+1}/{total_urls_to_scrape_detail}: {url_to_scrape}"
-                    job.save_meta()
+                    progress_percent = position * 85 // max(detail_progress['discovered'], 1) + 10 # Progression de 10% à 95% pendant le détail
+                    progress.update(
+                        progress=max(job.meta.get('progress', 0), min(progress_percent, 95)),
+                        status_message=f"Scraping détaillé {detail_progress['processed']}/{total_label}: {url_to_scrape}",
+                        rows_written=detail_progress['rows_written'],
+                    )
                 # ---
+            # La pause entre URLs est faite par pacer.wait_turn juste avant le prochain driver.get du même domaine
 
-                time.sleep(random.uniform(3, 6))
-
-            print(f"\n  [Main] {len(final_detailed_prospects)} URLs traitées pour le scraping détaillé et ajoutées à la liste finale.")
-            print("\n--- Fin du scraping des pages détaillées ---")
-            print(f"Total de prospects avec infos détaillées collectées : {len(final_detailed_prospects)}")
-            print("---------------------------------------------")
+        def run_retry_rounds(retry_drivers):
+            """
+            Fin de la file de détail : repasse les URLs en échec passager dans la file, par vagues,
+            une fois leur délai de backoff écoulé. S'arrête à l'annulation ou si l'attente dépasserait l'échéance.
+            """
+            while retry_queue and retry_queue.pending_count() and not cancel_token.is_cancelled():
+                wait_seconds = retry_queue.seconds_until_next()
+                if time_budget and time_budget.remaining() - wait_seconds < time_budget.seconds_per_url():
+                    logger.warning("Temps restant insuffisant : %d URL(s) non retentée(s).", retry_queue.pending_count(),
+                                   extra={'stage': 'retry', 'status': 'deadline'})
+                    return
+                if wait_seconds > 0:
+                    logger.info("%d URL(s) en échec passager, prochaine tentative dans %.0fs.", retry_queue.pending_count(), wait_seconds,
+                                extra={'stage': 'retry', 'status': 'backoff'})
+                    progress.stage(status_message=f"Attente avant de retenter {retry_queue.pending_count()} URL(s) en échec passager...")
+                    cancel_token.sleep(wait_seconds, 'pause:retry_backoff')
+                    continue
+                ready_items = retry_queue.take_ready()
+                logger.info("Nouvelle tentative pour %d URL(s).", len(ready_items), extra={'stage': 'retry', 'status': 'retry_round'})
+                for item in ready_items:
+                    if time_budget:
+                        time_budget.url_queued()
+                    work_queue.put(item)
+                for _ in retry_drivers:
+                    work_queue.put(None)
+                run_detail_workers(retry_drivers, work_queue, handle_url_item)
+
+        detail_drivers = []
+        extra_detail_drivers = [] # Navigateurs du pool à rendre (le principal est rendu dans le finally global)
+
+        if streaming_pipeline:
+            # Le navigateur principal reste dédié à Google ; le pool de détail est entièrement créé à part
+            logger.info("Mode streaming : le scraping détaillé démarre dès les premiers résultats Google.", extra={'stage': 'pipeline'})
+            detail_drivers = create_detail_driver_pool(None, max(1, config.DETAIL_DRIVER_POOL_SIZE), sources_to_use)
+            extra_detail_drivers = list(detail_drivers)
+            if time_budget:
+                time_budget.workers = len(detail_drivers)
+            if not detail_drivers:
+                logger.warning("Aucun navigateur de détail disponible. Retour au mode séquentiel.", extra={'stage': 'pipeline'})
+                streaming_pipeline = False
+                browser_manager.prepare_for_detail(driver, sources_to_use) # Le principal scrape aussi le détail
 
-        else:
-            print("\nAucune URL collectée par les search scrapers. Skip la phase de scraping détaillé.")
+        try:
+            if streaming_pipeline:
+                print("\nLancement du scraping de recherche Google (producteur)...")
+                progress.stage(progress=5, status_message="Recherche Google et scraping détaillé en parallèle...")
+
+                def search_producer():
+                    try:
+                        if not combinations_to_search:
+                            logger.info("Toutes les combinaisons ont déjà été recherchées (checkpoint). Skip la recherche Google.",
+                                        extra={'stage': 'google_search', 'status': 'checkpoint'})
+                            return
+                        for item in google_search_scraper.iter_google_search(
+                            driver,
+                            combinations_to_search,
+                            google_pages_limit,
+                            google_allowed_link_types, # Utiliser la variable configurée
+                            on_combination_done=on_combination_done,
+                            should_stop=cancel_token.is_cancelled,
+                            time_budget=time_budget,
+                            serp_cache=serp_cache
+                        ):
+                            enqueue_search_item(item)
+                    except Exception as e_search:
+                        logger.error("ERREUR dans le producteur de recherche Google : %s - %s", type(e_search).__name__, e_search,
+                                     extra={'stage': 'google_search', 'status': 'error'})
+                        traceback.print_exc()
+                        save_debug_info(driver, f"SearchProducer_{type(e_search).__name__}", "search_producer")
+                    finally:
+                        with results_lock:
+                            detail_progress['search_done'] = True
+                        logger.info("Recherche Google terminée : %d URLs uniques envoyées au scraping détaillé.", detail_progress['discovered'],
+                                    extra={'stage': 'google_search', 'status': 'done'})
+                        for _ in detail_drivers:
+                            work_queue.put(None) # Libère les workers une fois la file vidée
+
+                producer_thread = threading.Thread(target=search_producer, name="search-producer", daemon=True)
+                producer_thread.start()
+                run_detail_workers(detail_drivers, work_queue, handle_url_item)
+                producer_thread.join()
+                run_retry_rounds(detail_drivers)
 
-        # --- 7. Sauvegarde Finale ---
-        # Utilise le nom de base et les headers définis globalement (via config.py implicitement pour le nom)
-        save_results_to_csv(final_detailed_prospects, config.BASE_FINAL_CSV_FILE_NAME, FINAL_CSV_HEADERS)
+            else:
+                if not sources_to_use:
+                    print("Aucune source de recherche valide sélectionnée. Skip la phase de recherche.")
+
+                # Lancer Google Search si sélectionné
+                elif 'google' in sources_to_use and google_search_scraper and combinations_to_search:
+                    print("\nLancement du scraping de recherche Google...")
+                    # Chaque URL est mise en file (et en attente dans le checkpoint) dès sa page de résultats analysée :
+                    # une combinaison n'est marquée terminée qu'après l'enregistrement de toutes ses URLs.
+                    # La file ordonne les URLs par rendement attendu (LEAD_PRIORITY_ENABLED=0 : ordre de Google)
+                    google_url_count = 0
+                    for item in google_search_scraper.iter_google_search(
+                        driver,
+                        combinations_to_search,
+                        google_pages_limit,
+                        google_allowed_link_types, # Utiliser la variable configurée
+                        on_combination_done=on_combination_done,
+                        should_stop=cancel_token.is_cancelled,
+                        time_budget=time_budget,
+                        serp_cache=serp_cache
+                    ):
+                        google_url_count += 1
+                        enqueue_search_item(item)
+                    # --- Mettre à jour le statut après la recherche Google ---
+                    progress.stage(progress=10, # Exemple: 10% après la recherche
+                                   status_message=f"{google_url_count} URLs trouvées par Google. Démarrage scraping détaillé...")
+                    # ---
+
+                    logger.info("Total URLs collectées via Google Search : %d. Total URLs globales après Google : %d", google_url_count,
+                                len(collected_urls_from_search), extra={'stage': 'google_search', 'status': 'done'})
+                    stage_timers.sleep(random.uniform(1, 2), 'pause:after_google')
+
+                    # L'annulation (cancel_token) arrête la recherche ; le scraping détaillé vide alors la file sans scraper
+
+                detail_progress['search_done'] = True
+                print("\n--- Fin des phases de recherche ---")
+                print(f"Total d'URLs uniques collectées toutes sources confondues : {len(collected_urls_from_search)}")
+                print("-------------------------------------")
+
+                if collected_urls_from_search and not cancel_token.is_cancelled():
+                    print("\n--- Démarrage du scraping des pages détaillées ---")
+                    # Pool de navigateurs : le driver principal + (N-1) navigateurs supplémentaires, chacun connecté
+                    pool_size = max(1, min(config.DETAIL_DRIVER_POOL_SIZE, len(collected_urls_from_search)))
+                    detail_drivers = create_detail_driver_pool(driver, pool_size, sources_to_use)
+                    extra_detail_drivers = detail_drivers[1:]
+                    if time_budget:
+                        time_budget.workers = len(detail_drivers)
+                    for _ in detail_drivers:
+                        work_queue.put(None)
+                    run_detail_workers(detail_drivers, work_queue, handle_url_item)
+                    run_retry_rounds(detail_drivers)
+                else:
+                    print("\nAucune URL collectée par les search scrapers. Skip la phase de scraping détaillé.")
+        finally:
+            for extra_driver in extra_detail_drivers:
+                browser_manager.release(extra_driver, discard=cancel_token.is_cancelled())
+            if lead_yield_stats:
+                lead_yield_stats.save()
+
+        logger.info("%d URLs traitées pour le scraping détaillé, lignes écrites au fil de l'eau dans le CSV.", detail_progress['processed'],
+                    extra={'stage': 'detail_scrape', 'status': 'done'})
+        print("\n--- Fin du scraping des pages détaillées ---")
+        print(f"Total de prospects avec infos détaillées collectées : {detail_progress['rows_written']}")
+        print("---------------------------------------------")
+        job_cancelled = cancel_token.is_cancelled()
+        retries_left = retry_queue.pending_count() if retry_queue else 0
+        combinations_skipped = time_budget.combinations_skipped if time_budget else 0
+        # Annulée, URLs ou combinaisons abandonnées faute de temps, pas encore retentées : index et checkpoint gardés pour une reprise
+        job_completed = (not job_cancelled and not detail_progress['skipped_deadline'] and not combinations_skipped
+                         and not retries_left and not detail_progress['deferred'])
+        if detail_progress['skipped_deadline']:
+            kept_label = "gardées dans le checkpoint : /resume-job les reprendra" if job_checkpoint else "écrites avec le statut Skipped - Deadline"
+            logger.warning("%d URL(s) abandonnée(s) pour tenir l'échéance (%s).", detail_progress['skipped_deadline'], kept_label,
+                           extra={'stage': 'time_budget', 'status': 'deadline'})
+        if combinations_skipped:
+            kept_label = "gardées dans le checkpoint : /resume-job les cherchera" if job_checkpoint else "perdues : pas de checkpoint"
+            logger.warning("%d combinaison(s) non cherchée(s) pour tenir l'échéance (%s).", combinations_skipped, kept_label,
+                           extra={'stage': 'time_budget', 'status': 'deadline'})
+        if detail_progress['deferred']:
+            kept_label = "gardées dans le checkpoint : /resume-job les reprendra" if job_checkpoint else "écrites dans le CSV (Skipped - Session Lost)"
+            logger.warning("%d URL(s) reportée(s) faute de session %s (%s).", detail_progress['deferred'],
+                           ', '.join(session_breaker.open_platforms()), kept_label,
+                           extra={'stage': 'session_breaker', 'status': 'session_deferred'})
+        if retries_left and job_checkpoint:
+            logger.warning("%d URL(s) en échec passager gardées dans le checkpoint : /resume-job les retentera.", retries_left,
+                           extra={'stage': 'retry', 'status': 'pending'})
+        elif retries_left:
+            # Pas de checkpoint (mode autonome) : personne ne les retentera, on écrit leur dernier échec
+            for failed_data in last_failed_results.values():
+                if result_writer.write_row(map_data_to_final_format(failed_data)):
+                    detail_progress['rows_written'] += 1
+            logger.warning("%d URL(s) non retentée(s) : dernier échec écrit dans le CSV.", retries_left,
+                           extra={'stage': 'retry', 'status': 'given_up'})
+        for skipped_data in skipped_results.values():
+            if result_writer.write_row(map_data_to_final_format(skipped_data)):
+                detail_progress['rows_written'] += 1
 
     except Exception as e:
         print(f"\nERREUR CRITIQUE GLOBALE dans main_scraper : {type(e).__name__} - {e}")
@@ -827,75 +1444,154 @@ def run_full_scraping_process(keywords_input_lists, google_pages_limit=5, google
         # Important: Arrêter l'exécution ici si une erreur critique survient
         # Le finally s'exécutera quand même avant que la fonction ne retourne
         # --- Mettre à jour le statut en cas d'erreur critique ---
-        if job:
-            job.meta['progress'] = 100 # Marquer comme terminé même si erreur
-            job.meta['status_message'] = f"ERREUR CRITIQUE: {type(e).__name__}"
-            job.save_meta()
+        progress.stage(progress=100, status_message=f"ERREUR CRITIQUE: {type(e).__name__}", # Marquer comme terminé même si erreur
+                       resumable=bool(job_checkpoint)) # Checkpoint gardé : /resume-job repart de là
         # ---
+        write_run_report(job, output_csv_path, detail_progress, status=f"error: {type(e).__name__}", time_budget=time_budget, retry_queue=retry_queue, session_breaker=session_breaker)
         return # Ou raise e pour que RQ marque le job comme échoué
 
     finally:
-        if driver:
-            print("\nFermeture du navigateur...")
-            try:
-                # Vérifier si le processus du driver existe et n'est pas terminé
-                if hasattr(driver, 'service') and driver.service.process and driver.service.process.poll() is None:
-                    driver.quit()
-                    print("Navigateur fermé.")
-                else:
-                    print("Navigateur déjà fermé ou processus introuvable.")
-            except Exception as e_quit:
-                print(f"Erreur lors de la fermeture du navigateur : {e_quit}")
+        progress.flush() # Dernière progression en attente (aussi en cas d'arrêt brutal du worker)
+        browser_manager.release(driver, discard=cancel_token.is_cancelled()) # Fermé, ou gardé au chaud pour la tâche suivante (jamais après une annulation)
+        if url_cache:
+            url_cache.close()
+        if serp_cache:
+            serp_cache.close()
+        if debug_spill:
+            debug_spill.close()
+        stop_job_event_log(event_sink)
+
+        # --- 7. Sauvegarde Finale ---
+        # Les lignes sont déjà dans le CSV : on ferme le fichier. L'index de déduplication et le checkpoint
+        # ne sont supprimés qu'en fin normale ; après un crash ils servent à la reprise.
+        if result_writer:
+            result_writer.close(remove_index=job_completed or not job_checkpoint)
+        if job_checkpoint and job_completed:
+            job_checkpoint.clear() # Résultats en sécurité dans le CSV : plus besoin de reprise
 
         print("\n--- Processus de Scraping Terminé (dans la fonction) ---")
 
+    if job_cancelled:
+        # Arrêt rapide : pas de nettoyage/extraction, les lignes déjà scrapées sont dans le CSV
+        progress.stage(progress=100, cancelled=True, resumable=bool(job_checkpoint),
+                       status_message=f"Tâche annulée : {detail_progress['rows_written']} ligne(s) conservée(s) dans le CSV.")
+        write_run_report(job, output_csv_path, detail_progress, status="cancelled", time_budget=time_budget, retry_queue=retry_queue, session_breaker=session_breaker)
+        print("\n--- Fonction run_full_scraping_process terminée (annulée) ---")
+        return str(output_csv_path) if output_csv_path and output_csv_path.exists() else None
+
     # --- Mettre à jour le statut avant clean/extract ---
-    if job:
-        job.meta['progress'] = 95 # Presque terminé avant les étapes finales
-        job.meta['status_message'] = "Scraping terminé. Lancement nettoyage/extraction..."
-        job.save_meta()
+    progress.stage(progress=95, # Presque terminé avant les étapes finales
+                   status_message="Scraping terminé. Lancement nettoyage/extraction...")
     # ---
 
-    # --- 9. Option de création de leads (après la fermeture du navigateur) ---
-    if run_clean_option and clean:
-        print("\n--- Création de Leads ---")
-        # Assurez-vous que clean.consolidate_and_filter_leads utilise config.LEADS_CSV_FINAL_PATH
-        if job: # Mettre à jour le statut pendant le nettoyage
-             job.meta['status_message'] = "Nettoyage et consolidation des leads..."
-             job.save_meta()
-        # ---
-        clean.consolidate_and_filter_leads()
-    else:
-        reason = "option désactivée" if not run_clean_option else "module clean.py non chargé"
-        print(f"\nSkip l'option de création de leads ({reason}).")
+    run_post_scraping_options(job, run_clean_option, run_extract_option)
 
-    # --- 10. Option de mise à jour des listes extraites (après la fermeture du navigateur) ---
-    # Utilise config.LEADS_CSV_FINAL_PATH
-    if run_extract_option and extract_leads and config.LEADS_CSV_FINAL_PATH.exists():
-        print("\n--- Mise à jour des Listes Extraites ---")
+    # --- Mettre à jour le statut final ---
+    # URLs laissées dans le checkpoint (échéance, nouvelles tentatives, session perdue) : RQ voit la tâche 'finished'
+    resumable = bool(job_checkpoint) and not job_completed
+    progress.stage(progress=100, resumable=resumable,
+                   status_message="Processus terminé : des URLs restent à reprendre (bouton Reprendre)." if resumable else "Processus complet terminé.")
+    print(f"[Progress] {progress.flush_count} envoi(s) de progression à Redis pour cette tâche.")
+    # ---
+    # URLs restées dans le checkpoint (échéance, nouvelles tentatives, session perdue) : un /resume-job les traitera
+    run_status = "completed (deadline)" if detail_progress['skipped_deadline'] or combinations_skipped else "completed (partial)" if retries_left or detail_progress['deferred'] else "completed"
+    write_run_report(job, output_csv_path, detail_progress, status=run_status,
+                     time_budget=time_budget, retry_queue=retry_queue, session_breaker=session_breaker)
+    # Message final de la fonction
+    print("\n--- Fonction run_full_scraping_process terminée ---")
+    return str(output_csv_path) if output_csv_path and output_csv_path.exists() else None
+
+
+# --- Mode split : découpage des combinaisons en sous-tâches RQ + job reduce ---
+def split_keyword_combinations(keywords_input_lists, shard_size):
+    """Découpe les combinaisons de mots-clés en shards de shard_size combinaisons (une sous-tâche RQ par shard)."""
+    all_combinations = generate_keyword_combinations(keywords_input_lists)
+    shard_size = max(1, int(shard_size))
+    return [all_combinations[i:i + shard_size] for i in range(0, len(all_combinations), shard_size)]
+
+
+def merge_shard_results(shard_job_ids, run_clean_option=False, run_extract_option=False):
+    """
+    Job reduce du mode split (dépend de toutes les sous-tâches) : fusionne les CSV des shards
+    dans un seul CSV dédupliqué sur 'URL_Originale_Source', supprime les CSV des shards terminés
+    (pour que clean.py ne compte pas deux fois les mêmes lignes), puis lance clean/extract.
+    Un shard en échec est fusionné avec ses résultats partiels (job.meta['output_csv']) ; son CSV est gardé
+    (job.meta['kept_shard_csvs']) tant qu'il a un checkpoint : /resume-job le reprend et le refusionne.
+    Job reduce relancé par /resume-job : le CSV fusionné précédent (job.meta['output_csv']) est complété.
+    Retourne le chemin du CSV fusionné, ou None si aucun résultat.
+    """
+    job = get_current_job()
+    print(f"\n--- [Main - Split] Fusion des résultats de {len(shard_job_ids)} sous-tâche(s) ---")
+    if job:
+        job.meta['progress'] = 90
+        job.meta['status_message'] = f"Fusion des résultats de {len(shard_job_ids)} sous-tâche(s)..."
+        job.save_meta()
+
+    shard_csv_paths = []
+    resumable_shard_csvs = set() # Shards interrompus avec checkpoint : leur CSV sera complété par la reprise
+    for shard_job_id in shard_job_ids:
         try:
-            print(f"Lancement de la mise à jour des listes depuis {config.LEADS_CSV_FINAL_PATH}...")
-            if job: # Mettre à jour le statut pendant l'extraction
-                 job.meta['status_message'] = "Extraction des listes (emails, téléphones...)..."
-                 job.save_meta()
-            # ---
-            # Passe le chemin depuis config.py
-            extract_leads.main(input_file_path=config.LEADS_CSV_FINAL_PATH)
-        except Exception as e_extract:
-            print(f"Erreur lors de la mise à jour des listes : {e_extract}")
-            traceback.print_exc()
+            shard_job = Job.fetch(shard_job_id, connection=job.connection) if job else None
+        except Exception as e_fetch:
+            print(f"[Main - Split] Sous-tâche {shard_job_id} introuvable (expirée ?) : {e_fetch}")
+            continue
+        if shard_job is None:
+            continue
+        shard_csv = shard_job.result or (shard_job.meta or {}).get('output_csv')
+        if shard_csv and Path(shard_csv).exists():
+            shard_csv_paths.append(Path(shard_csv))
+            if not shard_job.is_finished or (shard_job.meta or {}).get('resumable') or JobCheckpoint(shard_job_id).exists():
+                resumable_shard_csvs.add(Path(shard_csv))
+        else:
+            print(f"[Main - Split] Sous-tâche {shard_job_id} (statut: {shard_job.get_status()}) : aucun CSV de résultats.")
+
+    previous_merged_csv = (job.meta or {}).get('output_csv') if job else None
+    if previous_merged_csv and Path(previous_merged_csv).exists():
+        merged_csv_path = Path(previous_merged_csv) # Reprise : les shards déjà fusionnés (et supprimés) y sont
     else:
-        reason = "option désactivée" if not run_extract_option else ("module extract_leads.py non chargé" if not extract_leads else f"fichier {config.LEADS_CSV_FINAL_PATH.name} introuvable")
-        print(f"\nSkip l'option de mise à jour des listes ({reason}).")
+        merged_csv_path = build_results_csv_path(config.BASE_FINAL_CSV_FILE_NAME, job.id if job else None)
+    merge_writer = IncrementalResultWriter(merged_csv_path, FINAL_CSV_HEADERS).open()
+    merged_ok = False
+    try:
+        for shard_csv in shard_csv_paths:
+            with open(shard_csv, 'r', newline='', encoding='utf-8') as shard_file:
+                written = sum(1 for row in csv.DictReader(shard_file) if merge_writer.write_row(row))
+            print(f"[Main - Split] {shard_csv.name} : {written} ligne(s) unique(s) ajoutée(s).")
+        merged_ok = True
+    except Exception as e_merge:
+        print(f"[Main - Split] Erreur lors de la fusion des résultats : {e_merge}")
+        traceback.print_exc()
+    finally:
+        total_rows = merge_writer.count_rows()
+        merge_writer.close(remove_index=True)
+
+    if merged_ok:
+        for shard_csv in shard_csv_paths:
+            if shard_csv != merged_csv_path and shard_csv not in resumable_shard_csvs:
+                try:
+                    shard_csv.unlink()
+                except OSError as e_unlink:
+                    print(f"[Main - Split] Impossible de supprimer {shard_csv} : {e_unlink}")
+    print(f"[Main - Split] {total_rows} ligne(s) unique(s) au total dans {merged_csv_path.name}.")
+    if resumable_shard_csvs:
+        print(f"[Main - Split] {len(resumable_shard_csvs)} CSV de sous-tâche(s) interrompue(s) gardé(s) pour la reprise (/resume-job).")
+    if job:
+        job.meta['output_csv'] = str(merged_csv_path) if total_rows else None
+        job.meta['rows_written'] = total_rows
+        job.meta['kept_shard_csvs'] = sorted(str(shard_csv) for shard_csv in resumable_shard_csvs)
+        job.meta['resumable'] = bool(resumable_shard_csvs)
+        job.meta['progress'] = 95
+        job.meta['status_message'] = f"{total_rows} prospects fusionnés. Lancement nettoyage/extraction..."
+        job.save_meta()
+
+    run_post_scraping_options(job, run_clean_option, run_extract_option)
 
-    # --- Mettre à jour le statut final ---
     if job:
         job.meta['progress'] = 100
-        job.meta['status_message'] = "Processus complet terminé."
+        job.meta['status_message'] = ("Fusion terminée : des sous-tâches restent à reprendre (bouton Reprendre)." if job.meta.get('resumable')
+                                      else "Processus complet terminé (mode split).")
         job.save_meta()
-    # ---
-    # Message final de la fonction
-    print("\n--- Fonction run_full_scraping_process terminée ---")
+    return str(merged_csv_path) if merged_csv_path.exists() else None
 
 
 # --- Bloc d'exécution pour le lancement direct en ligne de commande ---
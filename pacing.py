@@ -0,0 +1,127 @@
+# /home/AlienScraper/pacing.py
+
+import time
+import random
+import threading
+from urllib.parse import urlparse
+
+import config # Import configuration centralisée
+from cancellation import cancel_token # Attentes interrompues dès l'annulation de la tâche (comptées comme pauses)
+
+
+# Statuts de scraping détaillé qui signalent un blocage du site (login forcé, checkpoint, challenge...)
+BLOCK_STATUSES = {
+    "Redirected to login/checkpoint/error page",
+    "Redirected/Inaccessible after timeout",
+    "Redirected/Inaccessible after container find",
+}
+# Statuts d'une page chargée normalement : le site tolère le rythme actuel
+SUCCESS_STATUSES = {"Success", "Completed", "Partial Success - Intro Block Not Found", "Success - AI Extraction"}
+
+
+# --- Bucket d'un domaine : délai adaptatif + backoff exponentiel ---
+class DomainBucket:
+    """
+    Token bucket à une requête : une requête est autorisée toutes les `delay` secondes (avec jitter).
+    - Chaque page chargée proprement réduit le délai (x PACING_SPEEDUP_FACTOR) jusqu'au minimum du domaine.
+    - Chaque signal de blocage double le délai (jusqu'au maximum) et impose une pause de backoff
+      exponentielle : PACING_BACKOFF_BASE_SECONDS * 2^(blocages consécutifs - 1).
+    """
+
+    def __init__(self, domain, min_delay, start_delay, max_delay):
+        self.domain = domain
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.delay = start_delay
+        self.next_allowed_at = 0.0
+        self.consecutive_blocks = 0
+
+    def reserve(self, now):
+        """Réserve le prochain créneau et retourne le temps d'attente (le lock du Pacer est tenu)."""
+        wait_seconds = max(0.0, self.next_allowed_at - now)
+        jittered_delay = self.delay * random.uniform(0.8, 1.2) # Rythme moins mécanique
+        self.next_allowed_at = max(now, self.next_allowed_at) + jittered_delay
+        return wait_seconds
+
+    def on_success(self):
+        self.consecutive_blocks = 0
+        self.delay = max(self.min_delay, self.delay * config.PACING_SPEEDUP_FACTOR)
+
+    def on_block(self, now):
+        self.consecutive_blocks += 1
+        self.delay = min(self.max_delay, self.delay * 2)
+        backoff_seconds = min(config.PACING_BACKOFF_MAX_SECONDS,
+                              config.PACING_BACKOFF_BASE_SECONDS * 2 ** (self.consecutive_blocks - 1))
+        self.next_allowed_at = max(self.next_allowed_at, now + backoff_seconds)
+        return backoff_seconds
+
+
+# --- Ordonnanceur central du rythme des requêtes (remplace les time.sleep(random.uniform(...)) fixes) ---
+class Pacer:
+    """
+    Un DomainBucket par domaine (facebook.com, instagram.com, google.com, autres sites...).
+    Partagé par tous les threads du process : les workers du pool de détail qui visitent
+    le même domaine se répartissent le même budget de requêtes.
+    """
+
+    def __init__(self, domain_settings):
+        self.domain_settings = domain_settings # domaine -> (délai min, délai initial, délai max) en secondes
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _domain_key(self, url_or_domain):
+        netloc = urlparse(url_or_domain).netloc if "://" in url_or_domain else url_or_domain
+        netloc = netloc.lower().split(':')[0]
+        for known_domain in self.domain_settings:
+            if known_domain != 'default' and (netloc == known_domain or netloc.endswith('.' + known_domain)):
+                return known_domain
+        return netloc or 'default'
+
+    def _bucket_locked(self, domain_key):
+        bucket = self._buckets.get(domain_key)
+        if bucket is None:
+            min_delay, start_delay, max_delay = self.domain_settings.get(domain_key, self.domain_settings['default'])
+            bucket = DomainBucket(domain_key, min_delay, start_delay, max_delay)
+            self._buckets[domain_key] = bucket
+        return bucket
+
+    def wait_turn(self, url_or_domain):
+        """Bloque jusqu'au prochain créneau autorisé pour ce domaine (à appeler juste avant driver.get)."""
+        if not config.PACING_ENABLED:
+            return 0.0
+        domain_key = self._domain_key(url_or_domain)
+        with self._lock:
+            wait_seconds = self._bucket_locked(domain_key).reserve(time.monotonic())
+        sleep_stage = f"pacing:{domain_key if domain_key in self.domain_settings else 'other'}"
+        cancel_token.sleep(wait_seconds, sleep_stage) # Un backoff de 10 min ne retarde pas une annulation
+        return wait_seconds
+
+    def report(self, url_or_domain, ok):
+        """Signale le résultat d'un chargement : ok=True page propre, ok=False captcha/checkpoint/redirection login."""
+        if not config.PACING_ENABLED:
+            return
+        domain_key = self._domain_key(url_or_domain)
+        with self._lock:
+            bucket = self._bucket_locked(domain_key)
+            if ok:
+                bucket.on_success()
+                return
+            backoff_seconds = bucket.on_block(time.monotonic())
+            current_delay = bucket.delay
+        print(f"  [Pacing] Signal de blocage sur {domain_key} : backoff {backoff_seconds:.0f}s, délai entre requêtes porté à {current_delay:.1f}s.")
+
+    def report_status(self, url, scraping_status):
+        """Classe un Statut_Scraping_Detail en succès / blocage (les autres statuts ne changent pas le rythme)."""
+        if scraping_status in SUCCESS_STATUSES:
+            self.report(url, ok=True)
+        elif scraping_status in BLOCK_STATUSES:
+            self.report(url, ok=False)
+
+    def current_delays(self):
+        """Délai courant par domaine (pour les logs / job.meta)."""
+        with self._lock:
+            return {domain_key: round(bucket.delay, 2) for domain_key, bucket in self._buckets.items()}
+
+
+# Instance partagée par main_scraper et les modules scraper/
+pacer = Pacer(config.PACING_DOMAIN_SETTINGS)
@@ -0,0 +1,80 @@
+# /home/AlienScraper/progress_reporter.py
+
+import time
+import threading
+import traceback
+
+
+# --- Progression des tâches RQ : mises à jour regroupées au lieu d'un job.save_meta() par URL ---
+class ProgressReporter:
+    """
+    Regroupe les mises à jour de job.meta et ne les envoie à Redis qu'au plus toutes les
+    flush_interval secondes ou tous les flush_every_items appels à update().
+    - update(**champs) : progression courante (par URL) -> envoi différé.
+    - stage(**champs)  : changement d'étape (recherche terminée, sauvegarde, fin...) -> envoi immédiat.
+    - flush()          : envoi immédiat de tout ce qui est en attente (fin de tâche).
+    L'envoi passe par un pipeline Redis (une seule requête réseau). Les champs coûteux à calculer
+    (chronos, délais de pacing...) sont fournis par des callbacks évalués uniquement au moment de l'envoi.
+    Sans tâche RQ (exécution en ligne de commande), toutes les méthodes sont sans effet.
+    Thread-safe : appelé par le producteur Google et tous les workers du pool.
+    """
+
+    def __init__(self, job, flush_interval, flush_every_items):
+        self.job = job
+        self.flush_interval = flush_interval
+        self.flush_every_items = max(1, flush_every_items)
+        self.flush_count = 0 # Nombre d'envois réels à Redis (pour les logs)
+        self._pending_items = 0
+        self._last_flush_at = time.monotonic()
+        self._flush_hooks = []
+        self._lock = threading.Lock()
+
+    def add_flush_hook(self, compute_fields):
+        """compute_fields() -> dict ajouté à job.meta juste avant chaque envoi."""
+        self._flush_hooks.append(compute_fields)
+
+    def update(self, **fields):
+        if not self.job:
+            return
+        with self._lock:
+            self.job.meta.update(fields)
+            self._pending_items += 1
+            flush_due = (self._pending_items >= self.flush_every_items
+                         or time.monotonic() - self._last_flush_at >= self.flush_interval)
+            if flush_due:
+                self._flush_locked()
+
+    def stage(self, **fields):
+        if not self.job:
+            return
+        with self._lock:
+            self.job.meta.update(fields)
+            self._flush_locked()
+
+    def flush(self):
+        if not self.job:
+            return
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        for compute_fields in self._flush_hooks:
+            try:
+                self.job.meta.update(compute_fields())
+            except Exception as e:
+                print(f"[Progress] Erreur dans un champ calculé de progression : {e}")
+        try:
+            connection = getattr(self.job, 'connection', None)
+            if connection is not None and hasattr(self.job, 'serializer'):
+                with connection.pipeline() as pipe:
+                    pipe.hset(self.job.key, 'meta', self.job.serializer.dumps(self.job.meta))
+                    pipe.execute()
+            else:
+                self.job.save_meta()
+            self.flush_count += 1
+        except Exception as e:
+            # La progression n'est qu'informative : une erreur Redis ne doit pas arrêter le scraping
+            print(f"[Progress] Erreur lors de l'envoi de la progression : {e}")
+            traceback.print_exc()
+        self._pending_items = 0
+        self._last_flush_at = time.monotonic()
@@ -0,0 +1,121 @@
+# /home/AlienScraper/result_writer.py
+
+import os
+import csv
+import sqlite3
+import threading
+import traceback
+from pathlib import Path
+
+from scraper.url_canonical import url_dedupe_key # Variantes d'une même URL = un seul prospect
+
+
+# --- Écriture incrémentale des résultats (une ligne CSV par URL, dès qu'elle est produite) ---
+class IncrementalResultWriter:
+    """
+    Ouvre le CSV de la tâche au démarrage, ajoute et flush chaque ligne dès qu'elle est mappée.
+    La déduplication sur la clé canonique de 'URL_Originale_Source' (url_dedupe_key) utilise un index
+    SQLite sur disque (<csv>.index.sqlite),
+    la mémoire reste donc constante quelle que soit la taille de la tâche, et le CSV est lisible
+    (résultats partiels) pendant que la tâche tourne.
+    Si le CSV existe déjà (reprise d'une tâche), il est complété en mode ajout sans réécrire l'en-tête.
+    Thread-safe : appelé par tous les workers du pool de scraping détaillé.
+    """
+
+    def __init__(self, csv_path, headers):
+        self.csv_path = Path(csv_path)
+        self.index_path = self.csv_path.with_suffix(".index.sqlite")
+        self.headers = headers
+        self.rows_written = 0 # Lignes écrites par cette instance
+        self._lock = threading.Lock()
+        self._csv_file = None
+        self._csv_writer = None
+        self._index_conn = None
+
+    def open(self):
+        """Ouvre (ou reprend) le CSV et son index. Retourne self pour un usage chaîné."""
+        self.csv_path.parent.mkdir(parents=True, exist_ok=True)
+        is_new_file = not self.csv_path.exists() or self.csv_path.stat().st_size == 0
+        self._csv_file = open(self.csv_path, 'a', newline='', encoding='utf-8')
+        self._csv_writer = csv.DictWriter(self._csv_file, fieldnames=self.headers, extrasaction='ignore')
+        if is_new_file:
+            self._csv_writer.writeheader()
+            self._csv_file.flush()
+
+        # check_same_thread=False : la connexion est partagée entre workers, protégée par self._lock
+        self._index_conn = sqlite3.connect(str(self.index_path), check_same_thread=False)
+        self._index_conn.execute("CREATE TABLE IF NOT EXISTS seen_keys (url TEXT PRIMARY KEY)")
+        self._index_conn.commit()
+        if not is_new_file:
+            self._rebuild_index_if_missing()
+        print(f"[Result Writer] Écriture incrémentale des résultats dans : {self.csv_path}")
+        return self
+
+    def _rebuild_index_if_missing(self):
+        """Reconstruit l'index à partir du CSV existant si l'index a été perdu (ex: supprimé à la main)."""
+        (indexed_count,) = self._index_conn.execute("SELECT COUNT(*) FROM seen_keys").fetchone()
+        if indexed_count:
+            return
+        with open(self.csv_path, 'r', newline='', encoding='utf-8') as existing_file:
+            for existing_row in csv.DictReader(existing_file):
+                original_url = (existing_row.get('URL_Originale_Source') or '').strip()
+                key = url_dedupe_key(original_url) or original_url
+                if key:
+                    self._index_conn.execute("INSERT OR IGNORE INTO seen_keys (url) VALUES (?)", (key,))
+        self._index_conn.commit()
+
+    def write_row(self, final_row):
+        """
+        Ajoute une ligne au CSV si son 'URL_Originale_Source' n'a pas déjà été écrite.
+        Retourne True si la ligne a été écrite, False si doublon ou ligne invalide.
+        """
+        key = final_row.get('URL_Originale_Source') if isinstance(final_row, dict) else None
+        if not isinstance(key, str) or not key.strip():
+            print(f"[Result Writer] Avertissement: ligne sans 'URL_Originale_Source' valide ignorée : {final_row}")
+            return False
+        key = url_dedupe_key(key) or key.strip()
+        try:
+            with self._lock:
+                cursor = self._index_conn.execute("INSERT OR IGNORE INTO seen_keys (url) VALUES (?)", (key,))
+                if cursor.rowcount == 0:
+                    return False # Doublon
+                self._csv_writer.writerow(final_row)
+                self._csv_file.flush()
+                self._index_conn.commit()
+                self.rows_written += 1
+                return True
+        except Exception as e:
+            print(f"[Result Writer] Erreur lors de l'écriture de la ligne {key} : {e}")
+            traceback.print_exc()
+            return False
+
+    def count_rows(self):
+        """Nombre total de lignes uniques dans le CSV (y compris celles d'une exécution précédente)."""
+        with self._lock:
+            (total,) = self._index_conn.execute("SELECT COUNT(*) FROM seen_keys").fetchone()
+            return total
+
+    def close(self, remove_index=False):
+        """
+        Ferme le CSV et l'index. remove_index=True à la fin normale d'une tâche (l'index ne sert
+        qu'aux reprises). Un CSV qui ne contient que l'en-tête est supprimé.
+        """
+        with self._lock:
+            total_rows = 0
+            if self._index_conn is not None:
+                (total_rows,) = self._index_conn.execute("SELECT COUNT(*) FROM seen_keys").fetchone()
+                self._index_conn.close()
+                self._index_conn = None
+            if self._csv_file is not None:
+                self._csv_file.close()
+                self._csv_file = None
+        try:
+            if remove_index and self.index_path.exists():
+                os.remove(self.index_path)
+            if remove_index and total_rows == 0 and self.csv_path.exists():
+                os.remove(self.csv_path)
+                print("[Result Writer] Aucune ligne écrite, fichier CSV vide supprimé.")
+            else:
+                print(f"[Result Writer] Fichier CSV fermé : {self.csv_path} ({total_rows} ligne(s) unique(s)).")
+        except OSError as e:
+            print(f"[Result Writer] Erreur lors du nettoyage des fichiers de résultats : {e}")
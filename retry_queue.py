@@ -0,0 +1,114 @@
+# /home/AlienScraper/retry_queue.py
+
+import time
+import heapq
+import itertools
+import threading
+
+import config # Import configuration centralisée
+
+
+# Échecs passagers du scraping détaillé (page lente, chargement dynamique interrompu...) : l'URL est
+# retentée plus tard. Tous les autres statuts sont définitifs (ex: "Skipped - Looks like Post/Photo URL",
+# "Page Not Found after timeout", "Critical Element Not Found") et la ligne est écrite tout de suite.
+RETRYABLE_STATUSES = {
+    "Timeout loading page elements",
+    "Timeout on dynamic load wait",
+    "Timeout (General)",
+    "Error loading page elements",
+    "Error - AI Page Load Failed",
+    "Error Calling Page Scraper", # Exception du driver pendant l'appel (WebDriverException, page bloquée...)
+}
+# Champs ajoutés à l'url_item (conservés dans le checkpoint pour une reprise de la tâche)
+ATTEMPTS_FIELD = "Tentatives_Detail"
+RETRY_AFTER_FIELD = "Retry_After" # Horodatage epoch : survit au redémarrage du worker, contrairement à time.monotonic()
+# Les URLs disponibles à quelques secondes d'écart repartent dans la même vague (tous les workers du pool occupés)
+READY_WINDOW_SECONDS = 5.0
+
+
+def is_retryable_status(scraping_status):
+    return scraping_status in RETRYABLE_STATUSES
+
+
+def retry_delay_seconds(attempts):
+    """Backoff exponentiel : RETRY_BASE_DELAY_SECONDS * 2^(tentatives - 1), plafonné à RETRY_MAX_DELAY_SECONDS."""
+    return min(config.RETRY_MAX_DELAY_SECONDS, config.RETRY_BASE_DELAY_SECONDS * 2 ** max(0, attempts - 1))
+
+
+# --- File différée des URLs à retenter ---
+class RetryQueue:
+    """
+    URLs en échec passager, chacune disponible après son délai de backoff.
+    schedule() est appelé par les workers après une tentative ratée ; à la fin de la tâche,
+    take_ready() rend les URLs dont le délai est écoulé pour un nouveau passage dans la file de détail.
+    Au-delà de RETRY_MAX_ATTEMPTS tentatives, l'échec est considéré comme définitif.
+    Thread-safe : alimentée par tous les workers du pool.
+    """
+
+    def __init__(self, max_attempts):
+        self.max_attempts = max_attempts
+        self.scheduled_count = 0
+        self.given_up_count = 0
+        self._heap = [] # (retry_after epoch, ordre d'arrivée, url_item)
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._heap)
+
+    def schedule(self, url_item, scraping_status):
+        """
+        Programme une nouvelle tentative si le statut est passager et qu'il reste des tentatives.
+        Retourne True si l'URL est mise en attente (sa ligne ne doit pas être écrite maintenant).
+        """
+        if not is_retryable_status(scraping_status):
+            return False
+        attempts = url_item.get(ATTEMPTS_FIELD, 0) + 1
+        url_item[ATTEMPTS_FIELD] = attempts
+        if attempts >= self.max_attempts:
+            with self._lock:
+                self.given_up_count += 1
+            return False
+        url_item[RETRY_AFTER_FIELD] = time.time() + retry_delay_seconds(attempts)
+        self.restore(url_item)
+        with self._lock:
+            self.scheduled_count += 1
+        return True
+
+    def restore(self, url_item):
+        """Remet une URL déjà programmée (reprise depuis le checkpoint) avec son délai d'origine."""
+        with self._lock:
+            heapq.heappush(self._heap, (url_item.get(RETRY_AFTER_FIELD, 0.0), next(self._order), url_item))
+
+    def seconds_until_next(self):
+        """Attente avant la prochaine vague d'URLs (0 si disponible, None si la file est vide)."""
+        with self._lock:
+            if not self._heap:
+                return None
+            return max(0.0, self._heap[0][0] - time.time())
+
+    def take_ready(self):
+        """Retire et retourne les URLs dont le délai de backoff est écoulé (ou le sera d'ici READY_WINDOW_SECONDS)."""
+        now = time.time() + READY_WINDOW_SECONDS
+        ready_items = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                ready_items.append(heapq.heappop(self._heap)[2])
+        return ready_items
+
+    def summary(self):
+        """Champs de job.meta / du rapport d'exécution."""
+        with self._lock:
+            return {
+                'retries_scheduled': self.scheduled_count,
+                'retries_pending': len(self._heap),
+                'retries_given_up': self.given_up_count,
+            }
+
+
+def create_retry_queue():
+    """RetryQueue de la tâche, ou None (RETRY_ENABLED=0 : chaque échec est écrit tel quel dès la première tentative)."""
+    if not config.RETRY_ENABLED or config.RETRY_MAX_ATTEMPTS <= 1:
+        return None
+    return RetryQueue(config.RETRY_MAX_ATTEMPTS)
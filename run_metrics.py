@@ -0,0 +1,132 @@
+# /home/AlienScraper/run_metrics.py
+
+import sys
+import json
+import time
+import threading
+import traceback
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource # Unix uniquement (les workers tournent sous Linux)
+except ImportError:
+    resource = None
+
+
+# --- Mémoire du process Python ---
+def worker_peak_rss_mb():
+    """
+    Pic de mémoire résidente du process Python (Mo), hors navigateurs Chrome. None si indisponible.
+    ru_maxrss couvre toute la vie du process : avec PERSISTENT_BROWSER=1, c'est le pic du worker
+    (toutes tâches confondues), pas celui de la tâche en cours (voir current_rss_mb).
+    """
+    if resource is None:
+        return None
+    # ru_maxrss est en Ko sous Linux (en octets sous macOS)
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(max_rss / 1024 / (1024 if sys.platform == 'darwin' else 1), 1)
+
+
+def current_rss_mb():
+    """Mémoire résidente actuelle du process Python (Mo), lue dans /proc (Linux). None si indisponible."""
+    try:
+        with open("/proc/self/statm", 'r') as f:
+            resident_pages = int(f.read().split()[1])
+        return round(resident_pages * resource.getpagesize() / (1024 * 1024), 1)
+    except Exception:
+        return None
+
+
+# --- Chronométrage par étape (où passe le temps d'une tâche de 2 h ?) ---
+class StageTimers:
+    """
+    Accumule les durées mesurées par étape (démarrage Chrome, login, recherche Google, chargement
+    de page, appels Gemini...) et produit count / total / p50 / p95 par étape.
+    Les pauses volontaires (pacing, attentes de rendu) sont enregistrées à part avec kind='sleep'
+    pour distinguer le temps passé à dormir du temps passé à travailler.
+    kind='call' : durée totale d'un appel qui contient d'autres étapes mesurées (scrape_facebook_page inclut
+    page_load:facebook, gemini_call:facebook et les pauses de pacing...). Détaillée, mais hors des totaux
+    work / sleep pour ne pas compter deux fois le même temps.
+    Thread-safe : alimenté par le producteur Google et tous les workers du pool.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Remet les compteurs à zéro (appelé au début de chaque tâche dans le worker)."""
+        with self._lock:
+            self._durations = {'work': {}, 'sleep': {}, 'call': {}}
+            self.started_at = time.monotonic()
+            self.started_at_wall = datetime.now()
+            self.rss_start_mb = current_rss_mb() # Comparée à la mémoire en fin de tâche dans le rapport
+
+    def record(self, stage, seconds, kind='work'):
+        with self._lock:
+            self._durations[kind].setdefault(stage, []).append(seconds)
+
+    @contextmanager
+    def timed(self, stage, kind='work'):
+        """with stage_timers.timed('page_load:facebook'): ... (la durée est enregistrée même en cas d'exception)"""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record(stage, time.monotonic() - start, kind)
+
+    def sleep(self, seconds, stage='sleep'):
+        """time.sleep comptabilisé comme pause volontaire."""
+        if seconds > 0:
+            time.sleep(seconds)
+            self.record(stage, seconds, kind='sleep')
+
+    @staticmethod
+    def _percentile(sorted_values, fraction):
+        index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+        return sorted_values[index]
+
+    def summary(self):
+        """{'work': {étape: {count, total_s, p50_s, p95_s}}, 'sleep': {...}, 'call': {...}, totaux work / sleep} — format JSON."""
+        with self._lock:
+            snapshot = {kind: {stage: list(values) for stage, values in stages.items()} for kind, stages in self._durations.items()}
+            elapsed = time.monotonic() - self.started_at
+        result = {'elapsed_s': round(elapsed, 1)}
+        for kind, stages in snapshot.items():
+            kind_summary = {}
+            for stage, values in sorted(stages.items()):
+                values.sort()
+                kind_summary[stage] = {
+                    'count': len(values),
+                    'total_s': round(sum(values), 2),
+                    'p50_s': round(self._percentile(values, 0.50), 2),
+                    'p95_s': round(self._percentile(values, 0.95), 2),
+                }
+            result[kind] = kind_summary
+            if kind != 'call': # Les appels englobent des étapes déjà comptées
+                result[f'{kind}_total_s'] = round(sum(stage['total_s'] for stage in kind_summary.values()), 1)
+        return result
+
+    def write_report(self, report_path, extra=None):
+        """Écrit le rapport JSON de la tâche (à côté du CSV de résultats). Retourne le chemin ou None."""
+        report = {
+            'started_at': self.started_at_wall.isoformat(timespec='seconds'),
+            'finished_at': datetime.now().isoformat(timespec='seconds'),
+            **(extra or {}),
+            'timings': self.summary(),
+        }
+        try:
+            report_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(report_path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2, default=str)
+            print(f"[Run Metrics] Rapport d'exécution écrit : {report_path}")
+            return report_path
+        except Exception as e:
+            print(f"[Run Metrics] Erreur lors de l'écriture du rapport {report_path} : {e}")
+            traceback.print_exc()
+            return None
+
+
+# Instance partagée par main_scraper, pacing et les modules scraper/ (une tâche à la fois par worker)
+stage_timers = StageTimers()
@@ -4,7 +4,6 @@ import time
 import json
 import os
 import re
-import random # Added for random sleeps
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -13,6 +12,12 @@ from selenium.common.exceptions import NoSuchElementException, TimeoutException,
 from urllib.parse import urlparse, parse_qs
 import traceback
 
+from pacing import pacer # Rythme adaptatif par domaine (remplace les pauses fixes)
+from run_metrics import stage_timers # Chronométrage par étape
+from event_log import get_logger # Journal structuré (console + <csv>_events.jsonl de la tâche)
+
+logger = get_logger("facebook_page")
+
 # --- Import Google Generative AI Library ---
 import google.generativeai as genai
 # Make sure GOOGLE_API_KEY environment variable is set for this to work
@@ -78,7 +83,8 @@ Analyze the following text:
     try:
         # Make the API call
         # Use a timeout for the API call in case of issues
-        response = gemini_model.generate_content(prompt, request_options={'timeout': 45}) # Increased timeout slightly
+        with stage_timers.timed('gemini_call:facebook'):
+            response = gemini_model.generate_content(prompt, request_options={'timeout': 45}) # Increased timeout slightly
 
         # Extract the text from the response
         response_text = response.text.strip()
@@ -365,7 +371,7 @@ def scrape_facebook_page(driver, page_url, source_info=None):
     Utilise AI pour extraire les informations de contact, type, adresse, et bio du texte.
     Retourne un dictionnaire contenant les informations extraites.
     """
-    print(f"\n  [FB Page Scraper] Scraping info pour URL: {page_url}")
+    logger.info("Scraping info pour URL : %s", page_url, extra={'url': page_url, 'stage': 'facebook_page'})
 
     # Définir les clés du dictionnaire de retour
     # Inclure les champs potentiellement utiles provenant de la recherche Google/FB
@@ -406,7 +412,7 @@ def scrape_facebook_page(driver, page_url, source_info=None):
                  # Only copy if our field is default or None/empty
                   if detailed_info.get(key) in ["Not Found", "N/A", "N/A (Insta)", "N/A (FB)", "Not Generated", "", None]:
                        detailed_info[key] = source_info.get(key, "N/A")
-        # print(f"    [FB Page Scraper] Added source info: {source_info}") # Too verbose
+        logger.debug("Added source info: %s", source_info, extra={'url': page_url, 'stage': 'facebook_page'})
 
 
     # Check if the URL looks like a specific post or photo instead of a main page
@@ -415,10 +421,11 @@ def scrape_facebook_page(driver, page_url, source_info=None):
     path_check = parsed_url_check.path.strip('/').lower()
     # Check for common post/photo/video indicators and patterns that aren't typical pages
     if any(segment in path_check for segment in ['posts', 'photos', 'videos', 'media']) or \
-       path_check.startswith('photo.php') or path_check.startswith('video.php') or \
+       path_check.split('/')[0] in ('photo.php', 'photo', 'video.php', 'story.php', 'permalink.php', 'watch') or \
        re.search(r'fbid=\d+|story_fbid=\d+|v=\d+', parsed_url_check.query.lower()):
 
-       print(f"  [FB Page Scraper] Skipping scraping info for URL that looks like a specific post/photo: {page_url}")
+       logger.info("Skipping scraping info for URL that looks like a specific post/photo: %s", page_url,
+                   extra={'url': page_url, 'stage': 'facebook_page', 'status': 'skipped'})
        detailed_info["Statut_Scraping_Detail"] = "Skipped - Looks like Post/Photo URL"
        detailed_info["Message_Erreur_Detail"] = "URL identified as a post/photo, not a main page."
        return detailed_info # Exit function early, keep "Not Found" for most fields
@@ -429,9 +436,10 @@ def scrape_facebook_page(driver, page_url, source_info=None):
     page_container_element = None
 
     try: # TRY block for navigating to and scraping a single page
-        # Naviguer vers la page. Ajouter une petite pause avant.
-        time.sleep(random.uniform(2, 4))
-        driver.get(page_url)
+        # Naviguer vers la page quand le rythme de facebook.com le permet.
+        pacer.wait_turn(page_url)
+        with stage_timers.timed('page_load:facebook'):
+            driver.get(page_url)
 
         # --- Robust Wait for Page Load and Anti-detection checks ---
         try:
@@ -448,13 +456,13 @@ def scrape_facebook_page(driver, page_url, source_info=None):
                     EC.presence_of_element_located((By.CSS_SELECTOR, 'div[data-visualcompletion="loading-state"]'))
                 )
             except TimeoutException:
-                # print("  [FB Page Scraper] Loading indicator still present after waiting.") # Too verbose
-                pass # Continue anyway
+                logger.debug("Loading indicator still present after waiting.", extra={'url': page_url, 'stage': 'facebook_page'}) # Continue anyway
 
             # Final check if the URL redirected to a problematic page AFTER waiting
             current_url_after_wait = driver.current_url
             if "login" in current_url_after_wait.lower() or "checkpoint" in current_url_after_wait.lower() or "notifications" in current_url_after_wait.lower() or "recover" in current_url_after_wait.lower():
-                 print(f"  [FB Page Scraper] Warning: Loaded URL looks like a redirect/error page AFTER WAIT: {current_url_after_wait}. Skipping scraping info.")
+                 logger.warning("Loaded URL looks like a redirect/error page AFTER WAIT: %s. Skipping scraping info.", current_url_after_wait,
+                                extra={'url': page_url, 'stage': 'facebook_page', 'status': 'redirected'})
                  detailed_info["Statut_Scraping_Detail"] = "Redirected to login/checkpoint/error page"
                  detailed_info["Message_Erreur_Detail"] = f"Redirected to {current_url_after_wait} after wait"
                  # On met à jour l'URL dans detailed_info au cas où la redirection a changé l'URL
@@ -463,12 +471,13 @@ def scrape_facebook_page(driver, page_url, source_info=None):
 
 
         except TimeoutException:
-            print(f"  [FB Page Scraper] Timeout waiting for elements or URL check for {page_url}.")
+            logger.warning("Timeout waiting for elements or URL check for %s.", page_url,
+                           extra={'url': page_url, 'stage': 'facebook_page', 'status': 'timeout'})
             detailed_info["Statut_Scraping_Detail"] = "Timeout loading page elements"
             detailed_info["Message_Erreur_Detail"] = "Timeout on initial wait for page elements."
             # We still let the function proceed to attempt extraction from whatever loaded.
         except Exception as e_wait:
-             print(f"  [FB Page Scraper] Error during initial page wait on {page_url}: {type(e_wait).__name__} - {e_wait}")
+             logger.warning("Error during initial page wait on %s: %s - %s", page_url, type(e_wait).__name__, e_wait, extra={'url': page_url, 'stage': 'facebook_page'})
              detailed_info["Statut_Scraping_Detail"] = "Error loading page elements"
              detailed_info["Message_Erreur_Detail"] = f"Error on initial wait: {type(e_wait).__name__}"
              # Continue even if wait fails
@@ -510,7 +519,7 @@ def scrape_facebook_page(driver, page_url, source_info=None):
 
 
         except Exception as e_name:
-             print(f"    [FB Page Scraper] Error during Page Name extraction attempts: {type(e_name).__name__} - {e_name}")
+             logger.warning("Error during Page Name extraction attempts: %s - %s", type(e_name).__name__, e_name, extra={'url': page_url, 'stage': 'facebook_page'})
              detailed_info["Message_Erreur_Detail"] += f"; Name extraction error: {type(e_name).__name__}"
 
         detailed_info["Nom de la Page"] = page_name
@@ -533,23 +542,23 @@ def scrape_facebook_page(driver, page_url, source_info=None):
              )
              intro_block_text = intro_container.text
              detailed_info["Full Intro/About Text (from container)"] = intro_block_text
-             # print(f"    [FB Page Scraper] Extracted Intro/About text (partial display):\n--- Start Intro Text ---\n{intro_block_text[:500]}...\n--- End Intro Text ---")
+             logger.debug("Extracted Intro/About text (partial display):\n%.500s", intro_block_text, extra={'url': page_url, 'stage': 'facebook_page'})
 
         except (TimeoutException, NoSuchElementException) as e:
-             print(f"  [FB Page Scraper] Intro/About container not found or changed ({type(e).__name__}). Attempting extraction from broader page text.")
+             logger.info("Intro/About container not found or changed (%s). Attempting extraction from broader page text.", type(e).__name__, extra={'url': page_url, 'stage': 'facebook_page'})
              detailed_info["Message_Erreur_Detail"] += f"; Intro block not found: {type(e).__name__}"
              # Fallback: Capture text from a broader area if the specific intro block is missed
              try:
                   # Try to get text from the main content area role="main" or article
                   page_container_element = driver.find_element(By.CSS_SELECTOR, 'div[role="main"], article')
                   full_page_text = page_container_element.text
-                  # print(f"    [FB Page Scraper] Extracted broader page text (partial display):\n--- Start Page Text ---\n{full_page_text[:500]}...\n--- End Page Text ---")
+                  logger.debug("Extracted broader page text (partial display):\n%.500s", full_page_text, extra={'url': page_url, 'stage': 'facebook_page'})
              except NoSuchElementException:
-                  print("    [FB Page Scraper] Broader page container (role=main or article) also not found.")
+                  logger.warning("Broader page container (role=main or article) also not found.", extra={'url': page_url, 'stage': 'facebook_page'})
                   detailed_info["Message_Erreur_Detail"] += "; Broader page container not found."
                   full_page_text = "" # Ensure it's an empty string if no container is found
              except Exception as e_broad_text:
-                  print(f"    [FB Page Scraper] Error extracting broader page text: {type(e_broad_text).__name__}.")
+                  logger.warning("Error extracting broader page text: %s.", type(e_broad_text).__name__, extra={'url': page_url, 'stage': 'facebook_page'})
                   detailed_info["Message_Erreur_Detail"] += f"; Broader text error: {type(e_broad_text).__name__}"
                   full_page_text = ""
 
@@ -561,18 +570,18 @@ def scrape_facebook_page(driver, page_url, source_info=None):
         ai_extracted_data = None
         if gemini_model and text_to_process: # Only call AI if model loaded and text is available
              try:
-                 print("    [FB Page Scraper] Sending text to AI for info extraction...")
+                 logger.debug("Sending text to AI for info extraction...", extra={'url': page_url, 'stage': 'facebook_page:ai'})
                  ai_extracted_data = extract_info_with_gemini_fb(text_to_process)
                  if ai_extracted_data:
-                      # print("    [FB Page Scraper] AI extraction successful.") # Too verbose
+                      logger.debug("AI extraction successful.", extra={'url': page_url, 'stage': 'facebook_page:ai'})
                       pass
                  else:
-                      print("    [FB Page Scraper] AI extraction returned no data or failed internally.")
+                      logger.info("AI extraction returned no data or failed internally.", extra={'url': page_url, 'stage': 'facebook_page:ai'})
                       detailed_info["Message_Erreur_Detail"] += "; AI extraction returned no data."
 
 
              except Exception as ai_e:
-                 print(f"    [FB Page Scraper] Error during AI extraction process: {type(ai_e).__name__} - {ai_e}")
+                 logger.warning("Error during AI extraction process: %s - %s", type(ai_e).__name__, ai_e, extra={'url': page_url, 'stage': 'facebook_page:ai'})
                  detailed_info["Message_Erreur_Detail"] += f"; AI extraction error: {type(ai_e).__name__}"
 
 
@@ -630,7 +639,7 @@ def scrape_facebook_page(driver, page_url, source_info=None):
                  detailed_info["Bio"] = ai_extracted_data["bio_text"]
 
         else: # AI extraction failed or gemini_model is None
-             # print("    [FB Page Scraper] AI extraction failed or not used. Falling back to regex parsing.") # Already logged
+            logger.debug("AI extraction failed or not used. Falling back to regex parsing.", extra={'url': page_url, 'stage': 'facebook_page:regex'})
 
             # === Fallback to Regex Parsing (if AI failed or not used) ===
             # This logic remains as a safety net if AI fails to extract certain fields from the text.
@@ -734,7 +743,7 @@ def scrape_facebook_page(driver, page_url, source_info=None):
                 if len(cleaned_phone_for_whatsapp_verifier) >= 6 and re.fullmatch(r'\d+', cleaned_phone_for_whatsapp_verifier):
                      # Note: This will generate a simple wa.me link. The formatting to +212 will happen in main_scraper.py
                      detailed_info["WhatsApp à vérifier"] = f"https://wa.me/{cleaned_phone_for_whatsapp_verifier}"
-                     # print(f"    [FB Page Scraper] Generated fallback WhatsApp link (to verify): {detailed_info['WhatsApp à vérifier']}") # Too verbose
+                     logger.debug("Generated fallback WhatsApp link (to verify): %s", detailed_info['WhatsApp à vérifier'], extra={'url': page_url, 'stage': 'facebook_page:regex'})
                 else:
                      detailed_info["WhatsApp à vérifier"] = "Invalid Phone Format for WhatsApp"
             except Exception as e:
@@ -746,11 +755,12 @@ def scrape_facebook_page(driver, page_url, source_info=None):
         if detailed_info["Statut_Scraping_Detail"] == "Attempting":
              detailed_info["Statut_Scraping_Detail"] = "Success"
 
-        # print(f"  [FB Page Scraper] Scraping terminé pour {page_url}. Statut: {detailed_info['Statut_Scraping_Detail']}. Nom trouvé: {detailed_info['Nom de la Page']}") # Too verbose
+        logger.debug("Scraping terminé. Nom trouvé : %s", detailed_info['Nom de la Page'],
+                     extra={'url': page_url, 'stage': 'facebook_page', 'status': detailed_info['Statut_Scraping_Detail']})
 
 
     except Exception as e: # Catch any other unexpected error during the process
-         print(f"  [FB Page Scraper] Une erreur inattendue s'est produite lors du scraping de {page_url}: {type(e).__name__} - {e}")
+         logger.error("Une erreur inattendue s'est produite lors du scraping de %s : %s - %s", page_url, type(e).__name__, e, extra={'url': page_url, 'stage': 'facebook_page'})
          detailed_info["Statut_Scraping_Detail"] = f"Unexpected Error: {type(e).__name__}"
          detailed_info["Message_Erreur_Detail"] = f"Overall error: {type(e).__name__} - {e}"
          traceback.print_exc() # Keep traceback for unexpected errors
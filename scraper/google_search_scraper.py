@@ -10,14 +10,25 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC # Keep this
 from itertools import product
 import undetected_chromedriver as uc
-from urllib.parse import urlparse, parse_qs, unquote # Importer pour le parsing d'URL
+from urllib.parse import unquote, urlencode # Importer pour le parsing d'URL
+import math
 import sys # Importer pour sys.exit (non utilisé actuellement, mais gardé)
 from pathlib import Path # Pour la gestion des chemins
 from datetime import datetime # Pour l'horodatage des fichiers de débogage
 import re # Pour nettoyer les noms de fichiers
+import config # Import configuration centralisée
+from pacing import pacer # Rythme adaptatif par domaine (remplace les pauses fixes)
+from run_metrics import stage_timers # Chronométrage par étape
+from scraper.url_canonical import canonical_url, url_dedupe_key # Déduplication des variantes d'une même URL
+from scraper.serp_parser import classify_serp_link, submit_serp_parse # Filtrage des liens / analyse HTML hors navigateur
+from event_log import get_logger # Journal structuré (console + <csv>_events.jsonl de la tâche)
+
+logger = get_logger("google_search")
 
 # --- Configuration ---
 GOOGLE_URL = "https://www.google.com"
+GOOGLE_DEFAULT_RESULTS_PER_PAGE = 10
+NEXT_PAGE_SELECTOR = 'a#pnnext, a[aria-label*="Suivant"], a[aria-label*="Next"]'
 
 # --- Configuration pour les screenshots de débogage (depuis config.py si possible) ---
 try:
@@ -36,6 +47,32 @@ except ImportError:
 
 # --- Fonctions de Recherche Google ---
 
+def build_search_url(search_query, start=0):
+    """URL de la page de résultats commençant au résultat start (0 : première page), avec langue / pays et num si configurés."""
+    params = {'q': search_query}
+    if config.GOOGLE_SEARCH_HL:
+        params['hl'] = config.GOOGLE_SEARCH_HL
+    if config.GOOGLE_SEARCH_GL:
+        params['gl'] = config.GOOGLE_SEARCH_GL
+    if start:
+        params['start'] = start
+    if config.GOOGLE_RESULTS_PER_PAGE != GOOGLE_DEFAULT_RESULTS_PER_PAGE:
+        params['num'] = config.GOOGLE_RESULTS_PER_PAGE
+    return f"{GOOGLE_URL}/search?{urlencode(params)}"
+
+
+def result_pages_needed(max_pages_per_search):
+    """
+    Nombre de pages à charger pour une combinaison. En pagination directe, max_pages_per_search est un objectif
+    de résultats (max_pages_per_search x 10, comme avec la pagination par bouton), atteint avec moins de pages
+    quand GOOGLE_RESULTS_PER_PAGE est plus grand.
+    """
+    if not config.GOOGLE_DIRECT_PAGINATION or max_pages_per_search <= 0:
+        return max_pages_per_search
+    target_results = max_pages_per_search * GOOGLE_DEFAULT_RESULTS_PER_PAGE
+    return math.ceil(target_results / max(1, config.GOOGLE_RESULTS_PER_PAGE))
+
+
 def go_to_google(driver):
     """Navigue vers la page d'accueil de Google et gère potentiellement le consentement."""
     if driver:
@@ -49,7 +86,8 @@ def go_to_google(driver):
             # print(f"Connecté à {GOOGLE_URL}.") # Désactivé, le script principal affichera les logs globaux
             return True
         except TimeoutException as te:
-            print(f"  [Google Search] Timeout lors de la connexion à Google ou attente barre recherche initiale: {te}")
+            logger.warning("Timeout lors de la connexion à Google ou attente barre recherche initiale: %s", te,
+                           extra={'url': GOOGLE_URL, 'stage': 'google_search', 'status': 'timeout'})
             try:
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 safe_context = "go_to_google"
@@ -58,18 +96,18 @@ def go_to_google(driver):
                 with open(html_path, "w", encoding="utf-8") as f:
                     f.write(driver.page_source)
                 driver.save_screenshot(str(png_path))
-                print(f"  [Google Search] Page source et screenshot sauvegardés dans {SCREENSHOTS_DIR_GGL} (go_to_google).")
+                logger.debug("Page source et screenshot sauvegardés dans %s (go_to_google).", SCREENSHOTS_DIR_GGL, extra={'stage': 'google_search'})
             except Exception as e_save:
-                print(f"  [Google Search] Erreur lors de la sauvegarde de la page source/screenshot: {e_save}")
+                logger.warning("Erreur lors de la sauvegarde de la page source/screenshot: %s", e_save, extra={'stage': 'google_search'})
             return False
         except Exception as e: # Capturer WebDriverException aussi
-            print(f"  [Google Search] Erreur lors de la connexion à Google : {e}")
+            logger.warning("Erreur lors de la connexion à Google : %s", e, extra={'url': GOOGLE_URL, 'stage': 'google_search', 'status': 'error'})
             return False
     return False
 
 def perform_search(driver, keyword):
     """Trouve la barre de recherche Google et effectue la recherche."""
-    print(f"  [Google Search] Effectuer la recherche pour : '{keyword}'")
+    logger.info("Effectuer la recherche pour : '%s'", keyword, extra={'stage': 'google_search', 'keyword': keyword})
     consent_clicked = False
     # Le premier bloc try-except semble être le principal, le second est une répétition. Je vais commenter le second.
     try:
@@ -85,22 +123,22 @@ def perform_search(driver, keyword):
             try:
                 consent_button = WebDriverWait(driver, 5).until(EC.element_to_be_clickable((By.XPATH, selector)))
                 if consent_button.is_displayed() and consent_button.is_enabled():
-                    print(f"  [Google Search] Bouton de consentement trouvé ({selector}), clic...")
+                    logger.info("Bouton de consentement trouvé (%s), clic...", selector, extra={'stage': 'google_consent'})
                     # Essayer un clic JavaScript si le clic normal est intercepté
                     try:
                         consent_button.click()
                     except ElementClickInterceptedException:
-                        print("  [Google Search] Clic normal intercepté, tentative avec JavaScript.")
+                        logger.debug("Clic normal intercepté, tentative avec JavaScript.", extra={'stage': 'google_consent'})
                         driver.execute_script("arguments[0].click();", consent_button)
                     consent_clicked = True
-                    time.sleep(random.uniform(2, 3)) # Pause plus longue après le clic
+                    stage_timers.sleep(random.uniform(2, 3), 'serp_wait:google') # Pause plus longue après le clic
                     break # Sortir de la boucle si un bouton est cliqué
-                # else: print(f"  [Google Search] Bouton de consentement trouvé ({selector}) mais non visible/activé.") # Debug
+                else:
+                    logger.debug("Bouton de consentement trouvé (%s) mais non visible/activé.", selector, extra={'stage': 'google_consent'})
             except TimeoutException:
-                # print(f"  [Google Search] Bouton de consentement non trouvé avec sélecteur: {selector}") # Debug
-                pass # Le bouton n'a pas été trouvé, essayer le suivant
+                logger.debug("Bouton de consentement non trouvé avec sélecteur : %s", selector, extra={'stage': 'google_consent'}) # Essayer le suivant
         if not consent_clicked:
-            print("  [Google Search] Aucun bouton de consentement évident trouvé ou déjà accepté.")
+            logger.debug("Aucun bouton de consentement évident trouvé ou déjà accepté.", extra={'stage': 'google_consent'})
         # --- Fin Gestion Consentement ---
 
         # Revenir à Google peut être redondant si le consentement n'a pas redirigé, mais assure l'état
@@ -115,11 +153,11 @@ def perform_search(driver, keyword):
         )
         search_box_home.clear()
         search_box_home.send_keys(keyword)
-        time.sleep(random.uniform(0.5, 1.5))
+        stage_timers.sleep(random.uniform(0.5, 1.5), 'serp_wait:google')
         search_box_home.send_keys(Keys.RETURN)
 
         WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.ID, "search"))) # Attendre que les résultats apparaissent
-        # print("  [Google Search] Recherche effectuée avec succès. Page de résultats chargée.") # Désactivé
+        logger.debug("Recherche effectuée avec succès. Page de résultats chargée.", extra={'stage': 'google_search', 'keyword': keyword})
         return True
     except TimeoutException as te:
         current_url = "Non récupérable"
@@ -134,9 +172,9 @@ def perform_search(driver, keyword):
             with open(html_path, "w", encoding="utf-8") as f:
                 f.write(driver.page_source)
             driver.save_screenshot(str(png_path))
-            print(f"  [Google Search] Page source et screenshot sauvegardés dans {SCREENSHOTS_DIR_GGL} (perform_search timeout).")
+            logger.info("Page source et screenshot sauvegardés dans %s (perform_search timeout).", SCREENSHOTS_DIR_GGL, extra={'stage': 'google_search'})
         except Exception as e_save:
-            print(f"  [Google Search] Erreur lors de la sauvegarde de la page source/screenshot: {e_save}")
+            logger.warning("Erreur lors de la sauvegarde de la page source/screenshot : %s", e_save, extra={'stage': 'google_search'})
 
         # Tentative de détection de CAPTCHA
         captcha_detected = False
@@ -161,188 +199,184 @@ def perform_search(driver, keyword):
         if any(indicator in current_url.lower() for indicator in captcha_indicators_url) or \
            (page_content_lower and any(indicator in page_content_lower for indicator in captcha_indicators_page)):
             captcha_detected = True
-            print(f"  [Google Search] !!! CAPTCHA Google détecté sur {current_url} (Titre: {page_title}). Intervention manuelle ou réessai nécessaire. Abandon de cette recherche. !!!")
-        
-        print(f"  [Google Search] Erreur (Timeout) dans perform_search: {te}. Impossible de trouver la barre de recherche (CAPTCHA: {captcha_detected}). URL: {current_url}, Titre: {page_title}")
+            logger.error("!!! CAPTCHA Google détecté sur %s (Titre: %s). Intervention manuelle ou réessai nécessaire. Abandon de cette recherche. !!!",
+                         current_url, page_title, extra={'stage': 'google_search', 'url': current_url, 'status': 'captcha', 'keyword': keyword})
+
+        logger.error("Erreur (Timeout) dans perform_search : %s. Impossible de trouver la barre de recherche (CAPTCHA: %s). URL: %s, Titre: %s",
+                     te, captcha_detected, current_url, page_title, extra={'stage': 'google_search', 'url': current_url, 'keyword': keyword})
         return False
 
     except WebDriverException as e:
-        print(f"  [Google Search] Erreur WebDriver lors de la recherche pour '{keyword}' : {e}")
+        logger.error("Erreur WebDriver lors de la recherche pour '%s' : %s", keyword, e, extra={'stage': 'google_search', 'keyword': keyword})
         return False
     except Exception as e:
-        print(f"  [Google Search] Erreur inattendue lors de la recherche pour '{keyword}' : {e}")
+        logger.error("Erreur inattendue lors de la recherche pour '%s' : %s", keyword, e, extra={'stage': 'google_search', 'keyword': keyword})
         return False
 
 
-def extract_google_results(driver, keyword_combination):
+def open_search_url(driver, search_query):
     """
-    Analyse la page de résultats Google actuelle, extrait les liens Facebook/Instagram et leurs titres.
-    Retourne une liste de dictionnaires { 'title': ..., 'url': ..., 'source_keyword': ..., 'type': ... }.
+    Ouvre directement la page de résultats de search_query (un seul driver.get, sans barre de recherche).
+    Retourne False si les résultats n'apparaissent pas (consentement, captcha ou autre interstitiel) :
+    l'appelant repasse alors par perform_search, qui gère le consentement et tape la requête.
     """
-    # print("  [Google Search] Extraction des résultats de la page actuelle...") # Désactivé, rend le log trop verbeux
-    page_results = []
-
     try:
-        # Attendre un élément commun aux pages de résultats pour s'assurer qu'elle est chargée
-        WebDriverWait(driver, 10).until(
-             EC.presence_of_element_located((By.CSS_SELECTOR, 'div#search, div.g, div.rc')) # Éléments courants
-        )
-        time.sleep(random.uniform(1, 2)) # Petite pause supplémentaire
+        driver.get(build_search_url(search_query))
+        WebDriverWait(driver, 15).until(EC.presence_of_element_located((By.ID, "search")))
+        logger.debug("Page de résultats ouverte directement par URL.", extra={'stage': 'google_search', 'keyword': search_query})
+        return True
+    except TimeoutException:
+        current_url = "Non récupérable"
+        try:
+            current_url = driver.current_url
+        except Exception:
+            pass
+        logger.info("Pas de résultats après ouverture directe (interstitiel ? %s) : recherche tapée dans la page.", current_url,
+                    extra={'stage': 'google_search', 'keyword': search_query, 'url': current_url, 'status': 'interstitial'})
+        return False
+    except Exception as e:
+        logger.warning("Erreur lors de l'ouverture directe de la recherche : %s - %s. Recherche tapée dans la page.", type(e).__name__, e,
+                       extra={'stage': 'google_search', 'keyword': search_query})
+        return False
+
+
+# Un seul aller-retour WebDriver pour toute la page : chaque find_element / get_attribute / .text
+# est une requête HTTP vers chromedriver (4 à 6 par conteneur avec l'ancien parcours élément par élément).
+# Mêmes sélecteurs que _collect_serp_links_with_elements ; innerText équivaut au .text de Selenium.
+SERP_LINKS_SCRIPT = """
+const links = [];
+for (const container of document.querySelectorAll('div.tF2Cxc')) {
+    const link = container.querySelector('div.yuRUbf > a[href], div > a[href][data-ved]')
+              || container.querySelector('a[href]:not([role="button"])');
+    if (!link) continue;
+    const h3 = link.querySelector('h3');
+    links.push({href: link.href, title: ((h3 && h3.innerText.trim()) || link.innerText.trim() || '')});
+}
+return links;
+"""
 
-        # Sélecteurs CSS pour les conteneurs de résultats principaux
-        # --- MODIFICATION : Utiliser un sélecteur plus précis basé sur l'analyse du HTML fourni ---
-        result_containers = driver.find_elements(By.CSS_SELECTOR, 'div.tF2Cxc') # Cible les blocs contenant yuRUbf
-        # if not result_containers:
-        #      print("  [Google Search] Aucun conteneur de résultats standards trouvé sur cette page.") # Désactivé
 
-        for container in result_containers:
+def _collect_serp_links_with_script(driver):
+    """Liens {href, title} des conteneurs de résultats, en un seul execute_script."""
+    return driver.execute_script(SERP_LINKS_SCRIPT) or []
+
+
+def _collect_serp_links_with_elements(driver):
+    """Ancien parcours élément par élément (plusieurs allers-retours par conteneur). Secours si le script échoue."""
+    serp_links = []
+    for container in driver.find_elements(By.CSS_SELECTOR, 'div.tF2Cxc'): # Cible les blocs contenant yuRUbf
+        try:
             try:
-                link_element = None
-                url = None
-                # Essayer de trouver le lien principal dans le conteneur
+                # Sélecteur plus spécifique pour le lien principal (souvent dans un h3)
+                link_element = container.find_element(By.CSS_SELECTOR, 'div.yuRUbf > a[href], div > a[href][data-ved]')
+            except NoSuchElementException:
+                # Essayer un sélecteur plus générique si le premier échoue
                 try:
-                    # Sélecteur plus spécifique pour le lien principal (souvent dans un h3)
-                    link_element = container.find_element(By.CSS_SELECTOR, 'div.yuRUbf > a[href], div > a[href][data-ved]')
-                    url = link_element.get_attribute('href')
+                    link_element = container.find_element(By.CSS_SELECTOR, 'a[href]:not([role="button"])')
                 except NoSuchElementException:
-                     # Essayer un sélecteur plus générique si le premier échoue
-                     try:
-                          link_element = container.find_element(By.CSS_SELECTOR, 'a[href]:not([role="button"])')
-                          url = link_element.get_attribute('href')
-                     except NoSuchElementException:
-                          pass # Pas de lien trouvé dans ce conteneur
-
-                # Nettoyer les URLs de redirection Google
-                if url and "google." in urlparse(url).netloc and "/url?q=" in url:
-                     try:
-                          parsed_url = urlparse(url)
-                          query_params = parse_qs(parsed_url.query)
-                          if 'q' in query_params and query_params['q']:
-                               url = query_params['q'][0] # Prendre l'URL réelle
-                          else:
-                               url = None # URL de redirection invalide
-                     except Exception:
-                          url = None # Échec du parsing
-
-                if url:
-                    # --- Vérification si l'URL est une page Facebook ou Instagram (avec filtre de slashes) ---
-                    is_facebook = False
-                    is_instagram = False
-                    cleaned_url_lower = url.lower() # Convertir en minuscules une seule fois
-
-                    # Validation pour Facebook
-                    if "facebook.com/" in cleaned_url_lower and \
-                       "facebook.com/ads" not in cleaned_url_lower and \
-                       "facebook.com/l.php" not in cleaned_url_lower and \
-                       not cleaned_url_lower.startswith("https://m.facebook.com"):
-                        try:
-                            parsed_url_fb = urlparse(url)
-                            path_fb = parsed_url_fb.path.strip('/')
-                            slash_count_fb = path_fb.count('/')
-                            MAX_SLASHES_IN_FB_PATH = 1
-
-                            # Exclure les chemins courants non liés à des profils/pages
-                            exclude_fb_segments = ['events', 'groups', 'notes', 'photo', 'video', 'watch', 'marketplace', 'gaming', 'fundraisers', 'login', 'sharer', 'dialog', 'pages', 'stories', 'help', 'settings', 'notifications', 'messages', 'friends', 'bookmarks', 'directory']
+                    continue # Pas de lien trouvé dans ce conteneur
+            title = ""
+            try:
+                title = link_element.find_element(By.CSS_SELECTOR, 'h3').text.strip()
+            except NoSuchElementException:
+                pass
+            serp_links.append({'href': link_element.get_attribute('href'), 'title': title or link_element.text.strip()})
+        except StaleElementReferenceException:
+            # L'élément a disparu, on passe au suivant
+            logger.debug("Stale element reference, conteneur ignoré.", extra={'stage': 'google_serp_extract'})
+        except Exception as e_container:
+            # Ignorer les erreurs mineures pour un seul conteneur
+            logger.debug("Erreur mineure lors du traitement d'un conteneur : %s", e_container, extra={'stage': 'google_serp_extract'})
+    return serp_links
 
-                            if path_fb and slash_count_fb <= MAX_SLASHES_IN_FB_PATH and \
-                               not path_fb.isdigit() and \
-                               not any(segment in path_fb.split('/') for segment in exclude_fb_segments) and \
-                               'profile.php?id=' not in url: # Exclure les anciens profils par ID pour l'instant
-                                is_facebook = True
-                            elif 'profile.php?id=' in url: # Gérer spécifiquement les profils par ID
-                                is_facebook = True
 
+def extract_google_results(driver, keyword_combination):
+    """
+    Analyse la page de résultats Google actuelle, extrait les liens Facebook/Instagram et leurs titres.
+    Retourne une liste de dictionnaires { 'Titre_Google', 'URL', 'Source_Mot_Cle', 'Type_Lien_Google' }.
+    Les liens sont lus en un seul execute_script puis filtrés en Python (classify_serp_link).
+    """
+    logger.debug("Extraction des résultats de la page actuelle...", extra={'stage': 'google_serp_extract', 'keyword': keyword_combination})
+    page_results = []
 
-                        except Exception as e_parse_fb:
-                            pass # Ignorer les erreurs de parsing
+    try:
+        # Attendre un élément commun aux pages de résultats pour s'assurer qu'elle est chargée
+        WebDriverWait(driver, 10).until(
+             EC.presence_of_element_located((By.CSS_SELECTOR, 'div#search, div.g, div.rc')) # Éléments courants
+        )
+        stage_timers.sleep(random.uniform(1, 2), 'serp_wait:google') # Petite pause supplémentaire
 
-                    # Validation pour Instagram
-                    elif "instagram.com/" in cleaned_url_lower and \
-                         "instagram.com/ads" not in cleaned_url_lower:
-                        try:
-                            parsed_url_insta = urlparse(url)
-                            path_insta = parsed_url_insta.path.strip('/')
-                            slash_count_insta = path_insta.count('/')
-                            MAX_SLASHES_IN_INSTA_PATH = 1
-
-                            # Exclusions pour Instagram (segments de chemin courants)
-                            exclude_insta_segments_startswith = [
-                                'p/', 'reel/', 'explore', 'tags', 'locations', 'developer', 'about',
-                                'legal', 'api', 'accounts', 'login', 'emails', 'challenge', 'direct', 'stories'
-                            ]
-
-                            if path_insta and slash_count_insta <= MAX_SLASHES_IN_INSTA_PATH and \
-                               not any(path_insta.startswith(segment) for segment in exclude_insta_segments_startswith) and \
-                               '.' not in path_insta: # Exclure les chemins avec des points (fichiers)
-                                is_instagram = True
-
-                        except Exception as e_parse_insta:
-                            pass # Ignorer les erreurs de parsing
-
-                    # --- Si c'est une URL Facebook OU une URL Instagram (selon les filtres) ---
-                    if is_facebook or is_instagram:
-                        # Essayer d'extraire un titre significatif
-                        title = url # Titre par défaut
-                        try:
-                            # Essayer le sélecteur h3 le plus courant
-                            title_element = link_element.find_element(By.CSS_SELECTOR, 'h3')
-                            title_text = title_element.text.strip()
-                            if title_text:
-                                title = title_text
-                            else: # Si h3 est vide, essayer le texte du lien
-                                link_text = link_element.text.strip()
-                                if link_text:
-                                    title = link_text
-                        except NoSuchElementException:
-                             # Si pas de h3, essayer le texte du lien directement
-                             try:
-                                 link_text = link_element.text.strip()
-                                 if link_text:
-                                     title = link_text
-                             except Exception:
-                                 pass # Garder l'URL comme titre par défaut
-                        except Exception:
-                             pass # Garder l'URL comme titre par défaut
-
-                        # Ajouter à page_results SEULEMENT si c'est un profil FB ou Insta valide
-                        # Vérifier que l'URL n'est pas juste la page d'accueil
-                        if url.strip().lower() not in ["https://www.facebook.com/", "https://www.instagram.com/"]:
-                            page_results.append({
-                                "Titre_Google": title,
-                                "URL": url,
-                                "Source_Mot_Cle": keyword_combination,
-                                "Type_Lien_Google": "Facebook" if is_facebook else "Instagram"
-                            })
-
-            except StaleElementReferenceException:
-                # print("  [Google Search] Stale element reference, skipping this container.") # Désactivé
-                pass # L'élément a disparu, on passe au suivant
-            except Exception as e_container:
-                # print(f"  [Google Search] Erreur mineure lors du traitement d'un conteneur: {e_container}") # Désactivé
-                pass # Ignorer les erreurs mineures pour un seul conteneur
+        try:
+            with stage_timers.timed('google_serp_links'):
+                serp_links = _collect_serp_links_with_script(driver)
+        except WebDriverException as e_script:
+            logger.warning("Extraction par script impossible (%s), parcours élément par élément.", type(e_script).__name__,
+                           extra={'stage': 'google_serp_extract', 'keyword': keyword_combination})
+            with stage_timers.timed('google_serp_links'):
+                serp_links = _collect_serp_links_with_elements(driver)
+        if not serp_links:
+            logger.debug("Aucun conteneur de résultats standards trouvé sur cette page.", extra={'stage': 'google_serp_extract', 'keyword': keyword_combination})
+
+        for serp_link in serp_links:
+            result = classify_serp_link(serp_link.get('href'), serp_link.get('title'), keyword_combination)
+            if result:
+                page_results.append(result)
 
     except TimeoutException:
-        print("  [Google Search] Timeout lors de l'attente des conteneurs de résultats sur la page.")
+        logger.warning("Timeout lors de l'attente des conteneurs de résultats sur la page.", extra={'stage': 'google_serp_extract', 'keyword': keyword_combination})
     except Exception as e:
-        print(f"  [Google Search] Erreur lors de l'extraction globale des résultats de la page : {e}")
+        logger.error("Erreur lors de l'extraction globale des résultats de la page : %s", e, extra={'stage': 'google_serp_extract', 'keyword': keyword_combination})
 
-    # print(f"  [Google Search] {len(page_results)} lien(s) Facebook/Instagram extrait(s) de cette page.") # Désactivé
+    logger.debug("%d lien(s) Facebook/Instagram extrait(s) de cette page.", len(page_results), extra={'stage': 'google_serp_extract', 'keyword': keyword_combination})
     return page_results
 
 
-# --- Fonction Principale pour le Scraping Google ---
-def scrape_google_search(driver, keyword_combinations, max_pages_per_search, google_link_types=None):
+# --- Générateur de résultats Google (producteur du pipeline recherche → détail) ---
+def iter_google_search(driver, keyword_combinations, max_pages_per_search, google_link_types=None, on_combination_done=None, should_stop=None, time_budget=None, serp_cache=None):
     """
-    Prend une instance de driver, une liste de combinaisons de mots-clés,
-    la limite de pages par recherche, et une liste optionnelle de types de liens ('facebook', 'instagram', etc.).
-    Effectue les recherches Google et retourne une liste de dictionnaires
-    contenant les URLs pertinentes trouvées.
+    Mêmes paramètres que scrape_google_search, mais produit chaque nouvelle URL pertinente
+    dès que sa page de résultats est analysée, au lieu d'attendre la fin de toutes les combinaisons.
+    Le scraping détaillé peut ainsi démarrer pendant que la recherche continue.
+    on_combination_done(keyword_combination) est appelé quand toutes les pages d'une combinaison
+    ont été parcourues (utilisé par les checkpoints pour ne pas la refaire lors d'une reprise).
+    should_stop() -> True (annulation de la tâche) arrête la recherche avant la combinaison ou la page suivante ;
+    la combinaison interrompue n'est pas signalée comme terminée.
+    time_budget (time_budget.TimeBudget) : nombre de pages de chaque combinaison réduit, puis recherche
+    arrêtée, quand le temps restant de la tâche ne suffit plus (durée de chaque page enregistrée).
+    Pagination directe (GOOGLE_DIRECT_PAGINATION) : max_pages_per_search x 10 est l'objectif de résultats par combinaison,
+    chargé en pages de GOOGLE_RESULTS_PER_PAGE résultats (voir result_pages_needed).
+    serp_cache (serp_cache.SerpCache) : une combinaison dont toutes les pages sont en cache est servie sans
+    ouvrir Google ; sinon elle est cherchée normalement et chaque page de résultats est mise en cache.
     """
     print("\n--- Démarrage du scraping de recherche Google ---")
 
-    collected_google_urls = []
+    total_yielded = 0
     seen_urls_google_search = set()
 
+    def take_new_results(page_results, keyword_combination, page_num, from_cache=False):
+        """Résultats d'une page pas encore vus pour cette tâche (URL canonique, rang Google), puis mesure de la page."""
+        nonlocal serp_rank, total_yielded, page_started_at
+        new_results = []
+        for result in page_results:
+            url_to_check = result.get('URL')
+            serp_rank += 1 # Rang du résultat pour cette combinaison (toutes pages confondues)
+            url_key = url_dedupe_key(url_to_check) # m.facebook.com/x, facebook.com/x?locale=... : même clé
+            if url_key and url_key not in seen_urls_google_search:
+                # Ajouter Type_Source pour identifier la source
+                mutable_result = result.copy()
+                mutable_result['URL'] = canonical_url(url_to_check)
+                mutable_result['Type_Source'] = 'Google'
+                mutable_result['Rang_Google'] = serp_rank # Utilisé pour prioriser le scraping détaillé
+                seen_urls_google_search.add(url_key)
+                new_results.append(mutable_result)
+        total_yielded += len(new_results)
+        logger.info("Page %d%s : %d nouvelle(s) URL(s) pertinente(s).", page_num, " (cache)" if from_cache else "", len(new_results),
+                    extra={'stage': 'google_search', 'keyword': keyword_combination, 'page': page_num})
+        if time_budget and not from_cache: # Une page en cache ne dit rien de la durée d'une page Google
+            time_budget.record_search_page(time.monotonic() - page_started_at, len(new_results))
+        page_started_at = time.monotonic()
+        return new_results
+
     # --- Préparer les opérateurs 'site:' si des types de liens sont spécifiés ---
     site_operators = ""
     if google_link_types:
@@ -350,26 +384,82 @@ def scrape_google_search(driver, keyword_combinations, max_pages_per_search, goo
         site_operators_list = [f"site:{link_type.strip()}.com" for link_type in google_link_types if link_type.strip()]
         if site_operators_list:
             site_operators = " OR ".join(site_operators_list)
-            print(f"  [Google Search] Utilisation des opérateurs de site : {site_operators}")
+            logger.info("Utilisation des opérateurs de site : %s", site_operators, extra={'stage': 'google_search'})
     # --- Fin préparation opérateurs 'site:' ---
 
+    pages_limit = result_pages_needed(max_pages_per_search) # Pages de GOOGLE_RESULTS_PER_PAGE résultats en pagination directe
+    # Avec num (pagination directe), une "page 2" ne couvre pas les mêmes résultats : clé de cache distincte
+    results_per_page = config.GOOGLE_RESULTS_PER_PAGE if config.GOOGLE_DIRECT_PAGINATION else GOOGLE_DEFAULT_RESULTS_PER_PAGE
+    serp_cache_suffix = f" [num={results_per_page}]" if results_per_page != GOOGLE_DEFAULT_RESULTS_PER_PAGE else ""
+
     if go_to_google(driver):
         for i, keyword_combination in enumerate(keyword_combinations):
-            print(f"\n  [Google Search] Traitement combinaison {i+1}/{len(keyword_combinations)} : '{keyword_combination}'")
+            if should_stop and should_stop():
+                logger.info("Arrêt demandé : recherche Google interrompue.", extra={'stage': 'google_search'})
+                break
+            pages_this_combination = pages_limit
+            if time_budget:
+                combinations_left = len(keyword_combinations) - i
+                pages_this_combination = time_budget.pages_for_next_combination(combinations_left, pages_limit)
+                if pages_this_combination == 0:
+                    time_budget.combinations_skipped += combinations_left
+                    logger.warning("Temps restant insuffisant : recherche Google arrêtée, %d combinaison(s) non traitée(s).", combinations_left,
+                                   extra={'stage': 'google_search', 'status': 'deadline'})
+                    break
+            logger.info("Traitement combinaison %d/%d : '%s' (%d page(s))", i + 1, len(keyword_combinations), keyword_combination, pages_this_combination,
+                        extra={'stage': 'google_search', 'keyword': keyword_combination})
+            page_started_at = time.monotonic()
 
             # --- Modifier la requête de recherche avec les opérateurs 'site:' ---
             search_query = keyword_combination  # La requête de base est la combinaison
             if site_operators:
                 # Ajouter les opérateurs de site à la requête
                 search_query = f"{keyword_combination} ({site_operators})"
-                print(f"  [Google Search] Requête Google envoyée : '{search_query}'")
+                logger.debug("Requête Google envoyée : '%s'", search_query, extra={'stage': 'google_search', 'keyword': keyword_combination})
             # --- Fin modification requête ---
 
-            success = perform_search(driver, search_query)  # Utiliser la requête modifiée
+            cached_pages = serp_cache.get_search(search_query + serp_cache_suffix, pages_this_combination) if serp_cache else None
+            if cached_pages is not None:
+                logger.info("Combinaison servie par le cache des pages Google (%d page(s)).", len(cached_pages),
+                            extra={'stage': 'google_search', 'keyword': keyword_combination, 'status': 'serp_cache_hit'})
+                serp_rank = 0
+                for page_num, page_results in enumerate(cached_pages, start=1):
+                    yield from take_new_results(page_results, keyword_combination, page_num, from_cache=True)
+                if should_stop and should_stop():
+                    continue
+                if on_combination_done:
+                    on_combination_done(keyword_combination)
+                continue
+
+            pacer.wait_turn(GOOGLE_URL) # Remplace la pause fixe entre combinaisons
+            with stage_timers.timed('google_search'):
+                # URL de recherche directe ; la barre de recherche ne sert qu'en cas d'interstitiel
+                searched_by_url = config.GOOGLE_DIRECT_SEARCH_URL and open_search_url(driver, search_query)
+                success = searched_by_url or perform_search(driver, search_query)  # Utiliser la requête modifiée
+            pacer.report(GOOGLE_URL, ok=success) # Échec (captcha, page bloquée...) : backoff exponentiel
+
+            if success and serp_cache_suffix and not searched_by_url:
+                # La recherche tapée affiche 10 résultats : première page rechargée avec num
+                try:
+                    pacer.wait_turn(GOOGLE_URL)
+                    with stage_timers.timed('page_load:google'):
+                        driver.get(build_search_url(search_query))
+                    WebDriverWait(driver, 15).until(EC.presence_of_element_located((By.CSS_SELECTOR, '#search, div.g, div.rc')))
+                except Exception as e_num_page:
+                    logger.warning("Page 1 avec num=%d non chargée (%s) : résultats de la recherche tapée.", results_per_page, type(e_num_page).__name__,
+                                   extra={'stage': 'google_search', 'keyword': keyword_combination})
 
             if success:
-                for page_num in range(1, max_pages_per_search + 1):
-                    print(f"    [Google Search] Traitement page {page_num}/{max_pages_per_search}")
+                serp_rank = 0
+                for page_num in range(1, pages_this_combination + 1):
+                    if should_stop and should_stop():
+                        break
+                    page_html = None
+                    parse_future = None # SERP_OFFLINE_PARSER : analyse en cours dans le pool pendant la navigation
+                    stop_pagination = False
+                    is_last_page = False # Lien "Suivant" absent : vraie fin des résultats (pas une erreur de navigation)
+                    logger.debug("Traitement page %d/%d", page_num, pages_this_combination,
+                                 extra={'stage': 'google_search', 'keyword': keyword_combination, 'page': page_num})
 
                     # --- Sauvegarder le HTML de la première page pour débogage ---
                     # On le fait ici pour être sûr d'avoir le HTML des résultats
@@ -378,81 +468,121 @@ def scrape_google_search(driver, keyword_combinations, max_pages_per_search, goo
                             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                             safe_keyword = re.sub(r'[^\w\-_\. ]', '_', keyword_combination)[:50]
                             html_path = SCREENSHOTS_DIR_GGL / f"{timestamp}_GoogleResultsP1_{safe_keyword}.html"
+                            page_html = driver.page_source
                             with open(html_path, "w", encoding="utf-8") as f:
-                                f.write(driver.page_source)
-                            print(f"    [Google Search] Code HTML de la page 1 sauvegardé dans {html_path}")
+                                f.write(page_html)
+                            logger.debug("Code HTML de la page 1 sauvegardé dans %s", html_path, extra={'stage': 'google_search', 'keyword': keyword_combination})
                         except Exception as e_save_html:
-                            print(f"    [Google Search] Erreur lors de la sauvegarde du HTML: {e_save_html}")
+                            logger.warning("Erreur lors de la sauvegarde du HTML : %s", e_save_html, extra={'stage': 'google_search'})
                     # --- Fin sauvegarde HTML ---
 
-                    current_page_results = extract_google_results(driver, keyword_combination)  # Passer la combinaison originale
-
-                    # Ajouter les résultats uniques de Google à la liste de retour
-                    new_urls_found_on_page = 0
-                    for result in current_page_results:
-                        url_to_check = result.get('URL')
-                        if url_to_check and isinstance(url_to_check, str) and url_to_check not in seen_urls_google_search:
-                            # Ajouter Type_Source pour identifier la source
-                            mutable_result = result.copy()
-                            mutable_result['Type_Source'] = 'Google'
-                            collected_google_urls.append(mutable_result)
-                            seen_urls_google_search.add(url_to_check)
-                            new_urls_found_on_page += 1
-                    print(f"    [Google Search] {new_urls_found_on_page} nouvelle(s) URL(s) pertinente(s) trouvée(s) sur cette page.")
+                    if config.SERP_OFFLINE_PARSER:
+                        # Un seul appel WebDriver (page_source, déjà lu pour la page 1) ; lxml analyse la page
+                        # dans le pool pendant que le navigateur passe à la page suivante
+                        try:
+                            if page_html is None:
+                                page_html = driver.page_source
+                            parse_future = submit_serp_parse(page_html, keyword_combination)
+                        except Exception as e_page_source:
+                            logger.warning("page_source indisponible (%s) : extraction dans la page.", type(e_page_source).__name__,
+                                           extra={'stage': 'google_serp_extract', 'keyword': keyword_combination, 'page': page_num})
+                    if parse_future is None:
+                        with stage_timers.timed('google_serp_extract', kind='call'):
+                            current_page_results = extract_google_results(driver, keyword_combination)  # Passer la combinaison originale
+                        # Ajouter les résultats uniques de Google à la liste de retour
+                        yield from take_new_results(current_page_results, keyword_combination, page_num)
 
 
                     # Logique pour passer à la page suivante
-                    if page_num < max_pages_per_search:
-                        time.sleep(random.uniform(1, 2))  # Délai avant de chercher le bouton suivant
+                    if page_num < pages_this_combination:
                         try:
-                            # Essayer de scroller un peu pour faire apparaître le bouton
-                            driver.execute_script("window.scrollTo(0, document.body.scrollHeight * 0.8);")
-                            time.sleep(random.uniform(0.5, 1))
-
-                            # Sélecteur plus robuste pour le lien "Suivant"
-                            next_page_link_element = WebDriverWait(driver, 7).until(
-                                EC.element_to_be_clickable((By.CSS_SELECTOR, 'a#pnnext, a[aria-label*="Suivant"], a[aria-label*="Next"]'))
-                            ) # Note: Google change parfois ces sélecteurs. 'td.navend a' ou 'a[aria-label="Page suivante"]' sont d'autres options.
-                            next_page_url = next_page_link_element.get_attribute('href')
+                            if config.GOOGLE_DIRECT_PAGINATION:
+                                # URL de la page suivante construite directement (start=N) : pas de scroll ni d'attente du bouton,
+                                # dont la seule présence (lecture immédiate, sans attente) indique qu'il reste des résultats
+                                next_page_url = None
+                                if driver.find_elements(By.CSS_SELECTOR, NEXT_PAGE_SELECTOR):
+                                    next_page_url = build_search_url(search_query, start=page_num * results_per_page)
+                            else:
+                                stage_timers.sleep(random.uniform(1, 2), 'serp_wait:google')  # Délai avant de chercher le bouton suivant
+                                # Essayer de scroller un peu pour faire apparaître le bouton
+                                driver.execute_script("window.scrollTo(0, document.body.scrollHeight * 0.8);")
+                                stage_timers.sleep(random.uniform(0.5, 1), 'serp_wait:google')
+
+                                # Sélecteur plus robuste pour le lien "Suivant"
+                                try:
+                                    next_page_link_element = WebDriverWait(driver, 7).until(
+                                        EC.element_to_be_clickable((By.CSS_SELECTOR, NEXT_PAGE_SELECTOR))
+                                    ) # Note: Google change parfois ces sélecteurs. 'td.navend a' ou 'a[aria-label="Page suivante"]' sont d'autres options.
+                                except (TimeoutException, NoSuchElementException):
+                                    next_page_link_element = None # Pas de lien "Suivant" : dernière page
+                                next_page_url = next_page_link_element.get_attribute('href') if next_page_link_element else None
 
                             if next_page_url:
-                                print(f"    [Google Search] Navigation vers page {page_num + 1}")
-                                driver.get(next_page_url)
+                                logger.debug("Navigation vers page %d", page_num + 1, extra={'stage': 'google_search', 'keyword': keyword_combination, 'page': page_num + 1})
+                                pacer.wait_turn(GOOGLE_URL)
+                                with stage_timers.timed('page_load:google'):
+                                    driver.get(next_page_url)
                                 # Attendre un élément de la page de résultats suivante
                                 WebDriverWait(driver, 15).until(
                                     EC.presence_of_element_located((By.CSS_SELECTOR, '#search, div.g, div.rc'))
                                 )
-                                time.sleep(random.uniform(2, 4)) # Pause après chargement
                             else:
-                                print(f"    [Google Search] URL 'Suivant' non trouvée (attribut href vide) à la page {page_num}. Arrêt pagination.")
-                                break
+                                logger.info("Pas de page suivante (lien 'Suivant' absent ou sans href) à la page %d. Arrêt pagination.", page_num,
+                                            extra={'stage': 'google_search', 'keyword': keyword_combination, 'page': page_num})
+                                is_last_page = True
+                                stop_pagination = True
 
                         except (TimeoutException, NoSuchElementException):
-                            print(f"    [Google Search] Lien 'Suivant' non trouvé ou dernière page atteinte à la page {page_num}. Arrêt pagination.")
-                            break
+                            logger.warning("Page %d non chargée (délai dépassé). Arrêt pagination.", page_num + 1,
+                                           extra={'stage': 'google_search', 'keyword': keyword_combination, 'page': page_num})
+                            stop_pagination = True
                         except (ElementClickInterceptedException, ElementNotInteractableException):
-                             print(f"    [Google Search] Lien 'Suivant' trouvé mais non cliquable (intercepté ou non interactif) à la page {page_num}. Arrêt pagination.")
-                             break
+                             logger.warning("Lien 'Suivant' trouvé mais non cliquable (intercepté ou non interactif) à la page %d. Arrêt pagination.", page_num,
+                                            extra={'stage': 'google_search', 'keyword': keyword_combination, 'page': page_num})
+                             stop_pagination = True
                         except Exception as e_next_page:
-                            print(f"    [Google Search] Erreur lors du passage page suivante : {type(e_next_page).__name__} - {e_next_page}. Arrêt pagination.")
-                            break
+                            logger.warning("Erreur lors du passage page suivante : %s - %s. Arrêt pagination.", type(e_next_page).__name__, e_next_page,
+                                           extra={'stage': 'google_search', 'keyword': keyword_combination, 'page': page_num})
+                            stop_pagination = True
                     else:
-                        print(f"    [Google Search] Limite de {max_pages_per_search} pages atteinte pour cette combinaison.")
-
-                # Pause entre les combinaisons de mots-clés
-                print(f"  [Google Search] Fin du traitement pour '{keyword_combination}'. Pause...")
-                time.sleep(random.uniform(4, 7))
+                        logger.debug("Limite de %d pages atteinte pour cette combinaison.", pages_this_combination, extra={'stage': 'google_search', 'keyword': keyword_combination})
+
+                    if parse_future is not None:
+                        with stage_timers.timed('google_serp_parse_wait'):
+                            current_page_results = parse_future.result()
+                        yield from take_new_results(current_page_results, keyword_combination, page_num)
+                    if serp_cache:
+                        serp_cache.put(search_query + serp_cache_suffix, page_num, current_page_results, is_last_page=is_last_page)
+                    if stop_pagination:
+                        break
+
+                if should_stop and should_stop():
+                    continue # Combinaison incomplète : refaite à la reprise ; la boucle s'arrête au tour suivant
+                if on_combination_done:
+                    on_combination_done(keyword_combination)
+
+                # La pause entre combinaisons est gérée par pacer.wait_turn avant la recherche suivante
+                logger.debug("Fin du traitement pour '%s'.", keyword_combination, extra={'stage': 'google_search', 'keyword': keyword_combination})
             else:
-                print(f"  [Google Search] Échec de la recherche initiale pour '{search_query}'. Passage à la combinaison suivante.")
-                time.sleep(random.uniform(8, 12)) # Pause plus longue après un échec
+                logger.warning("Échec de la recherche initiale pour '%s'. Passage à la combinaison suivante (backoff Google).", search_query,
+                               extra={'stage': 'google_search', 'keyword': keyword_combination, 'status': 'search_failed'})
 
         print("\n--- Fin du scraping de recherche Google ---")
-        print(f"  [Google Search] Total de {len(collected_google_urls)} URLs pertinentes collectées par ce module.")
-        return collected_google_urls
+        logger.info("Total de %d URLs pertinentes collectées par ce module.", total_yielded, extra={'stage': 'google_search', 'status': 'done'})
 
     else:
         print("\n--- Échec de la connexion initiale à Google. Scraping Google annulé. ---")
-        return []
+
+
+# --- Fonction Principale pour le Scraping Google ---
+def scrape_google_search(driver, keyword_combinations, max_pages_per_search, google_link_types=None, on_combination_done=None, should_stop=None, time_budget=None, serp_cache=None):
+    """
+    Prend une instance de driver, une liste de combinaisons de mots-clés,
+    la limite de pages par recherche, et une liste optionnelle de types de liens ('facebook', 'instagram', etc.).
+    Effectue les recherches Google et retourne une liste de dictionnaires
+    contenant les URLs pertinentes trouvées.
+    """
+    return list(iter_google_search(driver, keyword_combinations, max_pages_per_search, google_link_types, on_combination_done, should_stop, time_budget, serp_cache))
 
 # --- Bloc d'exécution autonome (Optionnel pour tester ce script seul) ---
 # (Le bloc if __name__ == "__main__": reste commenté car ce module est destiné à être importé)
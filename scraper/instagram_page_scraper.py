@@ -18,6 +18,12 @@ from selenium.common.exceptions import (
     ElementClickInterceptedException
 )
 
+from pacing import pacer # Rythme adaptatif par domaine (remplace les pauses fixes)
+from run_metrics import stage_timers # Chronométrage par étape
+from event_log import get_logger # Journal structuré (console + <csv>_events.jsonl de la tâche)
+
+logger = get_logger("instagram_page")
+
 # --- Import Google Generative AI Library ---
 import google.generativeai as genai
 
@@ -235,7 +241,8 @@ Analyze the following text:
     try:
         # Make the API call
         # Use a timeout for the API call in case of issues
-        response = gemini_model.generate_content(prompt, request_options={'timeout': 45}) # Increased timeout slightly
+        with stage_timers.timed('gemini_call:instagram'):
+            response = gemini_model.generate_content(prompt, request_options={'timeout': 45}) # Increased timeout slightly
 
 
         # Extract the text from the response
@@ -270,7 +277,7 @@ def scrape_instagram_page(driver, page_url, source_info=None):
     Scrape les informations d'une page/profil Instagram, y compris la bio et les liens associés.
     Utilise AI pour extraire les informations de contact, noms, compteurs et bio du texte, avec des fallbacks.
     """
-    print(f"\n  [Insta Page Scraper] Scraping info pour URL: {page_url}")
+    logger.info("Scraping info pour URL: %s", page_url, extra={'url': page_url, 'stage': 'instagram_page'})
 
     detailed_info = {
         "Nom d'Utilisateur": "Not Found",
@@ -310,33 +317,34 @@ def scrape_instagram_page(driver, page_url, source_info=None):
     full_text_area = ""
 
     try: # Main try block for scraping the page
-        time.sleep(random.uniform(2, 4))
-        driver.get(page_url)
+        pacer.wait_turn(page_url) # Attend le créneau d'instagram.com
+        with stage_timers.timed('page_load:instagram'):
+            driver.get(page_url)
 
         # === Wait for dynamically loaded content ===
         try:
-            print("    [Insta Page Scraper] Tentative d'attendre l'\u00e9l\u00e9ment du nom d'utilisateur (apr\u00e8s chargement dynamique)...")
+            logger.debug("Tentative d'attendre l'\u00e9l\u00e9ment du nom d'utilisateur (apr\u00e8s chargement dynamique)...", extra={'url': page_url, 'stage': 'instagram_page'})
             # Wait for the h2 element that contains the username, or main content area
             WebDriverWait(driver, 20).until(
                  EC.presence_of_element_located((By.CSS_SELECTOR, 'main h2, header h2, div[role="main"] h2, article h2, main article, main, header[role="banner"]'))
             )
-            print("    [Insta Page Scraper] Élément clé ou conteneur détecté.")
-            time.sleep(random.uniform(3, 5)) # Additional wait for other elements to render
+            logger.debug("Élément clé ou conteneur détecté.", extra={'url': page_url, 'stage': 'instagram_page'})
+            stage_timers.sleep(random.uniform(3, 5), 'render_wait:instagram') # Additional wait for other elements to render
 
             # Find the main profile container element AFTER dynamic load
             try:
                 profile_container_element = driver.find_element(By.CSS_SELECTOR, 'main article')
-                # print("    [Insta Page Scraper] Conteneur 'main article' trouvé.") # Too verbose
+                logger.debug("Conteneur 'main article' trouvé.", extra={'url': page_url, 'stage': 'instagram_page'})
             except NoSuchElementException:
                 try:
                     profile_container_element = driver.find_element(By.CSS_SELECTOR, 'main')
-                    # print("    [Insta Page Scraper] Conteneur 'main' trouvé (fallback).") # Too verbose
+                    logger.debug("Conteneur 'main' trouvé (fallback).", extra={'url': page_url, 'stage': 'instagram_page'})
                 except NoSuchElementException:
                     try:
                         profile_container_element = driver.find_element(By.CSS_SELECTOR, 'header[role="banner"]')
-                        # print("    [Insta Page Scraper] Conteneur 'header[role=\"banner\"]' trouvé (fallback).") # Too verbose
+                        logger.debug("Conteneur 'header[role=\"banner\"]' trouvé (fallback).", extra={'url': page_url, 'stage': 'instagram_page'})
                     except NoSuchElementException:
-                         print("    [Insta Page Scraper] Aucun conteneur principal spécifique trouvé. Utilisation du corps de la page (moins fiable).")
+                         logger.warning("Aucun conteneur principal spécifique trouvé. Utilisation du corps de la page (moins fiable).", extra={'url': page_url, 'stage': 'instagram_page'})
                          profile_container_element = driver.find_element(By.CSS_SELECTOR, 'body') # Final fallback
 
 
@@ -344,11 +352,11 @@ def scrape_instagram_page(driver, page_url, source_info=None):
             full_text_area = profile_container_element.text
             # page_content_html = profile_container_element.get_attribute('outerHTML') # Keep this commented unless needed later
             detailed_info['Full Header Text (from container)'] = full_text_area # Keep for text analysis (Gemini)
-            # print(f"    [Insta Page Scraper] Extracted full text from container (partial display):\n--- Start Full Text ---\n{full_text_area[:500]}...\n--- End Full Text ---")
+            logger.debug("Extracted full text from container (partial display):\n--- Start Full Text ---\n%.500s...\n--- End Full Text ---", full_text_area, extra={'url': page_url, 'stage': 'instagram_page'})
 
 
         except TimeoutException:
-            print(f"  [Insta Page Scraper] Timeout lors de l'attente des éléments clés pour {page_url}. La page n'a peut-\u00eatre pas fini de charger ou n'est pas accessible.")
+            logger.warning("Timeout lors de l'attente des éléments clés pour %s. La page n'a peut-\u00eatre pas fini de charger ou n'est pas accessible.", page_url, extra={'url': page_url, 'stage': 'instagram_page'})
             detailed_info["Statut_Scraping_Detail"] = "Timeout on dynamic load wait"
             detailed_info["Message_Erreur_Detail"] = "Timeout waiting for key elements after dynamic load."
             # Check for login/error pages if a timeout occurs
@@ -361,7 +369,7 @@ def scrape_instagram_page(driver, page_url, source_info=None):
                     driver.find_element(By.XPATH, "//*[contains(text(), 'Sorry, this page isn\'t available.')] | //*[contains(text(), 'Désolé, cette page n\'est pas disponible.')]")
                     detailed_info["Statut_Scraping_Detail"] = "Page Not Found after timeout"
                     detailed_info["Message_Erreur_Detail"] = "Instagram page not found (404) after timeout."
-                    print("    [Insta Page Scraper] Confirmed: Page Not Found.")
+                    logger.info("Confirmed: Page Not Found.", extra={'url': page_url, 'stage': 'instagram_page', 'status': 'not_found'})
                  except NoSuchElementException:
                     pass # Not a 404, must be login/consent etc.
 
@@ -369,7 +377,7 @@ def scrape_instagram_page(driver, page_url, source_info=None):
 
         except NoSuchElementException:
              # This catch might be redundant due to TimeoutException in the wait, but good to have
-             print(f"  [Insta Page Scraper] NoSuchElementException g\u00e9n\u00e9rale lors de l'attente ou de la recherche initiale d'un \u00e9l\u00e9ment cl\u00e9 pour {page_url}.")
+             logger.warning("NoSuchElementException g\u00e9n\u00e9rale lors de l'attente ou de la recherche initiale d'un \u00e9l\u00e9ment cl\u00e9 pour %s.", page_url, extra={'url': page_url, 'stage': 'instagram_page'})
              detailed_info["Statut_Scraping_Detail"] = "Critical Element Not Found"
              detailed_info["Message_Erreur_Detail"] = "Could not find a critical element (like username or main container)."
              return detailed_info # Exit function early
@@ -377,7 +385,7 @@ def scrape_instagram_page(driver, page_url, source_info=None):
         # Check for redirection again after finding a potential container
         current_url_after_load = driver.current_url
         if any(keyword in current_url_after_load.lower() for keyword in ["accounts/login", "error", "consent", "challenge"]):
-            print(f"  [Insta Page Scraper] Redirection d\u00e9tect\u00e9e pour {page_url} -> {current_url_after_load} APRES d\u00e9tection d'un conteneur. Probablement non connect\u00e9 ou page inaccessible.")
+            logger.warning("Redirection d\u00e9tect\u00e9e pour %s -> %s APRES d\u00e9tection d'un conteneur. Probablement non connect\u00e9 ou page inaccessible.", page_url, current_url_after_load, extra={'url': page_url, 'stage': 'instagram_page'})
             detailed_info["Statut_Scraping_Detail"] = "Redirected/Inaccessible after container find"
             detailed_info["Message_Erreur_Detail"] = f"Redirected to {current_url_after_load} after finding container - might require login or page is private/non-existent."
              # Attempt to check for "Page Not Found" indicator specifically
@@ -385,7 +393,7 @@ def scrape_instagram_page(driver, page_url, source_info=None):
                 driver.find_element(By.XPATH, "//*[contains(text(), 'Sorry, this page isn\'t available.')] | //*[contains(text(), 'Désolé, cette page n\'est pas disponible.')]")
                 detailed_info["Statut_Scraping_Detail"] = "Page Not Found after container find"
                 detailed_info["Message_Erreur_Detail"] = "Instagram page not found (404) after finding container."
-                print("    [Insta Page Scraper] Confirmed: Page Not Found.")
+                logger.info("Confirmed: Page Not Found.", extra={'url': page_url, 'stage': 'instagram_page', 'status': 'not_found'})
             except NoSuchElementException:
                  pass # Not a 404, must be login/consent etc.
             return detailed_info # Exit function early
@@ -398,16 +406,16 @@ def scrape_instagram_page(driver, page_url, source_info=None):
         ai_extracted_data = None
         if gemini_model and full_text_area: # Only call AI if model loaded and text is available
              try:
-                 print("    [Insta Page Scraper] Sending text to AI for contact, names, counts and bio extraction...")
+                 logger.info("Sending text to AI for contact, names, counts and bio extraction...", extra={'url': page_url, 'stage': 'instagram_page'})
                  ai_extracted_data = extract_info_with_gemini(full_text_area)
                  if ai_extracted_data:
-                      print("    [Insta Page Scraper] AI extraction successful.")
+                      logger.debug("AI extraction successful.", extra={'url': page_url, 'stage': 'instagram_page'})
                  else:
-                      print("    [Insta Page Scraper] AI extraction returned no data or failed internally.")
+                      logger.info("AI extraction returned no data or failed internally.", extra={'url': page_url, 'stage': 'instagram_page'})
                       detailed_info["Message_Erreur_Detail"] += "; AI extraction returned no data."
 
              except Exception as ai_e:
-                 print(f"    [Insta Page Scraper] Error during AI extraction process: {type(ai_e).__name__} - {ai_e}")
+                 logger.warning("Error during AI extraction process: %s - %s", type(ai_e).__name__, ai_e, extra={'url': page_url, 'stage': 'instagram_page'})
                  detailed_info["Message_Erreur_Detail"] += f"; AI extraction error: {type(ai_e).__name__}"
 
 
@@ -465,16 +473,16 @@ def scrape_instagram_page(driver, page_url, source_info=None):
                      # *** Apply Moroccan number reformatting here ***
                      if cleaned_phone_for_whatsapp.startswith('0') and len(cleaned_phone_for_whatsapp) in [9, 10]: # Common Moroccan formats
                          detailed_info["WhatsApp à vérifier"] = f"https://wa.me/212{cleaned_phone_for_whatsapp[1:]}"
-                         # print(f"    [Insta Page Scraper] Generated WhatsApp from AI phone (reformatted): {detailed_info['WhatsApp à vérifier']}") # Too verbose
+                         logger.debug("Generated WhatsApp from AI phone (reformatted): %s", detailed_info['WhatsApp à vérifier'], extra={'url': page_url, 'stage': 'instagram_page'})
                      elif cleaned_phone_for_whatsapp.startswith('212') and len(cleaned_phone_for_whatsapp) in [11, 12]: # Already +212 or 212
                           detailed_info["WhatsApp à vérifier"] = f"https://wa.me/{cleaned_phone_for_whatsapp}"
-                          # print(f"    [Insta Page Scraper] Generated WhatsApp from AI phone (+212): {detailed_info['WhatsApp à vérifier']}") # Too verbose
+                          logger.debug("Generated WhatsApp from AI phone (+212): %s", detailed_info['WhatsApp à vérifier'], extra={'url': page_url, 'stage': 'instagram_page'})
                      elif cleaned_phone_for_whatsapp.startswith('+212') and len(cleaned_phone_for_whatsapp) in [12, 13]: # Already +212
                           detailed_info["WhatsApp à vérifier"] = f"https://wa.me/{cleaned_phone_for_whatsapp.replace('+','')}" # Remove '+' for wa.me
-                          # print(f"    [Insta Page Scraper] Generated WhatsApp from AI phone (+212): {detailed_info['WhatsApp à vérifier']}") # Too verbose
+                          logger.debug("Generated WhatsApp from AI phone (+212): %s", detailed_info['WhatsApp à vérifier'], extra={'url': page_url, 'stage': 'instagram_page'})
                      else:
                          detailed_info["WhatsApp à vérifier"] = f"https://wa.me/{cleaned_phone_for_whatsapp}" # Keep as is if format is different
-                         # print(f"    [Insta Page Scraper] Generated WhatsApp from AI phone (generic format): {detailed_info['WhatsApp à vérifier']}") # Too verbose
+                         logger.debug("Generated WhatsApp from AI phone (generic format): %s", detailed_info['WhatsApp à vérifier'], extra={'url': page_url, 'stage': 'instagram_page'})
 
                 else:
                      detailed_info["WhatsApp à vérifier"] = "Invalid Phone Format for WhatsApp"
@@ -518,7 +526,7 @@ def scrape_instagram_page(driver, page_url, source_info=None):
                  detailed_info["Bio"] = ai_extracted_data["bio_text"]
 
         else: # AI extraction failed or gemini_model is None
-            # print("    [Insta Page Scraper] AI extraction failed or not used. Falling back to regex parsing.") # Already logged
+            logger.debug("AI extraction failed or not used. Falling back to regex parsing.", extra={'url': page_url, 'stage': 'instagram_page'})
 
             # --- Fallback to Regex Parsing (if AI failed or not used) ---
             # This logic remains as a safety net if AI fails to extract certain fields from the text.
@@ -536,11 +544,11 @@ def scrape_instagram_page(driver, page_url, source_info=None):
 
                                if detailed_info["Nom Complet"] == "Not Found" and title_full_name and len(title_full_name) > 1 and not GENERIC_NAME_CHECK_REGEX.match(title_full_name):
                                     detailed_info["Nom Complet"] = title_full_name
-                                    # print(f"    [Insta Page Scraper] Full Name found via title fallback: {detailed_info['Nom Complet']}")
+                                    logger.debug("Full Name found via title fallback: %s", detailed_info['Nom Complet'], extra={'url': page_url, 'stage': 'instagram_page'})
 
                                if detailed_info["Nom d'Utilisateur"] == "Not Found" and title_username and re.match(r'^@[\w\.\-]+$', title_username) and 1 < len(title_username.replace('@','')) <= 30:
                                      detailed_info["Nom d'Utilisateur"] = title_username
-                                     # print(f"    [Insta Page Scraper] Username found via title fallback: {detailed_info['Nom d\'Utilisateur']}")
+                                     logger.debug("Username found via title fallback: %s", detailed_info['Nom d\'Utilisateur'], extra={'url': page_url, 'stage': 'instagram_page'})
 
                           # Handle simpler title formats like "NomUtilisateur • Instagram photos and videos"
                           elif detailed_info["Nom d'Utilisateur"] == "Not Found":
@@ -549,17 +557,17 @@ def scrape_instagram_page(driver, page_url, source_info=None):
                                     simple_username = title_match_simple.group(1).strip()
                                     if simple_username and re.match(r'^[\w\.\-]+$', simple_username) and 1 < len(simple_username) <= 30:
                                          detailed_info["Nom d'Utilisateur"] = "@" + simple_username
-                                         # print(f"    [Insta Page Scraper] Username found via simple title fallback: {detailed_info['Nom d\'Utilisateur']}")
+                                         logger.debug("Username found via simple title fallback: %s", detailed_info['Nom d\'Utilisateur'], extra={'url': page_url, 'stage': 'instagram_page'})
 
 
                  except Exception as e_title:
-                      # print(f"    [Insta Page Scraper] Error during title parsing for names: {e_title}") # Too verbose
+                      logger.debug("Error during title parsing for names: %s", e_title, extra={'url': page_url, 'stage': 'instagram_page'})
                       pass # Continue
 
 
             # Counts (Fallback if AI didn't find them) - Use the text regex fallback
             if detailed_info["Nombre de Publications"] == "N/A": # Check if still N/A default
-                 # print("    [Insta Page Scraper] Attempting to extract counts from text (fallback)...") # Already logged
+                 logger.debug("Attempting to extract counts from text (fallback)...", extra={'url': page_url, 'stage': 'instagram_page'})
                  # Look for number followed by specific keywords
                  counts_text_match = re.search(
                      r'(\d[\s,kK\u202f\.]*)\s*(?:publications|posts).*?(\d[\s,kK\u202f\.]*)\s*(?:followers|abonn(?:é|e)s|abonnements).*?(\d[\s,kK\u202f\.]*)\s*(?:suivi\(e\)s|following)',
@@ -569,14 +577,14 @@ def scrape_instagram_page(driver, page_url, source_info=None):
                       detailed_info["Nombre de Publications"] = re.sub(r'[\s,kK\u202f\.]', '', counts_text_match.group(1)).strip() or "N/A"
                       detailed_info["Nombre de Followers"] = re.sub(r'[\s,kK\u202f\.]', '', counts_text_match.group(2)).strip() or "N/A"
                       detailed_info["Nombre de Suivis"] = re.sub(r'[\s,kK\u202f\.]', '', counts_text_match.group(3)).strip() or "N/A"
-                      # print(f"    [Insta Page Scraper] Counts found via text regex (fallback): Posts={detailed_info['Nombre de Publications']}, Followers={detailed_info['Nombre de Followers']}, Following={detailed_info['Nombre de Suivis']}") # Too verbose
+                      logger.debug("Counts found via text regex (fallback): Posts=%s, Followers=%s, Following=%s", detailed_info['Nombre de Publications'], detailed_info['Nombre de Followers'], detailed_info['Nombre de Suivis'], extra={'url': page_url, 'stage': 'instagram_page'})
 
             # Email Extraction (Fallback if AI didn't find it)
             if detailed_info["Email"] == "Not Found":
                  email_match = EMAIL_REGEX.search(full_text_area)
                  if email_match:
                      detailed_info["Email"] = email_match.group(0)
-                     # print(f"    [Insta Page Scraper] Email found via fallback regex: {detailed_info['Email']}") # Too verbose
+                     logger.debug("Email found via fallback regex: %s", detailed_info['Email'], extra={'url': page_url, 'stage': 'instagram_page'})
 
             # Phone Extraction (Fallback if AI didn't find it)
             if detailed_info["Téléphone"] == "Not Found":
@@ -589,7 +597,7 @@ def scrape_instagram_page(driver, page_url, source_info=None):
                                found_phone_fallback = cleaned_phone # Keep the longest/most complete number found
                  if found_phone_fallback != "Not Found":
                       detailed_info["Téléphone"] = found_phone_fallback
-                      # print(f"    [Insta Page Scraper] T\u00e9l\u00e9phone found via fallback regex: {detailed_info['Téléphone']}") # Too verbose
+                      logger.debug("T\u00e9l\u00e9phone found via fallback regex: %s", detailed_info['Téléphone'], extra={'url': page_url, 'stage': 'instagram_page'})
 
 
             # WhatsApp Link Extraction (Fallback if AI didn't find it)
@@ -604,13 +612,13 @@ def scrape_instagram_page(driver, page_url, source_info=None):
                       wa_number_digits = CLEAN_PHONE_REGEX.sub('', wa_number_raw) # Clean digits for comparison and storage
                       if detailed_info["Téléphone"] == "Not Found" or (wa_number_digits and len(wa_number_digits) > len(current_phone_digits)):
                            detailed_info["Téléphone"] = wa_number_digits
-                           # print(f"    [Insta Page Scraper] Téléphone updated from WA link fallback: {detailed_info['Téléphone']}") # Too verbose
+                           logger.debug("Téléphone updated from WA link fallback: %s", detailed_info['Téléphone'], extra={'url': page_url, 'stage': 'instagram_page'})
 
                       # Ensure WhatsApp à vérifier is set from the link
                       if detailed_info["WhatsApp à vérifier"] == "Not Generated":
                            detailed_info["WhatsApp à vérifier"] = detailed_info["WhatsApp"] # Use the direct link if found
 
-                      # print(f"    [Insta Page Scraper] WhatsApp (wa.me) link found via fallback regex: {detailed_info['WhatsApp']}") # Too verbose
+                      logger.debug("WhatsApp (wa.me) link found via fallback regex: %s", detailed_info['WhatsApp'], extra={'url': page_url, 'stage': 'instagram_page'})
 
 
             # Facebook Link Extraction (Fallback if AI didn't find it)
@@ -618,7 +626,7 @@ def scrape_instagram_page(driver, page_url, source_info=None):
                  facebook_link_match = FACEBOOK_LINK_REGEX.search(full_text_area)
                  if facebook_link_match:
                       detailed_info["Facebook"] = facebook_link_match.group(0)
-                      # print(f"    [Insta Page Scraper] Facebook link found via fallback regex: {detailed_info['Facebook']}") # Too verbose
+                      logger.debug("Facebook link found via fallback regex: %s", detailed_info['Facebook'], extra={'url': page_url, 'stage': 'instagram_page'})
 
 
             # Other Links in text (Fallback for Site Web and Site Web (Bio) if AI didn't find them)
@@ -634,7 +642,7 @@ def scrape_instagram_page(driver, page_url, source_info=None):
                  ]
 
                  if processed_generic_links_fallback:
-                      # print(f"    [Insta Page Scraper] Found {len(processed_generic_links_fallback)} generic links in fallback text.") # Too verbose
+                      logger.debug("Found %s generic links in fallback text.", len(processed_generic_links_fallback), extra={'url': page_url, 'stage': 'instagram_page'})
                       detailed_info["Site Web (Bio)"] = processed_generic_links_fallback[0]
 
                       main_website_link_fallback = None
@@ -646,15 +654,15 @@ def scrape_instagram_page(driver, page_url, source_info=None):
 
                       if main_website_link_fallback:
                            detailed_info["Site Web"] = main_website_link_fallback
-                           # print(f"    [Insta Page Scraper] Using inferred main website link for primary Site Web in fallback: {detailed_info['Site Web']}") # Too verbose
+                           logger.debug("Using inferred main website link for primary Site Web in fallback: %s", detailed_info['Site Web'], extra={'url': page_url, 'stage': 'instagram_page'})
                       else:
                            detailed_info["Site Web"] = processed_generic_links_fallback[0]
-                           # print(f"    [Insta Page Scraper] Using first generic link for primary Site Web in fallback (no clear main website found): {detailed_info['Site Web']}") # Too verbose
+                           logger.debug("Using first generic link for primary Site Web in fallback (no clear main website found): %s", detailed_info['Site Web'], extra={'url': page_url, 'stage': 'instagram_page'})
 
 
             # Bio Text Inference (Fallback if AI didn't find it) - Use the previous heuristic line-by-line logic
             if detailed_info["Bio"] == "Not Found":
-                 # print("    [Insta Page Scraper] Attempting to isolate Bio from fallback parsed text (line-by-line)...") # Too verbose
+                 logger.debug("Attempting to isolate Bio from fallback parsed text (line-by-line)...", extra={'url': page_url, 'stage': 'instagram_page'})
                  lines_fallback = full_text_area.split('\n')
                  cleaned_bio_lines_fallback = []
 
@@ -740,16 +748,16 @@ def scrape_instagram_page(driver, page_url, source_info=None):
 
                  if final_bio_text_fallback and len(final_bio_text_fallback) > 5: # Check for minimal length after cleaning
                       detailed_info["Bio"] = final_bio_text_fallback
-                      # print("    [Insta Page Scraper] Bio text inferred from fallback parsed text.") # Too verbose
+                      logger.debug("Bio text inferred from fallback parsed text.", extra={'url': page_url, 'stage': 'instagram_page'})
                  else:
-                      # print("    [Insta Page Scraper] Inferred bio from fallback was empty or seemed generic after cleaning.") # Too verbose
+                      logger.debug("Inferred bio from fallback was empty or seemed generic after cleaning.", extra={'url': page_url, 'stage': 'instagram_page'})
                       detailed_info["Bio"] = "Not Found"
 
 
             # Address Extraction (Fallback if AI didn't find it) - Use the heuristic line-by-line logic
             # If detailed_info["Adresse"] is still the default "N/A (Insta)" after AI
             if detailed_info["Adresse"] == "N/A (Insta)":
-                 # print("    [Insta Page Scraper] Attempting to extract Address from fallback parsed text (line-by-line)...") # Too verbose
+                 logger.debug("Attempting to extract Address from fallback parsed text (line-by-line)...", extra={'url': page_url, 'stage': 'instagram_page'})
                  lines_fallback = full_text_area.split('\n')
                  found_addresses_fallback = []
 
@@ -761,12 +769,12 @@ def scrape_instagram_page(driver, page_url, source_info=None):
                       address_match_fallback = ADDRESS_LINE_HEURISTIC_REGEX.match(stripped_line)
                       if address_match_fallback and len(stripped_line) > 5: # Add min length check
                            found_addresses_fallback.append(stripped_line)
-                           # print(f"      [Insta Page Scraper] Potential address line found (fallback heuristic): {stripped_line}") # Too verbose
+                           logger.debug("Potential address line found (fallback heuristic): %s", stripped_line, extra={'url': page_url, 'stage': 'instagram_page'})
                            break # Take only the first potential address line found
 
                  if found_addresses_fallback:
                       detailed_info["Adresse"] = found_addresses_fallback[0]
-                      # print(f"    [Insta Page Scraper] Main Address set from first found fallback line: {detailed_info['Adresse']}") # Too verbose
+                      logger.debug("Main Address set from first found fallback line: %s", detailed_info['Adresse'], extra={'url': page_url, 'stage': 'instagram_page'})
                  else:
                       detailed_info["Adresse"] = "N/A (Insta)"
 
@@ -778,48 +786,48 @@ def scrape_instagram_page(driver, page_url, source_info=None):
                      # *** Apply Moroccan number reformatting here (Fallback) ***
                      if cleaned_phone_for_whatsapp.startswith('0') and len(cleaned_phone_for_whatsapp) in [9, 10]: # Common Moroccan formats
                          detailed_info["WhatsApp à vérifier"] = f"https://wa.me/212{cleaned_phone_for_whatsapp[1:]}"
-                         # print(f"    [Insta Page Scraper] Generated WhatsApp from fallback phone (reformatted): {detailed_info['WhatsApp à vérifier']}") # Too verbose
+                         logger.debug("Generated WhatsApp from fallback phone (reformatted): %s", detailed_info['WhatsApp à vérifier'], extra={'url': page_url, 'stage': 'instagram_page'})
                      elif cleaned_phone_for_whatsapp.startswith('212') and len(cleaned_phone_for_whatsapp) in [11, 12]: # Already +212 or 212
                           detailed_info["WhatsApp à vérifier"] = f"https://wa.me/{cleaned_phone_for_whatsapp}"
-                          # print(f"    [Insta Page Scraper] Generated WhatsApp from fallback phone (+212): {detailed_info['WhatsApp à vérifier']}") # Too verbose
+                          logger.debug("Generated WhatsApp from fallback phone (+212): %s", detailed_info['WhatsApp à vérifier'], extra={'url': page_url, 'stage': 'instagram_page'})
                      elif cleaned_phone_for_whatsapp.startswith('+212') and len(cleaned_phone_for_whatsapp) in [12, 13]: # Already +212
                           detailed_info["WhatsApp à vérifier"] = f"https://wa.me/{cleaned_phone_for_whatsapp.replace('+','')}" # Remove '+' for wa.me
-                          # print(f"    [Insta Page Scraper] Generated WhatsApp from fallback phone (+212): {detailed_info['WhatsApp à vérifier']}") # Too verbose
+                          logger.debug("Generated WhatsApp from fallback phone (+212): %s", detailed_info['WhatsApp à vérifier'], extra={'url': page_url, 'stage': 'instagram_page'})
                      else:
                          detailed_info["WhatsApp à vérifier"] = f"https://wa.me/{cleaned_phone_for_whatsapp}" # Keep as is if format is different
-                         # print(f"    [Insta Page Scraper] Generated WhatsApp from fallback phone (generic format): {detailed_info['WhatsApp à vérifier']}") # Too verbose
+                         logger.debug("Generated WhatsApp from fallback phone (generic format): %s", detailed_info['WhatsApp à vérifier'], extra={'url': page_url, 'stage': 'instagram_page'})
                 else:
                      detailed_info["WhatsApp à vérifier"] = "Invalid Phone Format for WhatsApp"
 
 
         detailed_info["Statut_Scraping_Detail"] = "Success" # If we reached here, it means we successfully loaded and processed the page, even if data is "Not Found" or "N/A"
-        # print(f"  [Insta Page Scraper] Scraping termin\u00e9 pour {page_url}. Statut: Success.")
+        logger.debug("Scraping termin\u00e9 pour %s. Statut: Success.", page_url, extra={'url': page_url, 'stage': 'instagram_page'})
 
 
     except StaleElementReferenceException:
-        print(f"  [Insta Page Scraper] StaleElementReferenceException lors du scraping de {page_url}.")
+        logger.warning("StaleElementReferenceException lors du scraping de %s.", page_url, extra={'url': page_url, 'stage': 'instagram_page'})
         detailed_info["Statut_Scraping_Detail"] = "Error"
         detailed_info["Message_Erreur_Detail"] = "Stale element reference during scraping (likely due to page changes during scraping)."
         traceback.print_exc()
     except NoSuchElementException:
          # This should be caught by specific find_element blocks, but as a general catch
-         print(f"  [Insta Page Scraper] NoSuchElementException g\u00e9n\u00e9rale lors du scraping de {page_url}.")
+         logger.warning("NoSuchElementException g\u00e9n\u00e9rale lors du scraping de %s.", page_url, extra={'url': page_url, 'stage': 'instagram_page'})
          detailed_info["Statut_Scraping_Detail"] = "Error finding element"
          detailed_info["Message_Erreur_Detail"] = "Could not find a required element."
          traceback.print_exc()
     except TimeoutException:
         # This should ideally be caught by the specific waits, but kept as a general catch
-        print(f"  [Insta Page Scraper] TimeoutException g\u00e9n\u00e9rale lors du scraping de {page_url}.")
+        logger.warning("TimeoutException g\u00e9n\u00e9rale lors du scraping de %s.", page_url, extra={'url': page_url, 'stage': 'instagram_page'})
         detailed_info["Statut_Scraping_Detail"] = "Timeout (General)"
         detailed_info["Message_Erreur_Detail"] = "A general timeout occurred during scraping."
         traceback.print_exc()
     except ElementClickInterceptedException:
-         print(f"  [Insta Page Scraper] ElementClickInterceptedException lors du scraping de {page_url}. Un overlay bloque peut-\u00eatre l'interaction.")
+         logger.warning("ElementClickInterceptedException lors du scraping de %s. Un overlay bloque peut-\u00eatre l'interaction.", page_url, extra={'url': page_url, 'stage': 'instagram_page'})
          detailed_info["Statut_Scraping_Detail"] = "Error"
          detailed_info["Message_Erreur_Detail"] = "Element click intercepted. An overlay might be present."
          traceback.print_exc()
     except Exception as e:
-        print(f"  [Insta Page Scraper] Une erreur inattendue s'est produite lors du scraping de {page_url}: {type(e).__name__} - {e}")
+        logger.error("Une erreur inattendue s'est produite lors du scraping de %s: %s - %s", page_url, type(e).__name__, e, extra={'url': page_url, 'stage': 'instagram_page'})
         detailed_info["Statut_Scraping_Detail"] = "Error"
         detailed_info["Message_Erreur_Detail"] = f"Unexpected error: {type(e).__name__} - {e}"
         traceback.print_exc()
@@ -0,0 +1,210 @@
+# /home/AlienScraper/scraper/serp_parser.py
+
+import re
+import csv
+import sys
+import argparse
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs, urljoin
+from concurrent.futures import ThreadPoolExecutor
+
+import lxml.html
+from lxml.etree import ParserError
+
+import config # Import configuration centralisée
+from scraper.url_canonical import canonical_url, url_dedupe_key # Déduplication des variantes d'une même URL
+from event_log import get_logger # Journal structuré (console + <csv>_events.jsonl de la tâche)
+
+logger = get_logger("serp_parser")
+
+GOOGLE_BASE_URL = "https://www.google.com/" # Les href du HTML brut sont relatifs (/url?q=...), link.href du navigateur non
+
+
+def _has_class(class_name):
+    """Équivalent XPath du sélecteur CSS .class_name."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')"
+
+
+# Mêmes sélecteurs que SERP_LINKS_SCRIPT (google_search_scraper) :
+# div.tF2Cxc, puis 'div.yuRUbf > a[href], div > a[href][data-ved]', sinon 'a[href]:not([role="button"])'
+RESULT_CONTAINERS_XPATH = f"//div[{_has_class('tF2Cxc')}]"
+MAIN_LINK_XPATH = f".//div[{_has_class('yuRUbf')}]/a[@href] | .//div/a[@href and @data-ved]"
+FALLBACK_LINK_XPATH = ".//a[@href and not(@role='button')]"
+
+
+def _visible_text(element):
+    return " ".join(element.text_content().split())
+
+
+def classify_serp_link(url, title, keyword_combination):
+    """
+    Filtre un lien de résultat Google : retourne le dictionnaire du résultat si c'est une page/un profil
+    Facebook ou Instagram valide, sinon None. Pur Python (aucun appel WebDriver).
+    """
+    # Nettoyer les URLs de redirection Google
+    if url and "google." in urlparse(url).netloc and "/url?q=" in url:
+         try:
+              parsed_url = urlparse(url)
+              query_params = parse_qs(parsed_url.query)
+              if 'q' in query_params and query_params['q']:
+                   url = query_params['q'][0] # Prendre l'URL réelle
+              else:
+                   url = None # URL de redirection invalide
+         except Exception:
+              url = None # Échec du parsing
+
+    if not url:
+        return None
+
+    # --- Vérification si l'URL est une page Facebook ou Instagram (avec filtre de slashes) ---
+    is_facebook = False
+    is_instagram = False
+    cleaned_url_lower = url.lower() # Convertir en minuscules une seule fois
+
+    # Validation pour Facebook
+    if "facebook.com/" in cleaned_url_lower and \
+       "facebook.com/ads" not in cleaned_url_lower and \
+       "facebook.com/l.php" not in cleaned_url_lower and \
+       not cleaned_url_lower.startswith("https://m.facebook.com"):
+        try:
+            parsed_url_fb = urlparse(url)
+            path_fb = parsed_url_fb.path.strip('/')
+            slash_count_fb = path_fb.count('/')
+            MAX_SLASHES_IN_FB_PATH = 1
+
+            # Exclure les chemins courants non liés à des profils/pages
+            exclude_fb_segments = ['events', 'groups', 'notes', 'photo', 'video', 'watch', 'marketplace', 'gaming', 'fundraisers', 'login', 'sharer', 'dialog', 'pages', 'stories', 'help', 'settings', 'notifications', 'messages', 'friends', 'bookmarks', 'directory']
+
+            if path_fb and slash_count_fb <= MAX_SLASHES_IN_FB_PATH and \
+               not path_fb.isdigit() and \
+               not any(segment in path_fb.split('/') for segment in exclude_fb_segments) and \
+               'profile.php?id=' not in url: # Exclure les anciens profils par ID pour l'instant
+                is_facebook = True
+            elif 'profile.php?id=' in url: # Gérer spécifiquement les profils par ID
+                is_facebook = True
+
+
+        except Exception:
+            pass # Ignorer les erreurs de parsing
+
+    # Validation pour Instagram
+    elif "instagram.com/" in cleaned_url_lower and \
+         "instagram.com/ads" not in cleaned_url_lower:
+        try:
+            parsed_url_insta = urlparse(url)
+            path_insta = parsed_url_insta.path.strip('/')
+            slash_count_insta = path_insta.count('/')
+            MAX_SLASHES_IN_INSTA_PATH = 1
+
+            # Exclusions pour Instagram (segments de chemin courants)
+            exclude_insta_segments_startswith = [
+                'p/', 'reel/', 'explore', 'tags', 'locations', 'developer', 'about',
+                'legal', 'api', 'accounts', 'login', 'emails', 'challenge', 'direct', 'stories'
+            ]
+
+            if path_insta and slash_count_insta <= MAX_SLASHES_IN_INSTA_PATH and \
+               not any(path_insta.startswith(segment) for segment in exclude_insta_segments_startswith) and \
+               '.' not in path_insta: # Exclure les chemins avec des points (fichiers)
+                is_instagram = True
+
+        except Exception:
+            pass # Ignorer les erreurs de parsing
+
+    # --- Si c'est une URL Facebook OU une URL Instagram (selon les filtres) ---
+    # Vérifier aussi que l'URL n'est pas juste la page d'accueil
+    if not (is_facebook or is_instagram) or url.strip().lower() in ["https://www.facebook.com/", "https://www.instagram.com/"]:
+        return None
+    return {
+        "Titre_Google": (title or "").strip() or url, # Titre par défaut : l'URL
+        "URL": url,
+        "Source_Mot_Cle": keyword_combination,
+        "Type_Lien_Google": "Facebook" if is_facebook else "Instagram"
+    }
+
+# --- Analyse d'une page de résultats Google à partir de son HTML (sans navigateur) ---
+def parse_serp_links(html):
+    """Liens {href, title} des conteneurs de résultats d'une page Google (HTML brut ou driver.page_source)."""
+    try:
+        document = lxml.html.fromstring(html)
+    except (ParserError, ValueError) as e_parse:
+        logger.warning("HTML de résultats illisible : %s", e_parse, extra={'stage': 'google_serp_parse'})
+        return []
+    serp_links = []
+    for container in document.xpath(RESULT_CONTAINERS_XPATH):
+        links = container.xpath(MAIN_LINK_XPATH) or container.xpath(FALLBACK_LINK_XPATH)
+        if not links:
+            continue # Pas de lien trouvé dans ce conteneur
+        link = links[0] # Premier dans l'ordre du document, comme querySelector
+        h3_elements = link.xpath(".//h3")
+        title = _visible_text(h3_elements[0]) if h3_elements else ""
+        serp_links.append({'href': urljoin(GOOGLE_BASE_URL, link.get('href')), 'title': title or _visible_text(link)})
+    return serp_links
+
+
+def parse_google_results_html(html, keyword_combination):
+    """Mêmes dictionnaires que extract_google_results, à partir du HTML de la page."""
+    page_results = []
+    for serp_link in parse_serp_links(html):
+        result = classify_serp_link(serp_link['href'], serp_link['title'], keyword_combination)
+        if result:
+            page_results.append(result)
+    return page_results
+
+
+# --- Pool d'analyse : le thread du navigateur enchaîne la navigation pendant que la page précédente est analysée ---
+_parse_pool = None
+
+
+def submit_serp_parse(html, keyword_combination):
+    """Analyse le HTML dans le pool SERP_PARSE_WORKERS. Retourne un Future (liste de résultats)."""
+    global _parse_pool
+    if _parse_pool is None:
+        _parse_pool = ThreadPoolExecutor(max_workers=max(1, config.SERP_PARSE_WORKERS), thread_name_prefix="serp-parse")
+    return _parse_pool.submit(parse_google_results_html, html, keyword_combination)
+
+
+# --- Retraitement des pages sauvegardées : python -m scraper.serp_parser [fichiers_html ...] --csv sortie.csv ---
+SAVED_SERP_PATTERN = re.compile(r"_GoogleResultsP\d+_(?P<keyword>.+)\.html$")
+REPROCESS_CSV_HEADERS = ["Titre_Google", "URL", "Source_Mot_Cle", "Type_Lien_Google", "Fichier_Source"]
+
+
+def reprocess_saved_serps(html_files):
+    """Analyse des pages de résultats archivées (dans le pool). Retourne les résultats dédupliqués, dans l'ordre des fichiers."""
+    futures = []
+    for html_file in html_files:
+        keyword_match = SAVED_SERP_PATTERN.search(html_file.name)
+        keyword_combination = keyword_match.group('keyword') if keyword_match else html_file.stem
+        futures.append((html_file, submit_serp_parse(html_file.read_text(encoding="utf-8", errors="ignore"), keyword_combination)))
+    results, seen_url_keys = [], set()
+    for html_file, future in futures:
+        page_results = future.result()
+        print(f"{html_file.name} : {len(page_results)} lien(s) Facebook/Instagram")
+        for result in page_results:
+            url_key = url_dedupe_key(result['URL'])
+            if not url_key or url_key in seen_url_keys:
+                continue
+            seen_url_keys.add(url_key)
+            results.append({**result, 'URL': canonical_url(result['URL']), 'Fichier_Source': html_file.name})
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extrait les liens Facebook/Instagram de pages de résultats Google sauvegardées.")
+    parser.add_argument("html_files", nargs="*", help="Pages HTML (par défaut : screenshots/*_GoogleResultsP*_*.html).")
+    parser.add_argument("--csv", help="Fichier CSV de sortie (sinon affichage).")
+    args = parser.parse_args()
+    html_files = [Path(path) for path in args.html_files] or sorted((config.BASE_DIR / "screenshots").glob("*_GoogleResultsP*_*.html"))
+    if not html_files:
+        print("Aucune page de résultats Google trouvée.")
+        sys.exit(1)
+    reprocessed = reprocess_saved_serps(html_files)
+    if args.csv:
+        with open(args.csv, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=REPROCESS_CSV_HEADERS)
+            writer.writeheader()
+            writer.writerows(reprocessed)
+        print(f"{len(reprocessed)} URL(s) unique(s) écrite(s) dans {args.csv}")
+    else:
+        for result in reprocessed:
+            print(f"{result['Type_Lien_Google']}\t{result['URL']}\t{result['Titre_Google']}")
+        print(f"{len(reprocessed)} URL(s) unique(s) sur {len(html_files)} page(s).")
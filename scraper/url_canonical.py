@@ -0,0 +1,171 @@
+# /home/AlienScraper/scraper/url_canonical.py
+
+import re
+from urllib.parse import urlparse, urlunparse, parse_qs, parse_qsl, urlencode
+
+
+# --- Utility function to clean URLs ---
+def clean_url(url):
+    """
+    Cleans a URL by removing query parameters and fragments, preserving scheme, netloc, and path.
+    Handles common social media URL structures.
+    Returns the cleaned URL string or "Not Found" if the input is invalid.
+    """
+    if not url or not isinstance(url, str) or url in ["Not Found", "N/A", "N/A (Insta)", "N/A (FB)", "Not Generated"]:
+        return "Not Found"
+
+    try:
+        parsed_url = urlparse(url)
+        scheme = parsed_url.scheme
+        netloc = parsed_url.netloc
+        path = parsed_url.path.strip('/') # Remove leading/trailing slashes initially
+
+        # Specific cleaning based on domain
+        if "instagram.com" in netloc.lower():
+             path_segments = [segment for segment in path.split('/') if segment]
+             if path_segments:
+                 # Assume the first segment after the domain is the username
+                 path = '/' + path_segments[0] + '/' # Add trailing slash back for convention
+             else:
+                  path = '/' # Root Instagram URL (unlikely for a profile)
+
+        elif "facebook.com" in netloc.lower():
+             # Handle profile.php?id=... specifically by preserving the id query parameter
+             if parsed_url.path.lower().strip('/') == 'profile.php' and 'id' in parse_qs(parsed_url.query):
+                 query_params = parse_qs(parsed_url.query)
+                 query = f"?id={query_params['id'][0]}" if query_params['id'] else ""
+                 path = parsed_url.path # Keep original path /profile.php
+                 # Reconstruct with preserved query
+                 cleaned_url = urlunparse((scheme, netloc, path, '', query, ''))
+                 return cleaned_url.strip() # Return early for this specific case
+
+             # For other Facebook URLs (pages, groups), just remove query and fragment
+             path = parsed_url.path # Keep the full path
+
+        elif "wa.me" in netloc.lower():
+             # Keep only the number part in the path
+             path_segments = [segment for segment in path.split('/') if segment]
+             if path_segments:
+                 path = '/' + path_segments[0] # Should be just the number
+             else:
+                  path = '/' # Should not happen for a valid wa.me link
+
+        elif not path: # If path is empty after strip, use '/'
+             path = '/'
+        else: # Add leading and trailing slashes back to the path for consistency unless it's a file (like .html)
+             # Heuristic: Add trailing slash if it doesn't look like a file path
+             if '.' not in path.split('/')[-1]:
+                  path = '/' + path + '/'
+             else:
+                  path = '/' + path # Just add leading slash for file paths
+
+
+        # Reconstruct the URL without query parameters and fragment, but keep cleaned path
+        cleaned_url = urlunparse((scheme, netloc, path, '', '', '')) # scheme, netloc, path, params, query, fragment
+
+        return cleaned_url.strip()
+
+    except Exception:
+        # If parsing or cleaning fails, return "Not Found"
+        return "Not Found"
+
+
+# Sous-domaines qui servent la même page Facebook / Instagram (mobile, versions linguistiques...)
+SOCIAL_HOSTS = {'facebook.com': 'www.facebook.com', 'fb.com': 'www.facebook.com', 'instagram.com': 'www.instagram.com'}
+SOCIAL_SUBDOMAIN_PATTERN = re.compile(r'^(?:www|m|mobile|mbasic|web|touch|business|[a-z]{2}(?:-[a-z]{2})?)\.')
+# Onglets d'une page Facebook qui renvoient au même prospect que la page principale
+FACEBOOK_PAGE_TABS = {'about', 'about_details', 'about_contact_and_basic_info', 'community', 'reviews', 'services', 'mentions'}
+# Pages Facebook de contenu (post, photo, vidéo) identifiées par leurs paramètres : seuls ceux-ci sont gardés
+FACEBOOK_CONTENT_ENDPOINTS = {
+    'story.php': ('story_fbid', 'id'),
+    'permalink.php': ('story_fbid', 'id'),
+    'photo.php': ('fbid', 'set'),
+    'photo': ('fbid', 'set'),
+    'video.php': ('v',),
+    'watch': ('v',),
+}
+# Sections Instagram dont le 2e segment identifie le contenu (publication, reel...) : gardé dans l'URL
+INSTAGRAM_CONTENT_SECTIONS = {'p', 'reel', 'reels', 'tv', 'stories'}
+# Paramètres de suivi sans effet sur la page (retirés des URLs de sites génériques)
+TRACKING_PARAMS_PATTERN = re.compile(r'^(?:utm_.*|fbclid|gclid|gbraid|wbraid|msclkid|igshid|mc_[a-z]+|ref|ref_src|locale|hl|_ga|srsltid)$', re.IGNORECASE)
+
+
+def _social_host(netloc):
+    """www.facebook.com / www.instagram.com pour toutes les variantes (m., fr-fr., web...), sinon None."""
+    host = netloc.lower().split(':')[0]
+    while SOCIAL_SUBDOMAIN_PATTERN.match(host) and host.count('.') > 1:
+        host = SOCIAL_SUBDOMAIN_PATTERN.sub('', host, count=1)
+    return SOCIAL_HOSTS.get(host)
+
+
+def canonical_url(url):
+    """
+    Forme canonique d'une URL, appliquée dès son entrée dans le pipeline (résultats Google, reprise) :
+    - Facebook / Instagram : https://www.<réseau>.com, sous-domaines mobiles/linguistiques ramenés à www,
+      paramètres (?locale=, ?hl=...) retirés sauf profile.php?id= et les identifiants des posts / photos / vidéos
+      (story.php?story_fbid=&id=, permalink.php, photo.php?fbid=, watch/?v=...), identifiant en minuscules,
+      onglets d'une page Facebook (/about...) ramenés à la page, slash final uniforme ;
+    - autres sites : hôte en minuscules, fragment et paramètres de suivi (utm_*, fbclid...) retirés.
+    Retourne "Not Found" pour une URL invalide (comme clean_url).
+    """
+    if not url or not isinstance(url, str) or url in ["Not Found", "N/A", "N/A (Insta)", "N/A (FB)", "Not Generated"]:
+        return "Not Found"
+    url = url.strip()
+    try:
+        parsed_url = urlparse(url if "://" in url else "https://" + url)
+        if not parsed_url.netloc:
+            return "Not Found"
+        social_host = _social_host(parsed_url.netloc)
+        path_segments = [segment for segment in parsed_url.path.split('/') if segment]
+
+        if social_host == 'www.facebook.com':
+            if path_segments and path_segments[0].lower() == 'profile.php':
+                profile_id = parse_qs(parsed_url.query).get('id')
+                query = f"id={profile_id[0]}" if profile_id else ""
+                return urlunparse(('https', social_host, '/profile.php', '', query, ''))
+            if len(path_segments) == 1 and path_segments[0].lower() in FACEBOOK_CONTENT_ENDPOINTS:
+                endpoint = path_segments[0].lower()
+                query_params = parse_qs(parsed_url.query)
+                query = urlencode([(key, query_params[key][0]) for key in FACEBOOK_CONTENT_ENDPOINTS[endpoint] if query_params.get(key)])
+                path = f"/{endpoint}" if endpoint.endswith('.php') else f"/{endpoint}/"
+                return urlunparse(('https', social_host, path, '', query, ''))
+            if path_segments and path_segments[0].lower() == 'pg': # Ancien format /pg/<page>/...
+                path_segments = path_segments[1:]
+            if len(path_segments) == 2 and path_segments[1].lower() in FACEBOOK_PAGE_TABS:
+                path_segments = path_segments[:1]
+            if path_segments:
+                path_segments[0] = path_segments[0].lower() # Nom de page insensible à la casse (pas les id de posts)
+            path = '/' + '/'.join(path_segments) + '/' if path_segments else '/'
+            return urlunparse(('https', social_host, path, '', '', ''))
+
+        if social_host == 'www.instagram.com':
+            if path_segments and path_segments[0].lower() in INSTAGRAM_CONTENT_SECTIONS:
+                path_segments = path_segments[:2] # /p/<code>/ : le code est sensible à la casse
+            else:
+                path_segments = [segment.lower() for segment in path_segments[:1]] # /<utilisateur>/
+            path = '/' + '/'.join(path_segments) + '/' if path_segments else '/'
+            return urlunparse(('https', social_host, path, '', '', ''))
+
+        if "wa.me" in parsed_url.netloc.lower():
+            return clean_url(url)
+
+        query = urlencode([(key, value) for key, value in parse_qsl(parsed_url.query, keep_blank_values=True)
+                           if not TRACKING_PARAMS_PATTERN.match(key)])
+        path = parsed_url.path or '/'
+        return urlunparse((parsed_url.scheme.lower(), parsed_url.netloc.lower(), path, parsed_url.params, query, ''))
+    except Exception:
+        return "Not Found"
+
+
+def url_dedupe_key(url):
+    """
+    Clé de déduplication : canonical_url sans le schéma ni "www." (http:// et https://www. d'un même
+    site sont un seul prospect) et sans slash final. Retourne None pour une URL invalide.
+    """
+    canonical = canonical_url(url)
+    if canonical == "Not Found":
+        return None
+    key = canonical.split("://", 1)[-1]
+    if key.startswith("www."):
+        key = key[4:]
+    return key.rstrip('/')
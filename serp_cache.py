@@ -0,0 +1,114 @@
+# /home/AlienScraper/serp_cache.py
+
+import json
+import time
+import sqlite3
+import threading
+import traceback
+
+import config # Import configuration centralisée
+
+
+# --- Cache persistant des pages de résultats Google (partagé entre les tâches) ---
+class SerpCache:
+    """
+    Stocke les résultats extraits d'une page Google (dictionnaires de extract_google_results, avant
+    déduplication) par requête exacte envoyée à Google (opérateurs site: compris) et numéro de page,
+    dans une base SQLite sur disque. is_last_page mémorise que cette page n'a pas de lien "Suivant" (fin des résultats).
+    - TTL : une entrée plus vieille que ttl_seconds est ignorée puis supprimée à l'ouverture suivante.
+    Relancer une même recherche dans les heures qui suivent évite consentement, chargements, pauses et captchas.
+    Mode WAL : plusieurs worker.py peuvent la lire/écrire en même temps.
+    """
+
+    def __init__(self, db_path, ttl_seconds):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def open(self):
+        """Ouvre (ou crée) la base du cache. Retourne self pour un usage chaîné."""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS serp_pages (search_query TEXT NOT NULL, page_num INTEGER NOT NULL, "
+                           "results TEXT NOT NULL, is_last_page INTEGER NOT NULL, stored_at REAL NOT NULL, "
+                           "PRIMARY KEY (search_query, page_num))")
+        try:
+            self._conn.execute("DELETE FROM serp_pages WHERE stored_at < ?", (time.time() - self.ttl_seconds,))
+        except Exception:
+            traceback.print_exc()
+        self._conn.commit()
+        print(f"[SERP Cache] Cache des pages Google ouvert : {self.db_path} (TTL {self.ttl_seconds // 3600} h)")
+        return self
+
+    def get(self, search_query, page_num):
+        """(résultats, is_last_page) en cache pour cette page, ou None si absente / expirée."""
+        if self._conn is None:
+            return None
+        try:
+            with self._lock:
+                row = self._conn.execute("SELECT results, is_last_page, stored_at FROM serp_pages WHERE search_query = ? AND page_num = ?",
+                                         (search_query, page_num)).fetchone()
+            if row is None or time.time() - row[2] > self.ttl_seconds:
+                return None
+            return json.loads(row[0]), bool(row[1])
+        except Exception as e:
+            print(f"[SERP Cache] Erreur lors de la lecture du cache pour '{search_query}' page {page_num} : {e}")
+            return None
+
+    def get_search(self, search_query, pages_limit):
+        """
+        Pages 1..pages_limit d'une recherche, toutes en cache (ou jusqu'à la dernière page de résultats).
+        Retourne la liste des résultats de chaque page, ou None s'il en manque une : la recherche est alors
+        refaite sur Google (la pagination par bouton "Suivant" ne permet pas de sauter aux pages manquantes).
+        """
+        cached_pages = []
+        for page_num in range(1, pages_limit + 1):
+            cached_page = self.get(search_query, page_num)
+            if cached_page is None:
+                with self._lock:
+                    self.misses += 1
+                return None
+            page_results, is_last_page = cached_page
+            cached_pages.append(page_results)
+            if is_last_page:
+                break
+        with self._lock:
+            self.hits += 1
+        return cached_pages
+
+    def put(self, search_query, page_num, page_results, is_last_page):
+        """Met en cache les résultats d'une page. Une page vide (captcha, timeout...) n'est jamais stockée."""
+        if self._conn is None or not page_results:
+            return False
+        try:
+            payload = json.dumps(page_results, ensure_ascii=False, default=str)
+            with self._lock:
+                self._conn.execute("INSERT OR REPLACE INTO serp_pages (search_query, page_num, results, is_last_page, stored_at) VALUES (?, ?, ?, ?, ?)",
+                                   (search_query, page_num, payload, int(is_last_page), time.time()))
+                self._conn.commit()
+            return True
+        except Exception as e:
+            print(f"[SERP Cache] Erreur lors de l'écriture du cache pour '{search_query}' page {page_num} : {e}")
+            return False
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        print(f"[SERP Cache] Cache fermé : {self.hits} recherche(s) servie(s) par le cache, {self.misses} recherche(s) Google pour cette tâche.")
+
+
+def open_serp_cache():
+    """Ouvre le cache configuré dans config.py, ou retourne None s'il est désactivé / inutilisable."""
+    if not config.SERP_CACHE_ENABLED:
+        return None
+    try:
+        return SerpCache(config.SERP_CACHE_PATH, config.SERP_CACHE_TTL_HOURS * 3600).open()
+    except Exception as e:
+        print(f"[SERP Cache] Impossible d'ouvrir le cache {config.SERP_CACHE_PATH} : {e}. Recherche sans cache.")
+        return None
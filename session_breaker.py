@@ -0,0 +1,126 @@
+# /home/AlienScraper/session_breaker.py
+
+import os
+import threading
+from urllib.parse import urlparse
+
+import config # Import configuration centralisée
+from event_log import get_logger # Journal structuré (console + <csv>_events.jsonl de la tâche)
+
+
+logger = get_logger("session_breaker")
+
+
+# Statuts renvoyés quand la plateforme redirige vers sa page de connexion (session expirée ou révoquée).
+# Instagram renvoie aussi "Redirected/Inaccessible" pour un profil privé : d'où le seuil d'échecs consécutifs.
+LOGIN_REDIRECT_STATUSES = {
+    'facebook': {"Redirected to login/checkpoint/error page"},
+    'instagram': {"Redirected/Inaccessible after timeout", "Redirected/Inaccessible after container find"},
+}
+# Mêmes fichiers que ceux gérés par /upload-cookies et ensure_social_logins
+COOKIE_FILES = {
+    'facebook': config.BASE_DIR / "facebook_cookies.json",
+    'instagram': config.BASE_DIR / "instagram_cookies.json",
+}
+
+
+def url_platform(url):
+    """'facebook', 'instagram' ou None (sites génériques : pas de session à surveiller)."""
+    netloc = urlparse(url or "").netloc.lower()
+    for platform in LOGIN_REDIRECT_STATUSES:
+        if netloc == f"{platform}.com" or netloc.endswith(f".{platform}.com"):
+            return platform
+    return None
+
+
+def _cookie_file_mtime(platform):
+    try:
+        return os.path.getmtime(COOKIE_FILES[platform])
+    except OSError:
+        return None
+
+
+# --- Circuit breaker de session par plateforme ---
+class SessionCircuitBreaker:
+    """
+    Après SESSION_BREAKER_THRESHOLD redirections consécutives vers la connexion sur une plateforme :
+    - une reconnexion depuis le fichier de cookies est tentée sur le navigateur concerné
+      (une seule par navigateur et par tâche, chaque navigateur du pool ayant sa propre session) ;
+    - si elle échoue, le disjoncteur s'ouvre : les URLs restantes de la plateforme sont reportées
+      (gardées en attente dans le checkpoint) au lieu d'attendre 25 s chacune un échec certain.
+    Un nouveau fichier de cookies (/upload-cookies) referme le disjoncteur pendant la tâche.
+    Thread-safe : partagé par tous les workers du pool.
+    """
+
+    def __init__(self, relogin, threshold):
+        self.relogin = relogin # relogin(driver, platform) -> True si la session est de nouveau active
+        self.threshold = threshold
+        self.deferred_count = 0
+        self._consecutive = {platform: 0 for platform in LOGIN_REDIRECT_STATUSES}
+        self._open_since_cookies = {} # Plateforme ouverte -> date du fichier de cookies au moment de l'ouverture
+        self._relogin_attempted = {platform: set() for platform in LOGIN_REDIRECT_STATUSES} # id() des navigateurs
+        self._lock = threading.Lock()
+
+    def allow(self, url):
+        """False si la plateforme de l'URL est coupée : l'URL doit être reportée."""
+        platform = url_platform(url)
+        if platform is None:
+            return True
+        with self._lock:
+            if platform not in self._open_since_cookies:
+                return True
+            if _cookie_file_mtime(platform) != self._open_since_cookies[platform]:
+                # Cookies renouvelés depuis l'ouverture : nouvelle chance de reconnexion pour chaque navigateur
+                logger.info("Nouveau fichier de cookies %s : reprise du scraping %s.", platform, platform,
+                            extra={'url': url, 'stage': 'session_breaker', 'status': 'closed'})
+                del self._open_since_cookies[platform]
+                self._consecutive[platform] = 0
+                self._relogin_attempted[platform].clear()
+                return True
+            self.deferred_count += 1
+            return False
+
+    def record(self, driver, url, scraping_status):
+        """
+        Résultat d'une page de la plateforme. Retourne True si une reconnexion vient de réussir
+        sur ce navigateur (la page peut être rechargée tout de suite).
+        """
+        platform = url_platform(url)
+        if platform is None:
+            return False
+        with self._lock:
+            if scraping_status not in LOGIN_REDIRECT_STATUSES[platform]:
+                self._consecutive[platform] = 0
+                return False
+            self._consecutive[platform] += 1
+            if self._consecutive[platform] < self.threshold or platform in self._open_since_cookies:
+                return False
+            logger.warning("%d redirection(s) consécutive(s) vers la connexion %s.", self._consecutive[platform], platform,
+                           extra={'url': url, 'stage': 'session_breaker', 'status': scraping_status})
+            if id(driver) not in self._relogin_attempted[platform]:
+                # Verrou gardé pendant la reconnexion : les autres workers attendent au lieu d'enchaîner les échecs
+                self._relogin_attempted[platform].add(id(driver))
+                if self.relogin(driver, platform):
+                    logger.info("Reconnexion %s réussie depuis les cookies.", platform,
+                                extra={'url': url, 'stage': 'session_breaker', 'status': 'relogin_ok'})
+                    self._consecutive[platform] = 0
+                    return True
+            self._open_since_cookies[platform] = _cookie_file_mtime(platform)
+            logger.warning("Session %s perdue : les URLs %s restantes sont reportées (nouveaux cookies via /upload-cookies, puis /resume-job).",
+                           platform, platform, extra={'url': url, 'stage': 'session_breaker', 'status': 'open'})
+            return False
+
+    def open_platforms(self):
+        with self._lock:
+            return sorted(self._open_since_cookies)
+
+    def summary(self):
+        """Champs de job.meta / du rapport d'exécution."""
+        return {'open_platforms': self.open_platforms(), 'urls_deferred': self.deferred_count}
+
+
+def create_session_breaker(relogin):
+    """SessionCircuitBreaker de la tâche, ou None (SESSION_BREAKER_ENABLED=0 : chaque URL est tentée)."""
+    if not config.SESSION_BREAKER_ENABLED:
+        return None
+    return SessionCircuitBreaker(relogin, max(1, config.SESSION_BREAKER_THRESHOLD))
@@ -0,0 +1,6 @@
+# /home/AlienScraper/tests/conftest.py
+# Les modules du projet sont à la racine (pas de paquet installé) : la rendre importable pour pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,67 @@
+# /home/AlienScraper/tests/test_cancellation.py
+
+import pytest
+
+import config
+from cancellation import CancellationToken, cancel_key, request_cancellation
+
+
+class FakeRedis:
+    def __init__(self):
+        self.keys = {}
+
+    def set(self, key, value, ex=None):
+        self.keys[key] = value
+
+    def delete(self, key):
+        self.keys.pop(key, None)
+
+    def exists(self, *keys):
+        return sum(key in self.keys for key in keys)
+
+
+class FakeJob:
+    def __init__(self, job_id, connection, meta=None):
+        self.id = job_id
+        self.connection = connection
+        self.meta = meta or {}
+
+
+@pytest.fixture(autouse=True)
+def check_every_call(monkeypatch):
+    monkeypatch.setattr(config, 'CANCEL_CHECK_INTERVAL_SECONDS', 0)
+
+
+def test_redis_key_cancels_the_job():
+    redis = FakeRedis()
+    token = CancellationToken()
+    token.reset(FakeJob("job1", redis))
+    assert not token.is_cancelled()
+    request_cancellation(redis, "job1")
+    assert token.is_cancelled()
+    redis.delete(cancel_key("job1"))
+    assert token.is_cancelled() # Reste levé jusqu'à la tâche suivante
+
+
+def test_parent_key_cancels_split_shards():
+    redis = FakeRedis()
+    token = CancellationToken()
+    token.reset(FakeJob("job1_shard2", redis, meta={'parent_job_id': "job1"}))
+    request_cancellation(redis, "job1")
+    assert token.is_cancelled()
+
+
+def test_reset_clears_a_stale_request_on_resume():
+    redis = FakeRedis()
+    request_cancellation(redis, "job1")
+    token = CancellationToken()
+    token.reset(FakeJob("job1", redis))
+    assert not token.is_cancelled()
+    assert cancel_key("job1") not in redis.keys
+
+
+def test_sleep_returns_early_once_cancelled():
+    token = CancellationToken()
+    token.cancel("test")
+    token.sleep(30)
+    assert token.reason == "test"
@@ -0,0 +1,41 @@
+# /home/AlienScraper/tests/test_checkpoint.py
+
+from checkpoint import JobCheckpoint
+
+
+def test_resume_round_trip(tmp_path):
+    checkpoint = JobCheckpoint("job:1", base_dir=tmp_path)
+    checkpoint.set_output_csv(tmp_path / "job.csv")
+    checkpoint.mark_combination_done("spa rabat")
+    checkpoint.add_pending({'URL': "https://www.facebook.com/a", 'Source_Mot_Cle': "spa rabat"})
+    checkpoint.add_pending({'URL': "https://www.facebook.com/b", 'Source_Mot_Cle': "spa rabat"})
+    checkpoint.record_scraped("https://www.facebook.com/a")
+
+    resumed = JobCheckpoint("job:1", base_dir=tmp_path)
+    assert resumed.load()
+    assert resumed.completed_combinations == {"spa rabat"}
+    assert list(resumed.pending_items) == ["https://www.facebook.com/b"]
+    assert resumed.scraped_urls == {"https://www.facebook.com/a"}
+    assert resumed.output_csv == str(tmp_path / "job.csv")
+
+
+def test_url_scraped_but_still_pending_is_not_redone(tmp_path):
+    # Kill entre l'écriture de scraped_urls.txt et celle de state.json
+    checkpoint = JobCheckpoint("job2", base_dir=tmp_path)
+    checkpoint.add_pending({'URL': "https://www.facebook.com/a"})
+    with open(checkpoint.scraped_urls_path, 'a', encoding='utf-8') as f:
+        f.write("https://www.facebook.com/a\n")
+
+    resumed = JobCheckpoint("job2", base_dir=tmp_path)
+    assert resumed.load()
+    assert resumed.pending_items == {}
+
+
+def test_clear_removes_checkpoint(tmp_path):
+    checkpoint = JobCheckpoint("job3", base_dir=tmp_path)
+    assert not checkpoint.exists()
+    checkpoint.mark_combination_done("a x")
+    assert checkpoint.exists()
+    checkpoint.clear()
+    assert not checkpoint.exists()
+    assert not JobCheckpoint("job3", base_dir=tmp_path).load()
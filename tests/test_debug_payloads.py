@@ -0,0 +1,50 @@
+# /home/AlienScraper/tests/test_debug_payloads.py
+
+import config
+from debug_payloads import load_debug_payload, open_debug_payload_spill
+
+INTRO = "Full Intro/About Text (from container)"
+HEADER = "Full Header Text (from container)"
+
+
+def open_spill(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'DEBUG_PAYLOADS_ENABLED', True)
+    return open_debug_payload_spill(tmp_path / "job.csv")
+
+
+def test_disabled_returns_none(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'DEBUG_PAYLOADS_ENABLED', False)
+    assert open_debug_payload_spill(tmp_path / "job.csv") is None
+
+
+def test_payload_moved_out_of_row(tmp_path, monkeypatch):
+    spill = open_spill(tmp_path, monkeypatch)
+    row = {"URL_Originale_Source": "https://www.facebook.com/a", "Nom de la Page": "A",
+           INTRO: "Restaurant · Rabat", HEADER: "Not Found (Container not found)"}
+    assert spill.spill(row)
+    spill.close()
+    assert row == {"URL_Originale_Source": "https://www.facebook.com/a", "Nom de la Page": "A"}
+    assert spill.path == tmp_path / "job_debug.jsonl"
+    assert load_debug_payload(spill.path, "https://www.facebook.com/a") == {"url": "https://www.facebook.com/a", INTRO: "Restaurant · Rabat"}
+
+
+def test_placeholders_only_write_nothing(tmp_path, monkeypatch):
+    spill = open_spill(tmp_path, monkeypatch)
+    row = {"URL": "https://www.facebook.com/b", INTRO: "Not Found", HEADER: ""}
+    assert not spill.spill(row)
+    spill.close()
+    assert INTRO not in row and HEADER not in row
+    assert not spill.path.exists() # Pas de fichier vide
+
+
+def test_last_line_wins_after_resume(tmp_path, monkeypatch):
+    spill = open_spill(tmp_path, monkeypatch)
+    spill.spill({"URL_Originale_Source": "u", INTRO: "ancien"})
+    spill.close()
+    spill = open_spill(tmp_path, monkeypatch) # Reprise : le fichier est complété
+    spill.spill({"URL_Originale_Source": "u", INTRO: "nouveau"})
+    assert spill.spill({"URL_Originale_Source": "v", INTRO: "x"})
+    spill.close()
+    assert not spill.spill({"URL_Originale_Source": "w", INTRO: "après fermeture"})
+    assert load_debug_payload(spill.path, "u")[INTRO] == "nouveau"
+    assert load_debug_payload(spill.path, "absente") is None
@@ -0,0 +1,52 @@
+# /home/AlienScraper/tests/test_http_fetch.py
+
+import pytest
+
+pytest.importorskip("bs4") # Dépendance optionnelle : sans elle tout passe par le navigateur
+from http_fetch import HttpPageFetcher
+
+URL = "https://www.example.org/"
+
+
+class FakeResponse:
+    def __init__(self, body, status_code=200, content_type="text/html; charset=utf-8"):
+        self.body = body.encode("utf-8")
+        self.status_code = status_code
+        self.headers = {"Content-Type": content_type}
+        self.encoding = "utf-8"
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.body), chunk_size):
+            yield self.body[start:start + chunk_size]
+
+
+@pytest.fixture
+def fetcher():
+    return HttpPageFetcher(timeout_seconds=5, min_text_chars=50, pool_size=1, user_agent="test", max_bytes=1024 * 1024)
+
+
+def page(title, text):
+    return f"<html><head><title>{title}</title><script>var x = 1;</script></head><body><p>{text}</p></body></html>"
+
+
+def test_static_page_is_extracted(fetcher):
+    text = "Spa Rabat, massages et soins. Téléphone : 0600000000. " * 2
+    title, body_text = fetcher._extract_page(FakeResponse(page("Spa Rabat", text)), URL)
+    assert title == "Spa Rabat"
+    assert "0600000000" in body_text and "var x" not in body_text
+
+
+@pytest.mark.parametrize("response", [
+    FakeResponse(page("Forbidden", "x" * 100), status_code=403),
+    FakeResponse("%PDF-1.4", content_type="application/pdf"),
+    FakeResponse(page("Just a moment...", "Checking your browser " * 10)),
+    FakeResponse('<html><body><div id="root"></div></body></html>'),
+])
+def test_browser_fallback(fetcher, response):
+    assert fetcher._extract_page(response, URL) is None
+
+
+def test_body_is_capped(fetcher):
+    fetcher.max_bytes = 1000
+    body = fetcher._read_body(FakeResponse("a" * 200_000), URL)
+    assert len(body) == 1000
@@ -0,0 +1,42 @@
+# /home/AlienScraper/tests/test_lead_priority.py
+
+import pytest
+
+from lead_priority import LeadPriorityQueue, LeadYieldStats, url_kind
+
+
+@pytest.mark.parametrize("url, link_type, kind", [
+    ("https://www.facebook.com/MaPage", None, 'facebook_page'),
+    ("https://www.facebook.com/MaPage/posts/123", None, 'facebook_post'),
+    ("https://www.facebook.com/photo.php?fbid=5", None, 'facebook_post'),
+    ("https://www.facebook.com/profile.php?id=42", None, 'facebook_profile_id'),
+    ("https://www.instagram.com/p/abc/", None, 'instagram_post'),
+    ("https://www.instagram.com/spa.rabat/", None, 'instagram_profile'),
+    ("https://www.spa-rabat.ma/", 'generic', 'generic'),
+])
+def test_url_kind(url, link_type, kind):
+    assert url_kind(url, link_type) == kind
+
+
+def test_queue_orders_by_expected_yield_then_arrival(tmp_path):
+    queue = LeadPriorityQueue(LeadYieldStats(tmp_path / "yield.sqlite").load())
+    queue.put(None) # Sentinelle de fin : toujours en dernier
+    queue.put({'URL': "https://www.facebook.com/MaPage/posts/1", 'Rang_Google': 1})
+    queue.put({'URL': "https://www.spa-rabat.ma/", 'Rang_Google': 1})
+    queue.put({'URL': "https://www.facebook.com/PageA", 'Rang_Google': 1})
+    queue.put({'URL': "https://www.facebook.com/PageB", 'Rang_Google': 1})
+    queue.put({'URL': "https://www.facebook.com/PageC", 'Rang_Google': 30}) # Rang 30 : 0,6 x 0,41, passe après un site générique au rang 1
+    order = [queue.get() for _ in range(6)]
+    assert [item and item['URL'].rsplit('/', 1)[-1] for item in order] == ["PageA", "PageB", "", "PageC", "1", None]
+
+
+def test_history_overrides_default_yield(tmp_path):
+    stats = LeadYieldStats(tmp_path / "yield.sqlite").load()
+    for _ in range(50):
+        stats.record({'URL': "https://www.spa-rabat.ma/"}, "Success - AI Extraction")
+        stats.record({'URL': "https://www.facebook.com/Page"}, "Redirected to login/checkpoint/error page")
+    stats.save()
+
+    reloaded = LeadYieldStats(tmp_path / "yield.sqlite").load()
+    assert reloaded.history == {'generic': (50, 50), 'facebook_page': (50, 0)}
+    assert reloaded.expected_yield('generic') > reloaded.expected_yield('facebook_page')
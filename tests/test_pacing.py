@@ -0,0 +1,48 @@
+# /home/AlienScraper/tests/test_pacing.py
+
+import pytest
+
+import config
+from pacing import DomainBucket, Pacer
+
+SETTINGS = {'facebook.com': (2.0, 4.0, 60.0), 'default': (1.0, 1.0, 10.0)}
+
+
+@pytest.fixture(autouse=True)
+def pacing_config(monkeypatch):
+    monkeypatch.setattr(config, 'PACING_ENABLED', True)
+    monkeypatch.setattr(config, 'PACING_SPEEDUP_FACTOR', 0.5)
+    monkeypatch.setattr(config, 'PACING_BACKOFF_BASE_SECONDS', 30)
+    monkeypatch.setattr(config, 'PACING_BACKOFF_MAX_SECONDS', 100)
+
+
+def test_backoff_doubles_then_caps():
+    bucket = DomainBucket('facebook.com', 2.0, 4.0, 60.0)
+    assert [bucket.on_block(now=0.0) for _ in range(4)] == [30, 60, 100, 100]
+    assert bucket.next_allowed_at == 100
+    bucket.on_success()
+    assert bucket.consecutive_blocks == 0
+
+
+def test_delay_bounded_by_domain_min_and_max():
+    bucket = DomainBucket('facebook.com', 2.0, 4.0, 60.0)
+    for _ in range(10):
+        bucket.on_block(now=0.0)
+    assert bucket.delay == 60.0
+    for _ in range(20):
+        bucket.on_success()
+    assert bucket.delay == 2.0
+
+
+def test_reserve_spaces_requests():
+    bucket = DomainBucket('facebook.com', 2.0, 4.0, 60.0)
+    assert bucket.reserve(now=0.0) == 0.0
+    assert 3.2 <= bucket.reserve(now=0.0) <= 4.8 # Délai de 4 s +/- 20 % de jitter
+
+
+def test_statuses_and_subdomains_map_to_domain_bucket():
+    pacer = Pacer(SETTINGS)
+    pacer.report_status("https://m.facebook.com/page", "Redirected to login/checkpoint/error page")
+    pacer.report_status("https://www.facebook.com/page", "Error Calling Page Scraper") # Neutre
+    pacer.report_status("https://example.org/", "Success - AI Extraction")
+    assert pacer.current_delays() == {'facebook.com': 8.0, 'example.org': 1.0}
@@ -0,0 +1,64 @@
+# /home/AlienScraper/tests/test_progress_reporter.py
+
+import time
+
+from progress_reporter import ProgressReporter
+
+
+class FakeJob:
+    """Tâche RQ sans connexion : ProgressReporter passe par save_meta()."""
+
+    def __init__(self):
+        self.meta = {}
+        self.saved_metas = []
+
+    def save_meta(self):
+        self.saved_metas.append(dict(self.meta))
+
+
+def test_updates_are_batched_by_item_count():
+    job = FakeJob()
+    progress = ProgressReporter(job, flush_interval=3600, flush_every_items=3)
+    for position in range(1, 8):
+        progress.update(progress=position)
+    assert [meta['progress'] for meta in job.saved_metas] == [3, 6]
+    progress.flush()
+    assert job.saved_metas[-1]['progress'] == 7
+
+
+def test_updates_are_flushed_after_interval(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(time, 'monotonic', lambda: now[0])
+    job = FakeJob()
+    progress = ProgressReporter(job, flush_interval=5, flush_every_items=1000)
+    progress.update(progress=1)
+    assert job.saved_metas == []
+    now[0] += 5
+    progress.update(progress=2)
+    assert progress.flush_count == 1
+
+
+def test_stage_flushes_immediately_with_hooks():
+    job = FakeJob()
+    progress = ProgressReporter(job, flush_interval=3600, flush_every_items=1000)
+    progress.add_flush_hook(lambda: {'rows_written': 42})
+    progress.stage(status_message="Recherche terminée")
+    assert job.saved_metas == [{'status_message': "Recherche terminée", 'rows_written': 42}]
+
+
+def test_failing_save_does_not_raise():
+    class BrokenJob(FakeJob):
+        def save_meta(self):
+            raise ConnectionError("Redis indisponible")
+
+    progress = ProgressReporter(BrokenJob(), flush_interval=0, flush_every_items=1)
+    progress.update(progress=1)
+    assert progress.flush_count == 0
+
+
+def test_without_job_everything_is_a_no_op():
+    progress = ProgressReporter(None, flush_interval=0, flush_every_items=1)
+    progress.update(progress=1)
+    progress.stage(progress=2)
+    progress.flush()
+    assert progress.flush_count == 0
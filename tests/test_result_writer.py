@@ -0,0 +1,53 @@
+# /home/AlienScraper/tests/test_result_writer.py
+
+import csv
+
+from result_writer import IncrementalResultWriter
+
+HEADERS = ["URL_Originale_Source", "Nom du tiers"]
+
+
+def read_rows(csv_path):
+    with open(csv_path, 'r', newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def test_url_variants_written_once(tmp_path):
+    writer = IncrementalResultWriter(tmp_path / "out.csv", HEADERS).open()
+    assert writer.write_row({"URL_Originale_Source": "https://www.facebook.com/MaPage", "Nom du tiers": "A"})
+    assert not writer.write_row({"URL_Originale_Source": "https://m.facebook.com/mapage/?locale=fr_FR", "Nom du tiers": "B"})
+    assert not writer.write_row({"URL_Originale_Source": "", "Nom du tiers": "C"})
+    writer.close()
+    assert [row["Nom du tiers"] for row in read_rows(tmp_path / "out.csv")] == ["A"]
+
+
+def test_dedupe_across_reopen(tmp_path):
+    csv_path = tmp_path / "out.csv"
+    writer = IncrementalResultWriter(csv_path, HEADERS).open()
+    writer.write_row({"URL_Originale_Source": "https://www.facebook.com/a"})
+    writer.close() # Index gardé : reprise
+
+    resumed = IncrementalResultWriter(csv_path, HEADERS).open()
+    assert not resumed.write_row({"URL_Originale_Source": "https://www.facebook.com/a/"})
+    assert resumed.write_row({"URL_Originale_Source": "https://www.facebook.com/b"})
+    assert resumed.count_rows() == 2
+    resumed.close(remove_index=True)
+    assert len(read_rows(csv_path)) == 2 # En-tête écrit une seule fois
+    assert not resumed.index_path.exists()
+
+
+def test_lost_index_is_rebuilt_from_csv(tmp_path):
+    csv_path = tmp_path / "out.csv"
+    writer = IncrementalResultWriter(csv_path, HEADERS).open()
+    writer.write_row({"URL_Originale_Source": "https://www.facebook.com/a"})
+    writer.close(remove_index=True)
+
+    resumed = IncrementalResultWriter(csv_path, HEADERS).open()
+    assert not resumed.write_row({"URL_Originale_Source": "https://www.facebook.com/a"})
+    resumed.close(remove_index=True)
+
+
+def test_empty_csv_removed_on_close(tmp_path):
+    writer = IncrementalResultWriter(tmp_path / "out.csv", HEADERS).open()
+    writer.close(remove_index=True)
+    assert not (tmp_path / "out.csv").exists()
@@ -0,0 +1,63 @@
+# /home/AlienScraper/tests/test_retry_queue.py
+
+import time
+
+import pytest
+
+import config
+from retry_queue import ATTEMPTS_FIELD, RETRY_AFTER_FIELD, RetryQueue, retry_delay_seconds
+
+TIMEOUT = "Timeout loading page elements"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(time, 'time', lambda: now[0])
+    monkeypatch.setattr(config, 'RETRY_BASE_DELAY_SECONDS', 30)
+    monkeypatch.setattr(config, 'RETRY_MAX_DELAY_SECONDS', 100)
+    return now
+
+
+def test_backoff_is_exponential_and_capped(clock):
+    assert [retry_delay_seconds(attempts) for attempts in range(1, 5)] == [30, 60, 100, 100]
+
+
+def test_transient_failure_retried_after_backoff(clock):
+    retries = RetryQueue(max_attempts=3)
+    url_item = {'URL': "https://www.facebook.com/a"}
+    assert retries.schedule(url_item, TIMEOUT)
+    assert url_item[ATTEMPTS_FIELD] == 1 and url_item[RETRY_AFTER_FIELD] == clock[0] + 30
+    assert retries.take_ready() == []
+    assert retries.seconds_until_next() == 30
+    clock[0] += 26 # Fenêtre de READY_WINDOW_SECONDS : part avec la vague courante
+    assert retries.take_ready() == [url_item]
+    assert retries.seconds_until_next() is None
+
+
+def test_gives_up_after_max_attempts(clock):
+    retries = RetryQueue(max_attempts=3)
+    url_item = {'URL': "https://www.facebook.com/a"}
+    for _ in range(2):
+        assert retries.schedule(url_item, TIMEOUT)
+        clock[0] += 100
+        assert retries.take_ready() == [url_item]
+    assert not retries.schedule(url_item, TIMEOUT) # 3e échec : ligne écrite avec ce statut
+    assert retries.summary() == {'retries_scheduled': 2, 'retries_pending': 0, 'retries_given_up': 1}
+
+
+def test_final_statuses_are_not_retried(clock):
+    retries = RetryQueue(max_attempts=3)
+    assert not retries.schedule({'URL': "https://www.facebook.com/a/posts/1"}, "Skipped - Looks like Post/Photo URL")
+    assert retries.pending_count() == 0
+
+
+def test_restored_items_keep_their_order(clock):
+    retries = RetryQueue(max_attempts=3)
+    late = {'URL': "late", RETRY_AFTER_FIELD: clock[0] + 60}
+    early = {'URL': "early", RETRY_AFTER_FIELD: clock[0] - 10}
+    retries.restore(late)
+    retries.restore(early)
+    assert retries.take_ready() == [early]
+    clock[0] += 60
+    assert retries.take_ready() == [late]
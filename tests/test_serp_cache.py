@@ -0,0 +1,76 @@
+# /home/AlienScraper/tests/test_serp_cache.py
+
+import time
+
+import pytest
+
+from serp_cache import SerpCache
+
+QUERY = "resto rabat site:facebook.com"
+
+
+def page(n):
+    return [{"URL": f"https://www.facebook.com/page{n}", "Type_Lien_Google": "Facebook"}]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(time, 'time', lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    serp_cache = SerpCache(tmp_path / "serp.sqlite", ttl_seconds=3600).open()
+    yield serp_cache
+    serp_cache.close()
+
+
+def test_search_served_when_all_pages_cached(cache):
+    for n in (1, 2, 3):
+        cache.put(QUERY, n, page(n), is_last_page=False)
+    assert cache.get_search(QUERY, 3) == [page(1), page(2), page(3)]
+    assert cache.get_search(QUERY, 2) == [page(1), page(2)]
+    assert (cache.hits, cache.misses) == (2, 0)
+
+
+def test_search_stops_at_last_page(cache):
+    cache.put(QUERY, 1, page(1), is_last_page=False)
+    cache.put(QUERY, 2, page(2), is_last_page=True)
+    assert cache.get_search(QUERY, 5) == [page(1), page(2)] # Pages 3 à 5 inexistantes sur Google
+
+
+def test_missing_page_forces_new_search(cache):
+    cache.put(QUERY, 1, page(1), is_last_page=False)
+    cache.put(QUERY, 3, page(3), is_last_page=False)
+    assert cache.get_search(QUERY, 3) is None
+    assert cache.get_search("autre requête", 1) is None
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test_empty_page_not_stored(cache):
+    assert not cache.put(QUERY, 1, [], is_last_page=True) # Captcha ou timeout
+    assert cache.get(QUERY, 1) is None
+
+
+def test_pages_expire_after_ttl(cache, clock):
+    cache.put(QUERY, 1, page(1), is_last_page=True)
+    clock[0] += 3599
+    assert cache.get_search(QUERY, 1) == [page(1)]
+    clock[0] += 2
+    assert cache.get_search(QUERY, 1) is None
+
+
+def test_expired_pages_purged_on_reopen(tmp_path, clock):
+    db_path = tmp_path / "serp.sqlite"
+    serp_cache = SerpCache(db_path, ttl_seconds=3600).open()
+    serp_cache.put(QUERY, 1, page(1), is_last_page=True)
+    serp_cache.close()
+    clock[0] += 7200
+    reopened = SerpCache(db_path, ttl_seconds=3600).open()
+    try:
+        count = reopened._conn.execute("SELECT COUNT(*) FROM serp_pages").fetchone()[0]
+        assert count == 0
+    finally:
+        reopened.close()
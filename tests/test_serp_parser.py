@@ -0,0 +1,68 @@
+# /home/AlienScraper/tests/test_serp_parser.py
+
+import pytest
+
+pytest.importorskip("lxml")
+
+from scraper.serp_parser import classify_serp_link, parse_google_results_html, parse_serp_links
+
+SERP_HTML = """
+<html><body>
+  <div class="g"><div class="tF2Cxc">
+    <div class="yuRUbf"><a href="/url?q=https://www.facebook.com/RestoRabat&amp;sa=U"><h3>Resto   Rabat</h3></a></div>
+  </div></div>
+  <div class="tF2Cxc">
+    <div><a href="https://www.instagram.com/restorabat/" data-ved="x"><h3>@restorabat</h3></a></div>
+  </div>
+  <div class="tF2Cxc">
+    <a role="button" href="/search?q=menu">Plus</a>
+    <a href="https://www.facebook.com/events/123">Soirée</a>
+  </div>
+  <div class="tF2Cxc"><span>Pas de lien</span></div>
+  <a href="https://www.facebook.com/HorsResultats">Lien hors conteneur</a>
+</body></html>
+"""
+
+
+def test_parse_serp_links_reads_result_containers():
+    assert parse_serp_links(SERP_HTML) == [
+        {'href': "https://www.google.com/url?q=https://www.facebook.com/RestoRabat&sa=U", 'title': "Resto Rabat"},
+        {'href': "https://www.instagram.com/restorabat/", 'title': "@restorabat"},
+        {'href': "https://www.facebook.com/events/123", 'title': "Soirée"}, # Repli sur a[href]:not([role="button"])
+    ]
+
+
+def test_parse_serp_links_unreadable_html():
+    assert parse_serp_links("") == []
+
+
+def test_parse_google_results_html_keeps_pages_and_profiles():
+    results = parse_google_results_html(SERP_HTML, "resto rabat")
+    assert results == [
+        {"Titre_Google": "Resto Rabat", "URL": "https://www.facebook.com/RestoRabat",
+         "Source_Mot_Cle": "resto rabat", "Type_Lien_Google": "Facebook"},
+        {"Titre_Google": "@restorabat", "URL": "https://www.instagram.com/restorabat/",
+         "Source_Mot_Cle": "resto rabat", "Type_Lien_Google": "Instagram"},
+    ]
+
+
+@pytest.mark.parametrize("url", [
+    "https://www.facebook.com/",
+    "https://www.facebook.com/groups/abc",
+    "https://www.facebook.com/123456",
+    "https://m.facebook.com/RestoRabat",
+    "https://www.facebook.com/a/b/c",
+    "https://www.instagram.com/p/AbC123/",
+    "https://www.instagram.com/explore/tags/rabat/",
+    "https://www.google.com/url?sa=U",
+    "https://example.com/facebook",
+    None,
+])
+def test_classify_rejects_non_profile_links(url):
+    assert classify_serp_link(url, "Titre", "kw") is None
+
+
+def test_classify_profile_id_and_default_title():
+    result = classify_serp_link("https://www.facebook.com/profile.php?id=100012345", "  ", "kw")
+    assert result["Type_Lien_Google"] == "Facebook"
+    assert result["Titre_Google"] == "https://www.facebook.com/profile.php?id=100012345"
@@ -0,0 +1,89 @@
+# /home/AlienScraper/tests/test_session_breaker.py
+
+import os
+
+import pytest
+
+import session_breaker
+from session_breaker import SessionCircuitBreaker, url_platform
+
+LOGIN_REDIRECT = "Redirected to login/checkpoint/error page"
+PAGE = "https://www.facebook.com/MaPage"
+
+
+@pytest.fixture(autouse=True)
+def cookie_files(tmp_path, monkeypatch):
+    files = {platform: tmp_path / f"{platform}_cookies.json" for platform in ('facebook', 'instagram')}
+    for path in files.values():
+        path.write_text("[]")
+    monkeypatch.setattr(session_breaker, 'COOKIE_FILES', files)
+    return files
+
+
+class Relogin:
+    def __init__(self, succeeds):
+        self.succeeds = succeeds
+        self.calls = []
+
+    def __call__(self, driver, platform):
+        self.calls.append((driver, platform))
+        return self.succeeds
+
+
+def test_url_platform():
+    assert url_platform("https://m.facebook.com/x") == 'facebook'
+    assert url_platform("https://www.instagram.com/x/") == 'instagram'
+    assert url_platform("https://notfacebook.com/x") is None
+
+
+def test_opens_after_threshold_when_relogin_fails():
+    relogin = Relogin(succeeds=False)
+    breaker = SessionCircuitBreaker(relogin, threshold=2)
+    driver = object()
+    assert not breaker.record(driver, PAGE, LOGIN_REDIRECT)
+    assert breaker.allow(PAGE)
+    assert not breaker.record(driver, PAGE, LOGIN_REDIRECT)
+    assert relogin.calls == [(driver, 'facebook')]
+    assert not breaker.allow(PAGE)
+    assert breaker.allow("https://www.instagram.com/profil/") # Les autres plateformes continuent
+    assert breaker.summary() == {'open_platforms': ['facebook'], 'urls_deferred': 1}
+
+
+def test_successful_relogin_keeps_breaker_closed():
+    breaker = SessionCircuitBreaker(Relogin(succeeds=True), threshold=1)
+    assert breaker.record(object(), PAGE, LOGIN_REDIRECT) # Page à recharger
+    assert breaker.allow(PAGE)
+
+
+def test_success_resets_consecutive_failures():
+    breaker = SessionCircuitBreaker(Relogin(succeeds=False), threshold=2)
+    driver = object()
+    breaker.record(driver, PAGE, LOGIN_REDIRECT)
+    breaker.record(driver, PAGE, "Success")
+    breaker.record(driver, PAGE, LOGIN_REDIRECT)
+    assert breaker.allow(PAGE)
+
+
+def test_relogin_attempted_once_per_driver():
+    relogin = Relogin(succeeds=False)
+    breaker = SessionCircuitBreaker(relogin, threshold=1)
+    driver = object()
+    breaker.record(driver, PAGE, LOGIN_REDIRECT)
+    breaker.allow(PAGE) # Ouvert
+    breaker.record(driver, PAGE, LOGIN_REDIRECT)
+    assert len(relogin.calls) == 1
+
+
+def test_new_cookie_file_half_opens_breaker(cookie_files):
+    relogin = Relogin(succeeds=False)
+    breaker = SessionCircuitBreaker(relogin, threshold=1)
+    driver = object()
+    breaker.record(driver, PAGE, LOGIN_REDIRECT)
+    assert not breaker.allow(PAGE)
+
+    stat = cookie_files['facebook'].stat()
+    os.utime(cookie_files['facebook'], (stat.st_atime, stat.st_mtime + 60)) # /upload-cookies
+    assert breaker.allow(PAGE)
+    breaker.record(driver, PAGE, LOGIN_REDIRECT) # Nouvelle reconnexion tentée sur ce navigateur
+    assert len(relogin.calls) == 2
+    assert not breaker.allow(PAGE)
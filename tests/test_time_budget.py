@@ -0,0 +1,59 @@
+# /home/AlienScraper/tests/test_time_budget.py
+
+import time
+
+import pytest
+
+import config
+from time_budget import TimeBudget, job_time_budget_seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [500.0]
+    monkeypatch.setattr(time, 'monotonic', lambda: now[0])
+    monkeypatch.setattr(config, 'TIME_BUDGET_DEFAULT_SECONDS_PER_URL', 30)
+    monkeypatch.setattr(config, 'TIME_BUDGET_DEFAULT_SECONDS_PER_PAGE', 10)
+    monkeypatch.setattr(config, 'TIME_BUDGET_DEFAULT_URLS_PER_PAGE', 5)
+    return now
+
+
+def test_deadline_excludes_reserve_and_startup(clock):
+    budget = TimeBudget(budget_seconds=3600, reserve_seconds=300, elapsed_seconds=60)
+    assert budget.remaining() == 3240
+
+
+def test_url_started_only_if_it_can_finish(clock):
+    budget = TimeBudget(budget_seconds=400, reserve_seconds=100)
+    budget.record_url(50)
+    clock[0] += 240
+    assert budget.can_start_url() # 60 s restantes pour 50 s par URL
+    clock[0] += 20
+    assert not budget.can_start_url()
+
+
+def test_search_pages_shrink_as_backlog_grows(clock):
+    budget = TimeBudget(budget_seconds=3600, reserve_seconds=0)
+    # Une page : 10 s de recherche + 5 URLs x 30 s de détail = 160 s ; 3600 s / 4 combinaisons = 5 pages
+    assert budget.pages_for_next_combination(combinations_left=4, pages_limit=10) == 5
+    for _ in range(100): # 3000 s de détail déjà en file
+        budget.url_queued()
+    assert budget.pages_for_next_combination(combinations_left=4, pages_limit=10) == 1
+    clock[0] += 600
+    assert budget.pages_for_next_combination(combinations_left=4, pages_limit=10) == 0
+
+
+def test_pool_workers_share_the_backlog(clock):
+    budget = TimeBudget(budget_seconds=3600, reserve_seconds=0)
+    for _ in range(10):
+        budget.url_queued()
+    budget.workers = 3
+    assert budget.detail_backlog_seconds() == 100
+
+
+def test_budget_source_order(monkeypatch):
+    monkeypatch.setattr(config, 'TIME_BUDGET_SECONDS', 900)
+    job = type('Job', (), {'timeout': 7200})()
+    assert job_time_budget_seconds(job, 60) == 60
+    assert job_time_budget_seconds(job) == 7200
+    assert job_time_budget_seconds(None) == 900
@@ -0,0 +1,57 @@
+# /home/AlienScraper/tests/test_url_cache.py
+
+import time
+
+import pytest
+
+from url_cache import UrlResultCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(time, 'time', lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def cache(tmp_path):
+    url_cache = UrlResultCache(tmp_path / "cache.sqlite", ttl_seconds=3600, max_entries=2).open()
+    yield url_cache
+    url_cache.close()
+
+
+def test_entry_expires_after_ttl(cache, clock):
+    assert cache.put("facebook.com/a", {"Statut_Scraping_Detail": "Success", "Nom de la Page": "A"})
+    clock[0] += 3599
+    assert cache.get("facebook.com/a")["Nom de la Page"] == "A"
+    clock[0] += 2
+    assert cache.get("facebook.com/a") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_only_reusable_statuses_are_cached(cache, clock):
+    assert cache.put("facebook.com/ai", {"Statut_Scraping_Detail": "Success - AI Extraction"})
+    assert not cache.put("facebook.com/t", {"Statut_Scraping_Detail": "Timeout loading page elements"})
+    assert cache.get("facebook.com/t") is None
+
+
+def test_source_fields_come_from_current_search(cache, clock):
+    cache.put("facebook.com/a", {"Statut_Scraping_Detail": "Success", "URL_Originale_Source": "https://www.facebook.com/a",
+                                 "Source_Mot_Cle": "ancien"})
+    cached = cache.get("facebook.com/a", {'URL': "https://m.facebook.com/a", 'Source_Mot_Cle': "spa rabat"})
+    assert cached["Source_Mot_Cle"] == "spa rabat"
+    assert cached["URL_Originale_Source"] == "https://m.facebook.com/a"
+
+
+def test_oldest_entries_evicted_beyond_max(tmp_path, clock):
+    url_cache = UrlResultCache(tmp_path / "cache.sqlite", ttl_seconds=3600, max_entries=2).open()
+    for index in range(3):
+        clock[0] += 1
+        url_cache.put(f"facebook.com/{index}", {"Statut_Scraping_Detail": "Success"})
+    url_cache.close()
+
+    reopened = UrlResultCache(tmp_path / "cache.sqlite", ttl_seconds=3600, max_entries=2).open() # Éviction à l'ouverture
+    assert reopened.get("facebook.com/0") is None
+    assert reopened.get("facebook.com/2") is not None
+    reopened.close()
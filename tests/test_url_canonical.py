@@ -0,0 +1,54 @@
+# /home/AlienScraper/tests/test_url_canonical.py
+
+import pytest
+
+from scraper.url_canonical import canonical_url, url_dedupe_key
+
+
+# Posts / photos / vidéos Facebook : les paramètres qui les identifient sont gardés, le reste est retiré
+@pytest.mark.parametrize("url, expected", [
+    ("https://m.facebook.com/story.php?story_fbid=123&id=456&ref=share", "https://www.facebook.com/story.php?story_fbid=123&id=456"),
+    ("https://www.facebook.com/permalink.php?id=2&story_fbid=1&__tn__=K", "https://www.facebook.com/permalink.php?story_fbid=1&id=2"),
+    ("https://fr-fr.facebook.com/photo.php?fbid=5&set=a.1&type=3", "https://www.facebook.com/photo.php?fbid=5&set=a.1"),
+    ("https://www.facebook.com/photo/?fbid=5&set=a.1", "https://www.facebook.com/photo/?fbid=5&set=a.1"),
+    ("https://www.facebook.com/watch/?v=777&ref=sharing", "https://www.facebook.com/watch/?v=777"),
+    ("https://www.facebook.com/video.php?v=8", "https://www.facebook.com/video.php?v=8"),
+])
+def test_facebook_content_urls_keep_identifying_params(url, expected):
+    assert canonical_url(url) == expected
+
+
+def test_facebook_posts_have_distinct_dedupe_keys():
+    urls = [
+        "https://www.facebook.com/story.php?story_fbid=1&id=10",
+        "https://www.facebook.com/story.php?story_fbid=2&id=10",
+        "https://www.facebook.com/permalink.php?story_fbid=1&id=10",
+        "https://www.facebook.com/watch/?v=1",
+        "https://www.facebook.com/watch/?v=2",
+        "https://www.facebook.com/photo.php?fbid=1",
+        "https://www.facebook.com/photo.php?fbid=2",
+    ]
+    assert len({url_dedupe_key(url) for url in urls}) == len(urls)
+
+
+def test_facebook_page_variants_share_a_key():
+    variants = [
+        "https://www.facebook.com/MaPage",
+        "https://m.facebook.com/mapage/?locale=fr_FR",
+        "http://fr-fr.facebook.com/MaPage/about/",
+        "https://www.facebook.com/pg/MaPage/reviews/",
+    ]
+    assert {canonical_url(url) for url in variants} == {"https://www.facebook.com/mapage/"}
+    assert url_dedupe_key(variants[0]) == "facebook.com/mapage"
+
+
+def test_facebook_profile_id_is_kept():
+    assert canonical_url("https://m.facebook.com/profile.php?id=100&sk=about") == "https://www.facebook.com/profile.php?id=100"
+
+
+def test_instagram_and_generic_sites():
+    assert canonical_url("https://instagram.com/Boulangerie.Martin/reels/?igshid=x") == "https://www.instagram.com/boulangerie.martin/"
+    assert canonical_url("https://www.instagram.com/p/AbC123/?utm_source=ig") == "https://www.instagram.com/p/AbC123/"
+    assert canonical_url("https://Example.com/contact?utm_source=google&page=2#top") == "https://example.com/contact?page=2"
+    assert canonical_url("Not Found") == "Not Found"
+    assert url_dedupe_key("") is None
@@ -0,0 +1,158 @@
+# /home/AlienScraper/time_budget.py
+
+import time
+import threading
+
+import config # Import configuration centralisée
+
+
+# Nombre de mesures récentes utilisées pour les estimations (le rythme change au cours d'une tâche)
+RECENT_SAMPLES = 20
+
+
+def _recent_mean(samples, default):
+    recent = samples[-RECENT_SAMPLES:]
+    return sum(recent) / len(recent) if recent else default
+
+
+# --- Budget de temps d'une tâche (job_timeout RQ) ---
+class TimeBudget:
+    """
+    Échéance de la partie scraping d'une tâche : budget total moins une réserve pour fermer le CSV,
+    écrire le rapport et lancer clean/extract. RQ tue la tâche au job_timeout ; on s'arrête avant.
+    Les estimations viennent des durées observées dans la tâche (valeurs de config.py au départ) :
+    - pages_for_next_combination() : pages Google encore finançables pour la combinaison suivante,
+      en comptant le scraping détaillé des URLs déjà en file et de celles que ces pages apporteront ;
+    - can_start_url() : une URL n'est commencée que si elle peut finir avant l'échéance
+      (la file étant ordonnée par rendement attendu, ce sont les moins bons prospects qui tombent).
+    Thread-safe : alimenté par le producteur Google et tous les workers du pool.
+    """
+
+    def __init__(self, budget_seconds, reserve_seconds, elapsed_seconds=0.0):
+        self.budget_seconds = budget_seconds
+        self.reserve_seconds = reserve_seconds
+        self.deadline = time.monotonic() - elapsed_seconds + budget_seconds - reserve_seconds
+        self.workers = 1 # Mis à jour quand le pool de détail est créé
+        self.urls_queued = 0
+        self.urls_done = 0
+        self.urls_dropped = 0
+        self.combinations_skipped = 0
+        self._url_seconds = []
+        self._page_seconds = []
+        self._page_new_urls = []
+        self._lock = threading.Lock()
+
+    def remaining(self):
+        return self.deadline - time.monotonic()
+
+    # --- Mesures ---
+    def url_queued(self):
+        with self._lock:
+            self.urls_queued += 1
+
+    def record_url(self, seconds):
+        """Durée réelle (pacing compris) d'une URL scrapée par un worker."""
+        with self._lock:
+            self.urls_done += 1
+            self._url_seconds.append(seconds)
+
+    def url_served_from_cache(self):
+        """Cache hit : sort de la file sans compter dans la durée moyenne par URL."""
+        with self._lock:
+            self.urls_done += 1
+
+    def url_deferred(self):
+        """Reportée sans chargement (session de la plateforme perdue) : sort de la file sans durée."""
+        with self._lock:
+            self.urls_done += 1
+
+    def drop_url(self):
+        with self._lock:
+            self.urls_done += 1
+            self.urls_dropped += 1
+
+    def record_search_page(self, seconds, new_urls):
+        """Durée d'une page de résultats Google (recherche / navigation comprise) et URLs nouvelles trouvées."""
+        with self._lock:
+            self._page_seconds.append(seconds)
+            self._page_new_urls.append(new_urls)
+
+    # --- Estimations ---
+    def seconds_per_url(self):
+        with self._lock:
+            return _recent_mean(self._url_seconds, config.TIME_BUDGET_DEFAULT_SECONDS_PER_URL)
+
+    def seconds_per_search_page(self):
+        with self._lock:
+            return _recent_mean(self._page_seconds, config.TIME_BUDGET_DEFAULT_SECONDS_PER_PAGE)
+
+    def new_urls_per_page(self):
+        with self._lock:
+            return _recent_mean(self._page_new_urls, config.TIME_BUDGET_DEFAULT_URLS_PER_PAGE)
+
+    def detail_backlog_seconds(self):
+        """Temps pour vider la file de détail actuelle avec le pool de workers."""
+        with self._lock:
+            pending = max(0, self.urls_queued - self.urls_done)
+            workers = max(1, self.workers)
+        return pending * self.seconds_per_url() / workers
+
+    # --- Décisions ---
+    def pages_for_next_combination(self, combinations_left, pages_limit):
+        """
+        Pages Google à parcourir pour la prochaine combinaison (0 : arrêter la recherche).
+        Le temps restant après la file de détail est réparti entre les combinaisons restantes ;
+        une page coûte sa recherche plus le détail des URLs qu'elle apporte en moyenne.
+        """
+        available = self.remaining() - self.detail_backlog_seconds()
+        if available <= 0:
+            return 0
+        page_cost = self.seconds_per_search_page() + self.new_urls_per_page() * self.seconds_per_url() / max(1, self.workers)
+        per_combination = available / max(1, combinations_left)
+        pages = int(per_combination // max(page_cost, 1.0))
+        if pages == 0 and available >= page_cost:
+            pages = 1 # Pas assez pour toutes les combinaisons : au moins la première page des suivantes
+        return min(pages_limit, pages)
+
+    def can_start_url(self):
+        return self.remaining() >= self.seconds_per_url()
+
+    def summary(self):
+        """Champs de job.meta / du rapport d'exécution."""
+        return {
+            'budget_s': self.budget_seconds,
+            'reserve_s': self.reserve_seconds,
+            'remaining_s': round(self.remaining(), 1),
+            'seconds_per_url': round(self.seconds_per_url(), 1),
+            'seconds_per_search_page': round(self.seconds_per_search_page(), 1),
+            'urls_dropped': self.urls_dropped,
+            'combinations_skipped': self.combinations_skipped,
+        }
+
+
+def job_time_budget_seconds(job, time_budget_seconds=None):
+    """Budget explicite, sinon job_timeout de la tâche RQ, sinon TIME_BUDGET_SECONDS (0 : pas de limite)."""
+    if time_budget_seconds:
+        return time_budget_seconds
+    job_timeout = getattr(job, 'timeout', None)
+    if isinstance(job_timeout, (int, float)) and job_timeout > 0:
+        return job_timeout
+    return config.TIME_BUDGET_SECONDS or None
+
+
+def create_time_budget(job, time_budget_seconds, run_post_options):
+    """TimeBudget de la tâche, ou None sans limite de temps (mode autonome) ou si TIME_BUDGET_ENABLED=0."""
+    if not config.TIME_BUDGET_ENABLED:
+        return None
+    budget_seconds = job_time_budget_seconds(job, time_budget_seconds)
+    if not budget_seconds:
+        return None
+    reserve_seconds = config.TIME_BUDGET_WRITE_RESERVE_SECONDS
+    if run_post_options:
+        reserve_seconds += config.TIME_BUDGET_POST_OPTIONS_RESERVE_SECONDS
+    # Temps déjà consommé avant l'entrée dans la fonction (import de la pile si elle n'était pas préchargée)
+    elapsed_seconds = ((getattr(job, 'meta', None) or {}).get('startup_latency_s') or 0.0)
+    budget = TimeBudget(budget_seconds, reserve_seconds, elapsed_seconds)
+    print(f"[Time Budget] Budget {budget_seconds / 60:.0f} min, réserve {reserve_seconds / 60:.1f} min "
+          f"(écriture des résultats{' + nettoyage/extraction' if run_post_options else ''}).")
+    return budget
@@ -0,0 +1,135 @@
+# /home/AlienScraper/url_cache.py
+
+import json
+import time
+import sqlite3
+import threading
+import traceback
+
+import config # Import configuration centralisée
+
+
+# Statuts dont le résultat est réutilisable par une autre tâche (les erreurs/timeouts sont re-scrapés)
+CACHEABLE_STATUSES = {"Success", "Completed", "Partial Success - Intro Block Not Found", "Success - AI Extraction"}
+
+# Champs propres à la recherche Google qui a trouvé l'URL : jamais repris du cache, toujours ceux de la tâche courante
+SOURCE_FIELDS_NOT_CACHED = ("URL", "URL_Originale_Source")
+
+
+# --- Cache persistant des résultats détaillés par URL (partagé entre les tâches et les workers) ---
+class UrlResultCache:
+    """
+    Stocke le dictionnaire detailed_data produit par scrape_facebook_page / scrape_instagram_page /
+    extract_info_with_ai, indexé par clé canonique (url_dedupe_key), dans une base SQLite sur disque.
+    - TTL : une entrée plus vieille que ttl_seconds est ignorée puis supprimée.
+    - Taille : au-delà de max_entries, les entrées les plus anciennes sont évincées.
+    La base est en mode WAL pour que plusieurs worker.py puissent la lire/écrire en même temps.
+    Thread-safe : partagé par tous les workers du pool de scraping détaillé.
+    """
+
+    EVICTION_EVERY_N_PUTS = 100 # Évite un COUNT(*) à chaque écriture
+
+    def __init__(self, db_path, ttl_seconds, max_entries):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._puts_since_eviction = 0
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def open(self):
+        """Ouvre (ou crée) la base du cache. Retourne self pour un usage chaîné."""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # check_same_thread=False : la connexion est partagée entre workers, protégée par self._lock
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS url_results (url_key TEXT PRIMARY KEY, data TEXT NOT NULL, stored_at REAL NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_url_results_stored_at ON url_results (stored_at)")
+        self._conn.commit()
+        self._evict_locked()
+        print(f"[URL Cache] Cache des résultats détaillés ouvert : {self.db_path} (TTL {self.ttl_seconds // 3600} h, max {self.max_entries} entrées)")
+        return self
+
+    def get(self, url_key, source_info=None):
+        """
+        Retourne une copie du detailed_data en cache pour url_key (None si absent ou expiré).
+        Les infos source de la recherche courante (mot-clé, titre Google...) remplacent celles du cache.
+        """
+        if not url_key or self._conn is None:
+            return None
+        try:
+            with self._lock:
+                row = self._conn.execute("SELECT data, stored_at FROM url_results WHERE url_key = ?", (url_key,)).fetchone()
+                if row is None or time.time() - row[1] > self.ttl_seconds:
+                    if row is not None:
+                        self._conn.execute("DELETE FROM url_results WHERE url_key = ?", (url_key,))
+                        self._conn.commit()
+                    self.misses += 1
+                    return None
+                self.hits += 1
+            detailed_data = json.loads(row[0])
+        except Exception as e:
+            print(f"[URL Cache] Erreur lors de la lecture du cache pour {url_key} : {e}")
+            return None
+
+        for key, value in (source_info or {}).items():
+            if key not in SOURCE_FIELDS_NOT_CACHED:
+                detailed_data[key] = value
+        if source_info and source_info.get('URL'):
+            detailed_data['URL_Originale_Source'] = source_info['URL']
+        return detailed_data
+
+    def put(self, url_key, detailed_data):
+        """Met en cache detailed_data si son statut est réutilisable. Retourne True si stocké."""
+        if not url_key or self._conn is None or not isinstance(detailed_data, dict):
+            return False
+        if detailed_data.get("Statut_Scraping_Detail") not in CACHEABLE_STATUSES:
+            return False
+        try:
+            payload = json.dumps(detailed_data, ensure_ascii=False, default=str)
+            with self._lock:
+                self._conn.execute("INSERT OR REPLACE INTO url_results (url_key, data, stored_at) VALUES (?, ?, ?)",
+                                   (url_key, payload, time.time()))
+                self._conn.commit()
+                self._puts_since_eviction += 1
+                if self._puts_since_eviction >= self.EVICTION_EVERY_N_PUTS:
+                    self._evict_locked()
+            return True
+        except Exception as e:
+            print(f"[URL Cache] Erreur lors de l'écriture du cache pour {url_key} : {e}")
+            return False
+
+    def _evict_locked(self):
+        """Supprime les entrées expirées puis les plus anciennes au-delà de max_entries."""
+        self._puts_since_eviction = 0
+        try:
+            self._conn.execute("DELETE FROM url_results WHERE stored_at < ?", (time.time() - self.ttl_seconds,))
+            (entry_count,) = self._conn.execute("SELECT COUNT(*) FROM url_results").fetchone()
+            if entry_count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM url_results WHERE url_key IN (SELECT url_key FROM url_results ORDER BY stored_at ASC LIMIT ?)",
+                    (entry_count - self.max_entries,))
+            self._conn.commit()
+        except Exception as e:
+            print(f"[URL Cache] Erreur lors de l'éviction du cache : {e}")
+            traceback.print_exc()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        print(f"[URL Cache] Cache fermé : {self.hits} hit(s), {self.misses} miss(es) pour cette tâche.")
+
+
+def open_url_cache():
+    """Ouvre le cache configuré dans config.py, ou retourne None s'il est désactivé / inutilisable."""
+    if not config.URL_CACHE_ENABLED:
+        return None
+    try:
+        return UrlResultCache(config.URL_CACHE_PATH, config.URL_CACHE_TTL_HOURS * 3600, config.URL_CACHE_MAX_ENTRIES).open()
+    except Exception as e:
+        print(f"[URL Cache] Impossible d'ouvrir le cache {config.URL_CACHE_PATH} : {e}. Scraping sans cache.")
+        return None
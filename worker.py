@@ -1,8 +1,10 @@
 # /home/AlienScraper/worker.py
 
 import os
+import sys
+import time
 import redis
-from rq import Worker, Queue # On n'importe plus Connection
+from rq import Worker, SimpleWorker, Queue # On n'importe plus Connection
 
 # --- Configuration ---
 # Nom de la file d'attente que ce worker va écouter
@@ -11,8 +13,39 @@ listen = ['scraping-tasks']
 # Configuration de la connexion Redis (utilise les valeurs par défaut : localhost:6379)
 redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379')
 
+# Préchargement de la pile de scraping (main_scraper, selenium, undetected_chromedriver,
+# google.generativeai, modèles Gemini...) dans le process parent du worker.
+# RQ forke un process enfant par tâche : les enfants héritent des modules déjà importés
+# au lieu de tout ré-importer à chaque tâche. WORKER_PRELOAD=0 pour revenir à l'ancien comportement
+# (utile pour comparer job.meta['startup_latency_s'] avant/après).
+preload_scraping_stack = os.getenv('WORKER_PRELOAD', '1') == '1'
+
+# Navigateurs persistants (voir config.PERSISTENT_BROWSER) : les tâches tournent dans le process du
+# worker (SimpleWorker) pour que les navigateurs Chrome connectés survivent d'une tâche à l'autre.
+persistent_browser = os.getenv('PERSISTENT_BROWSER', '0') == '1'
+
 conn = redis.from_url(redis_url)
 
+
+def preload_scraping_modules():
+    """Importe une fois pour toutes les modules utilisés par les tâches. Retourne True si réussi."""
+    # Le worker est lancé depuis n'importe quel dossier : s'assurer que la racine du projet est importable
+    project_dir = os.path.dirname(os.path.abspath(__file__))
+    if project_dir not in sys.path:
+        sys.path.insert(0, project_dir)
+    preload_start = time.monotonic()
+    try:
+        import main_scraper # Importe aussi config, scraper/*, clean, extract_leads
+        main_scraper.PRELOADED_BY_WORKER = True # Lu par measure_job_startup (job.meta['stack_preloaded'])
+        # Les clients gRPC Gemini ne sont créés qu'au premier appel : rien n'est ouvert avant le fork
+        print(f"Pile de scraping préchargée en {time.monotonic() - preload_start:.2f}s (héritée par chaque tâche).")
+        return True
+    except (Exception, SystemExit) as e: # main_scraper fait sys.exit(1) si un module critique manque
+        print(f"AVERTISSEMENT : préchargement de la pile de scraping impossible ({type(e).__name__}: {e}). "
+              f"Chaque tâche importera ses modules elle-même.")
+        return False
+
+
 if __name__ == '__main__':
     print(f"--- Démarrage du Worker RQ ---")
     print(f"Connexion à Redis : {redis_url}")
@@ -23,13 +56,31 @@ if __name__ == '__main__':
         conn.ping()
         print("Connexion à Redis réussie.")
 
+        stack_preloaded = False
+        if preload_scraping_stack or persistent_browser:
+            stack_preloaded = preload_scraping_modules()
+        else:
+            print("Préchargement de la pile de scraping désactivé (WORKER_PRELOAD=0).")
+
         # On crée les objets Queue en leur passant la connexion
         queues = [Queue(name, connection=conn) for name in listen]
         # On crée le Worker avec la liste des queues et la connexion
-        worker = Worker(queues, connection=conn)
+        if persistent_browser and stack_preloaded:
+            import main_scraper
+            main_scraper.browser_manager.keep_alive = True
+            worker = SimpleWorker(queues, connection=conn) # Pas de fork : les navigateurs restent au chaud
+            print("Mode navigateurs persistants : les tâches s'exécutent dans le process du worker.")
+        else:
+            if persistent_browser:
+                print("AVERTISSEMENT : PERSISTENT_BROWSER ignoré (pile de scraping non préchargée).")
+            worker = Worker(queues, connection=conn)
 
         # Lance le worker (bloquant)
-        worker.work(with_scheduler=True) # with_scheduler=True est utile pour des tâches planifiées plus tard
+        try:
+            worker.work(with_scheduler=True) # with_scheduler=True est utile pour des tâches planifiées plus tard
+        finally:
+            if persistent_browser and stack_preloaded:
+                main_scraper.browser_manager.shutdown() # Ne pas laisser de Chrome orphelins
 
     except redis.exceptions.ConnectionError as e:
         print(f"\nERREUR : Impossible de se connecter à Redis à l'adresse {redis_url}")